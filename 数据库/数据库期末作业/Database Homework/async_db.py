@@ -0,0 +1,193 @@
+# async_db.py
+"""db.py 的 asyncio 接口，供 aiohttp 等异步服务调用
+
+    import async_db
+    movie = await async_db.get_movie_details(movie_id)
+    rows, token = await async_db.fetch_movies_page(limit=50)
+
+db.py 的函数在线程池中执行（pymysql 和 sqlite3 都是阻塞的），不会阻塞事件循环；
+函数名、参数和返回值与 db.py 相同，读缓存、连接池和存储后端也与 db.py 共用。
+同时执行的调用数不超过异步连接池的大小，超出的调用在事件循环中等待。
+"""
+import asyncio
+import copy
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+
+DEFAULT_POOL_SIZE = 10
+
+# 在线程池中执行的 db.py 函数
+OPERATIONS = (
+    # 结构
+    "init_database", "rebuild_award_summaries",
+    # 实体增删改查
+    "fetch_all_movies", "insert_movie", "update_movie_with_procedure", "delete_movie_with_transaction",
+    "fetch_all_people", "insert_person", "update_person_with_procedure", "delete_person_with_transaction",
+    "fetch_all_companies", "insert_company", "update_company_with_procedure", "delete_company_with_transaction",
+    "fetch_all_awards", "insert_award", "update_award_with_procedure", "delete_award_with_transaction",
+    "delete_many", "delete_movies", "delete_people", "delete_companies", "delete_awards",
+    # 分页与检索
+    "fetch_page", "fetch_rows",
+    "fetch_movies_page", "fetch_people_page", "fetch_companies_page", "fetch_awards_page",
+    "search", "search_movies", "search_people", "search_companies", "search_awards",
+    # 汇总
+    "get_movies_summary", "get_people_summary", "get_companies_summary",
+    "get_person_awards_summary", "get_movie_awards_summary",
+    # 综合信息
+    "get_person_details", "get_person_details_many", "get_movie_details_many", "get_movie_details_section",
+    # 关系
+    "add_links", "upsert_links",
+    "add_movie_actors", "add_person_awards", "add_movie_awards", "add_movie_companies", "upsert_movie_actors",
+    "add_movie_actor", "add_person_award", "add_movie_award", "add_movie_company",
+    "get_movie_actors", "get_actor_movies", "get_person_awards", "get_movie_awards", "get_movie_companies",
+    # 操作日志
+    "get_operation_logs", "tail_operation_logs",
+    # UI设置
+    "save_ui_setting", "get_ui_setting", "get_all_ui_settings", "delete_ui_setting",
+)
+
+
+class AsyncPool:
+    """异步连接池：db.py 的函数在专用线程池中执行，每个调用从 db.py 的连接池借用一个连接
+
+    asyncio.Semaphore 只能在一个事件循环中使用，所以每个事件循环各有一个信号量
+    （新的事件循环使用时丢弃已关闭的事件循环的信号量），同一个池可以被先后或同时运行的多个事件循环使用；
+    线程池由它们共用，总的并发数仍不超过 size。
+
+    参数:
+        size: 最多同时执行的调用数，即最多同时占用的数据库连接数
+    """
+    def __init__(self, size=DEFAULT_POOL_SIZE):
+        if size < 1:
+            raise ValueError("连接池大小配置无效")
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="async_db")
+        self._semaphores = {}  # 事件循环 -> 信号量
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"calls": 0, "waits": 0, "wait_time": 0.0, "active": 0}
+
+    def _semaphore(self, loop):
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                # 信号量引用着它的事件循环，不能用弱引用的字典，在这里清理
+                for closed in [other for other in self._semaphores if other.is_closed()]:
+                    del self._semaphores[closed]
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.size)
+            return semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """在线程池中执行 func(*args, **kwargs) 并等待结果"""
+        if self._closed:
+            raise RuntimeError("连接池已关闭")
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+        with self._lock:
+            self._stats["calls"] += 1
+        if semaphore.locked():
+            started = time.monotonic()
+            await semaphore.acquire()
+            with self._lock:
+                self._stats["waits"] += 1
+                self._stats["wait_time"] += time.monotonic() - started
+        else:
+            await semaphore.acquire()
+        try:
+            with self._lock:
+                self._stats["active"] += 1
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._stats["active"] -= 1
+            semaphore.release()
+
+    def stats(self):
+        """返回统计信息（调用次数、等待次数、等待总秒数、正在执行的调用数）"""
+        with self._lock:
+            result = dict(self._stats)
+        result["size"] = self.size
+        return result
+
+    def shutdown(self, wait=True):
+        """不再接受新的调用；wait=True 时等待正在执行的调用结束，否则它们结束后线程自动退出"""
+        self._closed = True
+        self._executor.shutdown(wait=wait)
+
+    async def close(self):
+        """同 shutdown()，在事件循环中等待而不阻塞它"""
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+
+_pool = None
+_pool_size = DEFAULT_POOL_SIZE
+_pool_lock = threading.Lock()
+
+def configure_pool(size=DEFAULT_POOL_SIZE):
+    """设置异步连接池的大小，下次调用时按新大小重建；原来的池不再接受新的调用，
+    正在执行的调用结束后它的线程退出
+
+    db.py 的连接池与界面等同步调用共用，不会被重建：它的 max_size 小于 size 时提高到 size
+    （db.reserve_pool_size），保证每个并发的调用都能借到连接，已有的连接不受影响。
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        old, _pool, _pool_size = _pool, None, size
+    if old is not None:
+        old.shutdown(wait=False)
+    db.reserve_pool_size(size)
+
+def get_pool():
+    """获取全局异步连接池（首次调用时创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AsyncPool(_pool_size)
+            db.reserve_pool_size(_pool_size)
+        return _pool
+
+async def close_pool():
+    """关闭全局异步连接池和 db.py 的连接池"""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, None
+    if old is not None:
+        await old.close()
+    db.close_pool()
+
+def get_pool_stats():
+    return get_pool().stats()
+
+
+def _offload(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await get_pool().run(func, *args, **kwargs)
+    return wrapper
+
+for _name in OPERATIONS:
+    globals()[_name] = _offload(getattr(db, _name))
+del _name
+
+
+async def get_movie_details(movie_id):
+    """同 db.get_movie_details，但基本信息和各种关系用 asyncio.gather 并发查询，
+    各自从连接池借用连接；缓存命中时不查询数据库"""
+    found, value, generation = db.get_movie_details.lookup(movie_id)
+    if found:
+        return value
+    pool = get_pool()
+    basic, *sections = await asyncio.gather(
+        pool.run(db.fetch_rows, "Movies", [movie_id]),
+        *(pool.run(db.get_movie_details_section, field, [movie_id]) for field in db.MOVIE_DETAIL_SECTIONS))
+    movie = basic.get(movie_id)
+    value = None
+    if movie is not None:
+        value = db.assemble_movie_details(
+            movie, {field: section[movie_id] for field, section in zip(db.MOVIE_DETAIL_SECTIONS, sections)})
+    db.get_movie_details.store(generation, (movie_id,), value)
+    return copy.deepcopy(value)
@@ -0,0 +1,371 @@
+# backends.py
+"""存储后端：db.py 中与具体数据库有关的部分
+
+db.py 的函数只通过 db.get_backend() 返回的后端对象处理各数据库的差异：
+建立连接、执行迁移、存储过程、全文检索、唯一键冲突时的写法等。
+其余 SQL 两种数据库通用（占位符都写成 %s，SQLite 的连接会自动转换）。
+
+- MySQLBackend：pymysql，结构见 migrations.py
+- SQLiteBackend：标准库 sqlite3，一个本地文件即可运行，不需要数据库服务器；
+  使用 WAL 模式（读写互不阻塞），结构见 sqlite_migrations.py
+"""
+import decimal
+import functools
+import re
+import sqlite3
+
+import pymysql
+from pymysql.constants import SERVER_STATUS
+
+import migrations
+import sqlite_migrations
+from query_stats import InstrumentedCursor, InstrumentedSSCursor, _Instrumented
+
+def _marks(count):
+    return ", ".join(["%s"] * count)
+
+
+class MySQLBackend:
+    """MySQL 后端
+
+    参数:
+        config: pymysql.connect 的参数（host、user、password、database 等），
+                连接时才读取，之后修改（如 benchmark.py 切换库）对新连接生效
+    """
+    name = "mysql"
+    disconnect_errors = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+    NGRAM_TOKEN_SIZE = 2  # 与服务器的 ngram_token_size 一致（MySQL 默认值为2）
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        return pymysql.connect(cursorclass=InstrumentedCursor, **self.config)
+
+    def describe(self):
+        return f"MySQL {self.config.get('user')}@{self.config.get('host')}/{self.config.get('database')}"
+
+    # 连接池使用
+    def is_open(self, conn):
+        return conn.open
+
+    def in_transaction(self, conn):
+        return bool(conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+
+    def ping(self, conn):
+        conn.ping(reconnect=True)
+
+    def is_disconnect(self, error, conn):
+        """error 是否表示连接已断开（连接池据此丢弃连接）"""
+        return isinstance(error, self.disconnect_errors)
+
+    # 结构
+    def migrate(self, cursor):
+        return migrations.migrate(cursor)
+
+    def award_totals_refresh(self, kind):
+        return migrations.award_totals_refresh(kind)
+
+    def analyze(self, cursor, tables):
+        cursor.execute(f"ANALYZE TABLE {', '.join(tables)}")
+        cursor.fetchall()
+
+    def version(self, cursor):
+        cursor.execute("SELECT VERSION() AS version")
+        return f"MySQL {cursor.fetchone()['version']}"
+
+    # 语句
+    def stream_cursor(self, conn):
+        """不缓冲、返回元组的游标，用于流式导出"""
+        return conn.cursor(InstrumentedSSCursor)
+
+    def call_update(self, cursor, procedure, args):
+        """调用更新记录并写日志的存储过程（见 migrations.py 第3版）"""
+        cursor.execute(f"CALL {procedure}({_marks(len(args))})", args)
+
+    lock_rows = " FOR UPDATE"  # 事务中读取后要删除的行，先加锁
+
+    def upsert_sql(self, table, columns, key_columns, update_columns):
+        """INSERT 语句，唯一键冲突时用新值覆盖 update_columns；update_columns 为空时保留已有的行
+
+        key_columns 是冲突判断所用唯一键的列（MySQL 不需要写出来）。
+        格式保持 pymysql 能把 executemany 合并为一条多行 INSERT。
+        """
+        assignments = (", ".join(f"{column} = VALUES({column})" for column in update_columns)
+                       or f"{columns[0]} = {columns[0]}")
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({_marks(len(columns))})"
+                f" ON DUPLICATE KEY UPDATE {assignments}")
+
+    def _boolean_query(self, words):
+        """把检索词转换为 BOOLEAN MODE 的检索式，每个词都必须出现"""
+        terms = []
+        for word in words:
+            if len(word) < self.NGRAM_TOKEN_SIZE:
+                terms.append(f"+{word}*")  # 比分词长度短的词只能做前缀匹配
+            else:
+                terms.append(f'+"{word}"')
+        return " ".join(terms)
+
+    def search_sql(self, table, pk, columns, words):
+        """全文检索的 (SQL, 参数)，SQL 末尾留有 LIMIT %s OFFSET %s；没有可检索的词时返回 None
+
+        每行多一个 score 列表示相关度，越大越相关。
+        """
+        against = self._boolean_query(words)
+        if not against:
+            return None
+        match = f"MATCH({', '.join(columns)}) AGAINST(%s IN BOOLEAN MODE)"
+        return f"""
+            SELECT *, {match} AS score
+            FROM {table}
+            WHERE {match}
+            ORDER BY score DESC, {pk}
+            LIMIT %s OFFSET %s
+        """, [against, against]
+
+    # 批量导入
+    def auto_increment_step(self, cursor):
+        """一条多行 INSERT 的各行自增ID的间隔；不能保证ID连续时返回 None
+
+        innodb_autoinc_lock_mode 为 0 或 1 时，行数确定的 INSERT 一次分配连续的自增值；
+        为 2（MySQL 8 的默认值）时，并发写入的其他语句可能取走中间的值。
+        """
+        cursor.execute("SELECT @@auto_increment_increment AS step, @@innodb_autoinc_lock_mode AS lock_mode")
+        row = cursor.fetchone()
+        return None if row['lock_mode'] == 2 else row['step']
+
+    def first_insert_id(self, cursor, count, step):
+        """多行 INSERT 的第一行的自增ID（auto_increment_step 不为 None 时）：lastrowid 是其中第一个"""
+        return cursor.lastrowid
+
+
+# SQLite
+sqlite3.register_adapter(decimal.Decimal, str)  # 按文本写入，DECIMAL 列的类型亲和性会转换为数值
+
+@functools.lru_cache(maxsize=1024)
+def _translate(sql):
+    """pymysql 风格的占位符 %s 转换为 sqlite3 的 ?（%% 转换为 %）"""
+    return re.sub(r"%[s%]", lambda m: "?" if m.group() == "%s" else "%", sql)
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """让 sqlite3 的游标和 pymysql 的 DictCursor 用法相同：%s 占位符、字典行、with 语句
+
+    sqlite3 的游标本身就是逐行读取的，不需要另外的不缓冲游标。
+    """
+    dict_rows = True
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        if self.dict_rows:
+            self._cursor.row_factory = _dict_row
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, args=None):
+        if args is None:
+            self._cursor.execute(query)
+        else:
+            self._cursor.execute(_translate(query), tuple(args))
+        return self._cursor.rowcount
+
+    def executemany(self, query, args):
+        self._cursor.executemany(_translate(query), [tuple(row) for row in args])
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SQLiteTupleCursor(SQLiteCursor):
+    """返回元组的游标"""
+    dict_rows = False
+
+
+class InstrumentedSQLiteCursor(_Instrumented, SQLiteCursor):
+    """带统计的 SQLite 游标（查询的 rowcount 为 -1，行数在读取时统计）"""
+    counts_fetched_rows = True
+
+
+class InstrumentedSQLiteTupleCursor(_Instrumented, SQLiteTupleCursor):
+    counts_fetched_rows = True
+
+
+class SQLiteConnection:
+    """sqlite3 连接的包装，提供 db.py 用到的 pymysql 连接的接口（cursor、begin、commit、rollback）
+
+    写语句会隐式开始事务，commit() 提交；begin() 用 BEGIN IMMEDIATE 立即取得写锁，
+    避免事务中先读后写时因为其他连接已经写入而失败。
+    """
+    def __init__(self, path, busy_timeout=5.0, cursorclass=InstrumentedSQLiteCursor):
+        # 连接由连接池在线程之间传递（同一时间只有一个线程使用），所以关闭同线程检查
+        self.raw = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        self.cursorclass = cursorclass
+        self.raw.create_function("ngrams", -1, sqlite_migrations.ngrams, deterministic=True)
+        self.raw.execute("PRAGMA journal_mode = WAL")
+        self.raw.execute("PRAGMA synchronous = NORMAL")  # WAL 模式下只在检查点时同步，断电最多丢失最后几个事务
+        self.raw.execute("PRAGMA foreign_keys = ON")
+        self.open = True
+
+    def cursor(self, cursorclass=None):
+        return (cursorclass or self.cursorclass)(self)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def begin(self):
+        if not self.raw.in_transaction:
+            self.raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.open = False
+        self.raw.close()
+
+
+class SQLiteBackend:
+    """SQLite 后端：数据保存在本地文件中，查询不经过网络
+
+    参数:
+        path: 数据库文件，不存在时自动创建
+        busy_timeout: 其他连接正在写入时最多等待的秒数
+    """
+    name = "sqlite"
+    NGRAM_TOKEN_SIZE = sqlite_migrations.NGRAM_TOKEN_SIZE
+
+    # 存储过程 -> (表, 主键, 更新的列)，参数顺序为 (主键, 各列)，与 migrations.py 第3版的存储过程相同
+    PROCEDURES = {
+        "update_person_info": ("People", "people_id", ("name", "country", "masterpiece", "brief_intro")),
+        "update_movie_info": ("Movies", "movie_id",
+                              ("title", "release_year", "director", "genre", "box_office", "description")),
+        "update_company_info": ("Companies", "company_id",
+                                ("name", "country", "founded_year", "industry", "revenue", "description")),
+        "update_award_info": ("Awards", "award_id", ("name", "category", "year", "description")),
+    }
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+
+    def connect(self):
+        return SQLiteConnection(self.path, self.busy_timeout)
+
+    def describe(self):
+        return f"SQLite {self.path}"
+
+    # 连接池使用
+    def is_open(self, conn):
+        return conn.open
+
+    def in_transaction(self, conn):
+        return conn.in_transaction
+
+    def ping(self, conn):
+        pass  # 本地文件，没有断开连接的情况
+
+    def is_disconnect(self, error, conn):
+        """只有连接已关闭时才算断开
+
+        参数个数不对、参数类型不支持等调用错误同样抛出 ProgrammingError / InterfaceError，
+        这时连接仍然可用，不应丢弃。
+        """
+        return (isinstance(error, sqlite3.ProgrammingError)
+                and (not conn.open or "closed database" in str(error)))
+
+    # 结构
+    def migrate(self, cursor):
+        return sqlite_migrations.migrate(cursor)
+
+    def award_totals_refresh(self, kind):
+        return sqlite_migrations.award_totals_refresh(kind)
+
+    def analyze(self, cursor, tables):
+        cursor.execute("ANALYZE")
+
+    def version(self, cursor):
+        return f"SQLite {sqlite3.sqlite_version}"
+
+    # 语句
+    def stream_cursor(self, conn):
+        return conn.cursor(InstrumentedSQLiteTupleCursor)
+
+    def call_update(self, cursor, procedure, args):
+        """与存储过程相同：更新记录并写一条 UPDATE 日志（在调用方的事务中）"""
+        table, pk, columns = self.PROCEDURES[procedure]
+        record_id, values = args[0], tuple(args[1:])
+        assignments = ", ".join(f"{column} = %s" for column in columns)
+        cursor.execute(f"UPDATE {table} SET {assignments} WHERE {pk} = %s", values + (record_id,))
+        cursor.execute("INSERT INTO operation_logs (operation_type, table_name, record_id) VALUES ('UPDATE', %s, %s)",
+                       (table, record_id))
+
+    lock_rows = ""  # begin() 已经取得了整个库的写锁
+
+    def upsert_sql(self, table, columns, key_columns, update_columns):
+        """同 MySQLBackend.upsert_sql；保留已有的行时受影响行数为0，更新时为1（MySQL 为2）"""
+        if update_columns:
+            action = "DO UPDATE SET " + ", ".join(f"{column} = excluded.{column}" for column in update_columns)
+        else:
+            action = "DO NOTHING"
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({_marks(len(columns))})"
+                f" ON CONFLICT ({', '.join(key_columns)}) {action}")
+
+    def search_sql(self, table, pk, columns, words):
+        """同 MySQLBackend.search_sql，用 FTS5 表检索，相关度为 BM25 取负（越大越相关）"""
+        query = sqlite_migrations.fts_query(words)
+        if query is None:
+            return None
+        fts = sqlite_migrations.FTS_TABLES[table][0]
+        return f"""
+            SELECT t.*, -bm25({fts}) AS score
+            FROM {fts}
+            JOIN {table} t ON t.{pk} = {fts}.rowid
+            WHERE {fts} MATCH %s
+            ORDER BY score DESC, t.{pk}
+            LIMIT %s OFFSET %s
+        """, [query]
+
+    # 批量导入
+    def auto_increment_step(self, cursor):
+        return 1  # 写入是串行的，同一条 INSERT 的ID一定连续
+
+    def first_insert_id(self, cursor, count, step):
+        """SQLite 的写入是串行的，多行 INSERT 的ID连续，lastrowid 是最后一行的ID"""
+        return cursor.lastrowid - (count - 1) * step
+
+
+BACKENDS = {"mysql": MySQLBackend, "sqlite": SQLiteBackend}
@@ -0,0 +1,374 @@
+# benchmark.py
+"""db.py 的基准测试：在专用的库中生成数据，逐个测量 db.py 公开函数的耗时
+
+    python benchmark.py --size 10k --output results/10k.json
+    python benchmark.py --size 10k --compare results/10k.json   # 与上次的结果比较
+
+数据写入单独的库（默认 movie_bench，不会改动 DB_CONFIG 中的正式库；
+SQLite 后端为 movie_bench.sqlite3 文件），
+同样的 --size 和 --seed 生成的数据相同，已生成过时直接复用。
+写操作只修改测试过程中新插入的记录，测完后数据规模不变。
+默认每次调用前清空读缓存，测量的是访问数据库的耗时；--warm 保留缓存。
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import re
+import sys
+import os
+import time
+
+import pymysql
+
+import datagen
+import db
+import query_stats
+
+BENCH_DATABASE = "movie_bench"
+SEARCH_WORDS = datagen.ZH_WORDS[:20] + datagen.EN_WORDS[:20]  # 搜索用的词（生成数据中的常用词）
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_ITERATIONS = 50  # 每个函数最多调用的次数
+DEFAULT_BUDGET = 10.0  # 每个函数最多测量的秒数（至少调用 MIN_SAMPLES 次）
+MIN_SAMPLES = 3
+REGRESSION_THRESHOLD = 0.10  # 比较时 p95 变慢超过该比例视为退化
+
+
+# 数据
+def dataset_counts(movies):
+    """各表的行数，按电影数的比例确定"""
+    return {
+        "movies": movies,
+        "people": movies * 2,
+        "companies": max(100, movies // 50),
+        "awards": max(50, movies // 1000),
+    }
+
+def _text(rng, words=8):
+    """写操作用的文本，与生成的数据一样中英文混排"""
+    return datagen.TextGenerator(rng).text(words, words)
+
+def use_database(name, recreate=False):
+    """把 db.py 指向基准测试专用的库（不存在时创建）并执行迁移"""
+    if not re.fullmatch(r"\w+", name):
+        raise ValueError(f"库名无效: {name}")
+    if db.get_backend().name == "sqlite":
+        path = f"{name}.sqlite3"
+        if os.path.abspath(path) == os.path.abspath(db.SQLITE_PATH):
+            raise ValueError("基准测试会写入大量数据，不能使用 MOVIE_DB_PATH 中的正式库")
+        if recreate:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        db.configure_backend("sqlite", path)
+        db.init_database()
+        return
+    config = dict(db.DB_CONFIG)
+    if name == config.pop("database"):
+        raise ValueError("基准测试会写入大量数据，不能使用 DB_CONFIG 中的正式库")
+    conn = pymysql.connect(**config)
+    try:
+        with conn.cursor() as cursor:
+            if recreate:
+                cursor.execute(f"DROP DATABASE IF EXISTS `{name}`")
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{name}` CHARACTER SET utf8mb4")
+    finally:
+        conn.close()
+    db.DB_CONFIG["database"] = name
+    db.configure_pool()
+    db.clear_caches()
+    db.init_database()
+
+def seed(movies, seed_value, progress=print):
+    """生成 movies 部电影规模的数据；库中已有同样规模的数据时跳过"""
+    with db.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS n FROM Movies")
+        existing = cursor.fetchone()['n']
+    if existing == movies:
+        progress(f"已有 {movies} 部电影的数据，跳过生成")
+        return
+    if existing:
+        raise RuntimeError(f"库中已有 {existing} 部电影，与 --size 不一致，请加 --reseed 重新生成")
+    generator = datagen.DataGenerator(dataset_counts(movies), seed=seed_value)
+    for entity, stats in datagen.load(generator).items():
+        progress(f"{entity}: {stats}")
+    with db.connection() as conn, conn.cursor() as cursor:
+        db.get_backend().analyze(cursor, ("Movies", "People", "Companies", "Awards",
+                                          "Movie_Actors", "Movie_Companies", "Movie_Awards", "People_Awards"))
+        conn.commit()
+
+
+# 测量
+def percentile(sorted_samples, p):
+    """线性插值的百分位数"""
+    if not sorted_samples:
+        return 0.0
+    position = (len(sorted_samples) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+def summarize(name, group, samples, rows):
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        "name": name,
+        "group": group,
+        "samples": len(samples),
+        "mean_ms": total / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "min_ms": ordered[0] * 1000 if ordered else 0.0,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "ops_per_second": len(samples) / total if total else 0.0,
+        "rows_per_call": rows / len(samples) if samples else 0.0,
+    }
+
+
+class Runner:
+    """按名称逐个测量，结果汇总在 results 中"""
+    def __init__(self, iterations=DEFAULT_ITERATIONS, budget=DEFAULT_BUDGET, warm=False, only=None, progress=print):
+        self.iterations = iterations
+        self.budget = budget
+        self.warm = warm
+        self.only = only
+        self.progress = progress
+        self.results = []
+
+    def wanted(self, name):
+        return not self.only or any(part in name for part in self.only)
+
+    def measure(self, name, group, call, prepare=None, collect=None, iterations=None):
+        """调用 call(*prepare(i)) 并计时，prepare 不计入耗时
+
+        返回每次调用的 collect(结果)（没有 collect 时为 None），不保留结果本身。
+        """
+        iterations = self.iterations if iterations is None else min(iterations, self.iterations)
+        if not self.wanted(name) or iterations <= 0:
+            return []
+        samples, results, rows = [], [], 0
+        started = time.perf_counter()
+        for i in range(iterations):
+            args = prepare(i) if prepare else ()
+            if not self.warm:
+                db.clear_caches()
+            call_started = time.perf_counter()
+            result = call(*args)
+            samples.append(time.perf_counter() - call_started)
+            if isinstance(result, (list, dict)):
+                rows += len(result)
+            results.append(collect(result) if collect else None)
+            del result
+            if time.perf_counter() - started > self.budget and len(samples) >= MIN_SAMPLES:
+                break
+        summary = summarize(name, group, samples, rows)
+        self.results.append(summary)
+        self.progress(f"{name:<40} p50 {summary['p50_ms']:9.2f} ms  p95 {summary['p95_ms']:9.2f} ms  "
+                      f"p99 {summary['p99_ms']:9.2f} ms  {summary['ops_per_second']:9.1f} 次/秒")
+        return results
+
+
+def _id_range(table):
+    pk = db.PAGE_TABLES[table][0]
+    with db.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({pk}) AS low, MAX({pk}) AS high FROM {table}")
+        row = cursor.fetchone()
+    if row['low'] is None:
+        raise RuntimeError(f"{table} 中没有数据，请先生成数据")
+    return row['low'], row['high']
+
+def run_reads(runner, rng):
+    ranges = {table: _id_range(table) for table in ("Movies", "People", "Companies", "Awards")}
+
+    def random_id(table):
+        return rng.randint(*ranges[table])
+
+    def random_ids(table, count=100):
+        return [random_id(table) for _ in range(count)]
+
+    for fetch_all in (db.fetch_all_movies, db.fetch_all_people, db.fetch_all_companies, db.fetch_all_awards):
+        runner.measure(fetch_all.__name__, "fetch_all", fetch_all)
+    for table in ("Movies", "People", "Companies", "Awards"):
+        runner.measure(f"fetch_page({table})", "page", lambda t=table: db.fetch_page(t))
+        runner.measure(f"fetch_page({table}, 续页)", "page", lambda t=table: db.fetch_page(t, random_id(t)))
+        runner.measure(f"fetch_rows({table}, 100)", "page", lambda t=table: db.fetch_rows(t, random_ids(t)))
+        runner.measure(f"search({table})", "search", lambda t=table: db.search(t, rng.choice(SEARCH_WORDS)))
+
+    runner.measure("get_movie_details", "details", lambda: db.get_movie_details(random_id("Movies")))
+    runner.measure("get_person_details", "details", lambda: db.get_person_details(random_id("People")))
+    runner.measure("get_movie_details_many(100)", "details",
+                   lambda: db.get_movie_details_many(random_ids("Movies")))
+    runner.measure("get_person_details_many(100)", "details",
+                   lambda: db.get_person_details_many(random_ids("People")))
+    runner.measure("get_movie_actors", "details", lambda: db.get_movie_actors(random_id("Movies")))
+    runner.measure("get_actor_movies", "details", lambda: db.get_actor_movies(random_id("People")))
+    runner.measure("get_movie_awards", "details", lambda: db.get_movie_awards(random_id("Movies")))
+    runner.measure("get_person_awards", "details", lambda: db.get_person_awards(random_id("People")))
+    runner.measure("get_movie_companies", "details", lambda: db.get_movie_companies(random_id("Movies")))
+
+    runner.measure("get_movies_summary", "summary", db.get_movies_summary)
+    runner.measure("get_people_summary", "summary", db.get_people_summary)
+    runner.measure("get_companies_summary", "summary", db.get_companies_summary)
+    runner.measure("get_person_awards_summary(100)", "summary", lambda: db.get_person_awards_summary(limit=100))
+    runner.measure("get_movie_awards_summary(100)", "summary", lambda: db.get_movie_awards_summary(limit=100))
+    runner.measure("get_person_awards_summary(id)", "summary",
+                   lambda: db.get_person_awards_summary(random_id("People")))
+    runner.measure("get_movie_awards_summary(id)", "summary",
+                   lambda: db.get_movie_awards_summary(random_id("Movies")))
+
+    runner.measure("tail_operation_logs", "logs", lambda: db.tail_operation_logs(None, 500))
+    runner.measure("get_operation_logs", "logs", db.get_operation_logs)
+    runner.measure("get_all_ui_settings", "settings", db.get_all_ui_settings)
+
+# 写操作：(表, 插入函数, 更新函数, 删除函数, 批量删除函数, 生成字段的函数)
+WRITE_CASES = (
+    ("Movies", db.insert_movie, db.update_movie_with_procedure, db.delete_movie_with_transaction, db.delete_movies,
+     lambda rng, i: (f"Bench Movie {i} {_text(rng, 2)}", rng.randint(1950, 2024), "Bench Director",
+                     rng.choice(datagen.GENRES), round(rng.uniform(1e5, 1e9), 2), _text(rng, 24))),
+    ("People", db.insert_person, db.update_person_with_procedure, db.delete_person_with_transaction, db.delete_people,
+     lambda rng, i: (f"Bench Person {i}", rng.choice(datagen.COUNTRIES), "Bench Movie", _text(rng, 16))),
+    ("Companies", db.insert_company, db.update_company_with_procedure, db.delete_company_with_transaction,
+     db.delete_companies,
+     lambda rng, i: (f"Bench Company {i}", rng.choice(datagen.COUNTRIES), rng.randint(1900, 2020), "电影",
+                     round(rng.uniform(1e6, 1e10), 2), _text(rng))),
+    ("Awards", db.insert_award, db.update_award_with_procedure, db.delete_award_with_transaction, db.delete_awards,
+     lambda rng, i: (f"Bench Award {i}", rng.choice(datagen.GENRES), rng.randint(1950, 2024), _text(rng))),
+)
+BULK_DELETE_SIZE = 50
+
+def run_writes(runner, rng):
+    for table, insert, update, delete, delete_many, fields in WRITE_CASES:
+        pk = db.PAGE_TABLES[table][0]
+        inserted = runner.measure(insert.__name__, "insert", insert,
+                                  prepare=lambda i: fields(rng, i), collect=lambda row: row[pk])
+        runner.measure(update.__name__, "update", update,
+                       prepare=lambda i: (inserted[i],) + fields(rng, i), iterations=len(inserted))
+        deleted = runner.measure(delete.__name__, "delete", delete,
+                                 prepare=lambda i: (inserted[i],), iterations=len(inserted))
+        # 测量时间用完（或没有测量删除）时，剩下的记录不计时删除
+        if len(deleted) < len(inserted):
+            delete_many(inserted[len(deleted):])
+
+        def prepare_bulk(i, insert=insert, fields=fields, pk=pk):
+            return ([insert(*fields(rng, i))[pk] for _ in range(BULK_DELETE_SIZE)],)
+        runner.measure(f"{delete_many.__name__}({BULK_DELETE_SIZE})", "delete", delete_many,
+                       prepare=prepare_bulk, iterations=max(MIN_SAMPLES, runner.iterations // 10))
+
+    # 批量添加关系：每次给一部新电影添加 20 位演员和 2 个公司
+    people = _id_range("People")
+    companies = _id_range("Companies")
+    movie_fields = WRITE_CASES[0][5]
+    scratch = []
+
+    def new_movie(i):
+        movie_id = db.insert_movie(*movie_fields(rng, i))['movie_id']
+        scratch.append(movie_id)
+        return movie_id
+
+    def prepare_actors(i):
+        movie_id = new_movie(i)
+        return ([(movie_id, people_id, f"Role {k}", k == 0)
+                 for k, people_id in enumerate(rng.sample(range(people[0], people[1] + 1), 20))],)
+
+    def prepare_companies(i):
+        movie_id = new_movie(i)
+        return ([(movie_id, company_id, "制作")
+                 for company_id in rng.sample(range(companies[0], companies[1] + 1), 2)],)
+
+    runner.measure("add_movie_actors(20)", "links", db.add_movie_actors, prepare=prepare_actors)
+    runner.measure("add_movie_companies(2)", "links", db.add_movie_companies, prepare=prepare_companies)
+    if scratch:
+        db.delete_movies(scratch)
+
+    runner.measure("save_ui_setting", "settings", db.save_ui_setting,
+                   prepare=lambda i: (f"bench_{i % 10}", _text(rng)))
+    runner.measure("get_ui_setting", "settings", db.get_ui_setting, prepare=lambda i: (f"bench_{i % 10}",))
+    for i in range(10):
+        db.delete_ui_setting(f"bench_{i}")
+
+
+# 结果
+def server_version():
+    with db.connection() as conn, conn.cursor() as cursor:
+        return db.get_backend().version(cursor)
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, output=print):
+    """与基线结果比较，输出 p50/p95 的变化，返回 p95 变慢超过 threshold 的函数名"""
+    old = {item['name']: item for item in baseline['results']}
+    regressions = []
+    output(f"{'函数':<40} {'p50 变化':>10} {'p95 变化':>10}")
+    for item in results:
+        before = old.get(item['name'])
+        if before is None or not before['p50_ms'] or not before['p95_ms']:
+            continue
+        p50 = item['p50_ms'] / before['p50_ms'] - 1
+        p95 = item['p95_ms'] / before['p95_ms'] - 1
+        flag = ""
+        if p95 > threshold:
+            regressions.append(item['name'])
+            flag = "  <- 变慢"
+        output(f"{item['name']:<40} {p50:>+10.1%} {p95:>+10.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="db.py 基准测试")
+    parser.add_argument("--size", choices=sorted(SIZES), default="10k", help="数据规模（电影数）")
+    parser.add_argument("--seed", type=int, default=42, help="生成数据和选取测试ID用的随机种子")
+    parser.add_argument("--database", default=BENCH_DATABASE, help="测试用的库（会被写入数据）")
+    parser.add_argument("--reseed", action="store_true", help="删除测试库并重新生成数据")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="每个函数最多调用的次数")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="每个函数最多测量的秒数")
+    parser.add_argument("--warm", action="store_true", help="保留读缓存（默认每次调用前清空）")
+    parser.add_argument("--only", nargs="*", help="只测量名称中包含这些字符串的函数")
+    parser.add_argument("--skip-writes", action="store_true", help="不测量写操作")
+    parser.add_argument("--output", help="结果保存为 JSON")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="p95 变慢超过该比例时返回非零")
+    args = parser.parse_args()
+
+    try:
+        use_database(args.database, recreate=args.reseed)
+        seed(SIZES[args.size], args.seed)
+        query_stats.reset_stats()
+        runner = Runner(args.iterations, args.budget, args.warm, args.only)
+        rng = random.Random(args.seed)
+        run_reads(runner, rng)
+        if not args.skip_writes:
+            run_writes(runner, rng)
+        report = {
+            "meta": {
+                "size": args.size,
+                "movies": SIZES[args.size],
+                "seed": args.seed,
+                "iterations": args.iterations,
+                "budget": args.budget,
+                "warm": args.warm,
+                "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "database": server_version(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "results": runner.results,
+            "queries": query_stats.top_queries(20),
+        }
+    finally:
+        db.close_pool()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('size') != args.size:
+            print(f"注意：基线的数据规模是 {baseline['meta'].get('size')}")
+        regressions = compare(runner.results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} 个函数的 p95 变慢超过 {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+# datagen.py
+"""生成用于压力测试的模拟数据
+
+同样的种子和规模生成的数据完全相同（每张表用各自的随机数序列，
+改变电影数不会影响人物、公司和奖项的数据）。关系的数量服从类 Zipf 分布：
+少数热门电影有很长的演员表，大部分电影只有几位演员；热门演员、公司和奖项
+出现的次数也远多于其他的。标题、简介等文本中英文混排，词频同样是长尾分布，
+让全文索引和排序规则的开销接近真实数据。
+
+生成的记录是 importer 的字典格式，可以直接流式导入（load），
+也可以写成 JSONL 文件（write_jsonl）之后用 import_data.py 导入。
+"""
+import itertools
+import json
+import os
+import random
+from bisect import bisect_left
+
+from importer import DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_INTERVAL, RELATIONSHIP_TYPES, import_records
+
+# 默认规模
+DEFAULT_COUNTS = {"movies": 10000, "people": 20000, "companies": 500, "awards": 200}
+
+# 关系的数量：(有该关系的概率, 最多几条, Zipf 指数)；指数越小，长列表越多
+DEFAULT_FANOUT = {
+    "actors": (1.0, 200, 1.8),  # 每部电影的演员：平均约5位，约2%的电影超过50位
+    "companies": (0.95, 8, 1.8),  # 每部电影的制作/发行公司
+    "movie_awards": (0.08, 20, 1.6),  # 每部电影的获奖
+    "people_awards": (0.04, 15, 1.8),  # 每个人物的获奖
+}
+POPULARITY_EXPONENT = 0.8  # 选取演员、公司、奖项、导演时的热门程度
+WORD_EXPONENT = 1.0  # 文本用词的长尾程度
+
+ZH_WORDS = (
+    "电影", "故事", "城市", "少年", "英雄", "家庭", "梦想", "战争", "青春", "未来",
+    "爱情", "秘密", "时间", "夜晚", "河流", "冬天", "光明", "回家", "道路", "记忆",
+    "母亲", "父亲", "兄弟", "朋友", "命运", "追逐", "逃离", "孤独", "希望", "真相",
+    "江湖", "侦探", "警察", "学校", "医院", "海边", "山村", "列车", "星球", "机器人",
+    "导演", "演员", "舞台", "音乐", "画家", "厨师", "将军", "皇帝", "侠客", "少女",
+)
+EN_WORDS = (
+    "love", "night", "city", "dream", "story", "river", "winter", "light", "home", "road",
+    "secret", "time", "memory", "mother", "father", "brother", "friend", "fate", "chase", "escape",
+    "lonely", "hope", "truth", "detective", "police", "school", "hospital", "ocean", "village", "train",
+    "planet", "robot", "stage", "music", "painter", "chef", "general", "emperor", "hero", "girl",
+    "the", "of", "and", "in", "a", "last", "first", "lost", "new", "great",
+)
+SURNAMES = ("王", "李", "张", "刘", "陈", "杨", "黄", "赵", "周", "吴", "徐", "孙", "马", "朱", "胡", "林", "郭", "何")
+GIVEN_CHARS = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰红建文斌宇浩凯晨瑶琳雪梅"
+FIRST_NAMES = ("James", "Mary", "John", "Linda", "Robert", "Emma", "Michael", "Olivia", "David", "Sophia",
+               "Tom", "Lucy", "Chris", "Anna", "Daniel", "Grace", "Kevin", "Chloe", "Ryan", "Mia")
+LAST_NAMES = ("Smith", "Johnson", "Brown", "Miller", "Davis", "Wilson", "Moore", "Taylor", "Anderson", "Clark",
+              "Lee", "Walker", "Young", "King", "Wright", "Scott", "Green", "Baker", "Adams", "Hill")
+GENRES = ("剧情", "喜剧", "动作", "爱情", "科幻", "动画", "悬疑", "惊悚", "纪录片", "犯罪", "Drama", "Comedy")
+COUNTRIES = ("中国", "美国", "日本", "韩国", "法国", "英国", "德国", "印度", "意大利", "西班牙")
+INDUSTRIES = ("电影制作", "电影发行", "流媒体", "Film Production", "Distribution")
+AWARD_CATEGORIES = ("最佳影片", "最佳导演", "最佳男主角", "最佳女主角", "最佳剧本", "Best Picture", "Best Director")
+AWARD_NAMES = ("金马奖", "金鸡奖", "百花奖", "金像奖", "Academy Award", "Golden Globe", "BAFTA", "Palme d'Or")
+
+
+class ZipfSampler:
+    """从 0..n-1 中按 P(k) ∝ 1/(k+1)^s 抽样，0 最常被抽到"""
+    def __init__(self, n, exponent, rng):
+        if n < 1:
+            raise ValueError("抽样范围不能为空")
+        self.n = n
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate((k + 1) ** -exponent for k in range(n)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self):
+        return min(bisect_left(self.cum_weights, self.rng.random() * self.total), self.n - 1)
+
+    def sample_many(self, k):
+        return [self.sample() for _ in range(k)]
+
+    def sample_distinct(self, k):
+        """抽取 k 个不同的值（k 不超过 n）"""
+        k = min(k, self.n)
+        chosen = dict.fromkeys(self.sample_many(k))
+        while len(chosen) < k:
+            chosen.update(dict.fromkeys(self.sample_many(k - len(chosen))))
+        return list(chosen)
+
+
+class TextGenerator:
+    """中英文混排的文本，中文词之间不加空格"""
+    def __init__(self, rng, exponent=WORD_EXPONENT):
+        self.rng = rng
+        # 中英文词交错排列，让两种语言都有高频词
+        self.words = tuple(word for pair in itertools.zip_longest(ZH_WORDS, EN_WORDS) for word in pair if word)
+        self.sampler = ZipfSampler(len(self.words), exponent, rng)
+
+    def text(self, min_words, max_words):
+        words = [self.words[i] for i in self.sampler.sample_many(self.rng.randint(min_words, max_words))]
+        parts = [words[0]]
+        for previous, word in zip(words, words[1:]):
+            if not (previous.isascii() or word.isascii()):
+                parts.append(word)
+            else:
+                parts.append(" " + word)
+        return "".join(parts)
+
+    def title(self):
+        return self.text(1, 4)
+
+
+def _unique(name, used):
+    """同名时加上序号，保证导入时按名称能找到唯一的记录"""
+    count = used.get(name, 0)
+    used[name] = count + 1
+    return name if count == 0 else f"{name}{count + 1}"
+
+def _person_name(rng):
+    if rng.random() < 0.7:
+        return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_CHARS) for _ in range(rng.randint(1, 2)))
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _award_name(rng):
+    return rng.choice(AWARD_NAMES) + rng.choice(AWARD_CATEGORIES)
+
+def _company_name(rng):
+    return TextGenerator(rng).title() + rng.choice(("影业", "传媒", " Pictures", " Studios"))
+
+
+class DataGenerator:
+    """按种子生成各表的记录
+
+    人物、公司、奖项的名称用单独的随机数序列生成，电影和人物的关系列按名称引用它们；
+    导入时需要先导入被引用的表（records 按依赖顺序返回）。
+    """
+    ENTITIES = ("awards", "companies", "people", "movies")
+    NAME_MAKERS = {"awards": _award_name, "companies": _company_name, "people": _person_name}
+
+    def __init__(self, counts=None, seed=42, fanout=None):
+        self.counts = dict(DEFAULT_COUNTS, **(counts or {}))
+        self.seed = seed
+        self.fanout = dict(DEFAULT_FANOUT, **(fanout or {}))
+        self._name_lists = {}
+
+    def _rng(self, entity):
+        return random.Random(f"{self.seed}:{entity}")
+
+    def names(self, entity):
+        """entity 的全部名称（按生成顺序，互不相同）"""
+        if entity not in self._name_lists:
+            rng = self._rng(entity + ":names")
+            make_name = self.NAME_MAKERS[entity]
+            used = {}
+            self._name_lists[entity] = [_unique(make_name(rng), used) for _ in range(self.counts[entity])]
+        return self._name_lists[entity]
+
+    def _fanout(self, rng):
+        """返回 fanout(kind)：按 self.fanout 抽取一条记录某种关系的数量"""
+        samplers = {}
+
+        def fanout(kind):
+            probability, most, exponent = self.fanout[kind]
+            if most < 1 or rng.random() >= probability:
+                return 0
+            if kind not in samplers:
+                samplers[kind] = ZipfSampler(most, exponent, rng)
+            return samplers[kind].sample() + 1
+        return fanout
+
+    def awards(self):
+        rng = self._rng("awards")
+        text = TextGenerator(rng)
+        for name in self.names("awards"):
+            yield {"name": name, "category": rng.choice(AWARD_CATEGORIES),
+                   "year": rng.randint(1950, 2024), "description": text.text(8, 30)}
+
+    def companies(self):
+        rng = self._rng("companies")
+        text = TextGenerator(rng)
+        for name in self.names("companies"):
+            yield {"name": name, "country": rng.choice(COUNTRIES), "founded_year": rng.randint(1900, 2020),
+                   "industry": rng.choice(INDUSTRIES), "revenue": round(rng.lognormvariate(18, 2), 2),
+                   "description": text.text(10, 40)}
+
+    def people(self):
+        rng = self._rng("people")
+        fanout = self._fanout(rng)
+        text = TextGenerator(rng)
+        award_names = self.names("awards")
+        awards = ZipfSampler(len(award_names), POPULARITY_EXPONENT, rng) if award_names else None
+        for name in self.names("people"):
+            record = {"name": name, "country": rng.choice(COUNTRIES),
+                      "masterpiece": text.title(), "brief_intro": text.text(10, 60)}
+            count = fanout("people_awards") if awards else 0
+            if count:
+                record["awards"] = [{"name": award_names[i], "award_year": rng.randint(1950, 2024)}
+                                    for i in awards.sample_many(count)]
+            yield record
+
+    def movies(self):
+        rng = self._rng("movies")
+        fanout = self._fanout(rng)
+        text = TextGenerator(rng)
+        people = self.names("people")
+        companies = self.names("companies")
+        award_names = self.names("awards")
+        popular_people = ZipfSampler(len(people), POPULARITY_EXPONENT, rng) if people else None
+        popular_companies = ZipfSampler(len(companies), POPULARITY_EXPONENT, rng) if companies else None
+        popular_awards = ZipfSampler(len(award_names), POPULARITY_EXPONENT, rng) if award_names else None
+        for _ in range(self.counts["movies"]):
+            record = {"title": text.title(), "release_year": rng.randint(1950, 2024),
+                      "director": people[popular_people.sample()] if people else None,
+                      "genre": rng.choice(GENRES), "box_office": round(rng.lognormvariate(16, 2), 2),
+                      "description": text.text(20, 120)}
+            if popular_people:
+                cast = popular_people.sample_distinct(fanout("actors"))
+                record["actors"] = [{"name": people[i], "role": text.title(), "is_protagonist": k < 2}
+                                    for k, i in enumerate(cast)]
+            if popular_companies:
+                record["companies"] = [{"name": companies[i], "relationship_type": rng.choice(RELATIONSHIP_TYPES)}
+                                       for i in popular_companies.sample_distinct(fanout("companies"))]
+            if popular_awards:
+                count = fanout("movie_awards")
+                if count:
+                    record["awards"] = [{"name": award_names[i], "award_year": rng.randint(1950, 2024)}
+                                        for i in popular_awards.sample_many(count)]
+            yield record
+
+    def records(self):
+        """按依赖顺序返回 (实体, 记录的迭代器)；需要按顺序逐个读完"""
+        for entity in self.ENTITIES:
+            yield entity, getattr(self, entity)()
+
+
+def load(generator, batch_size=DEFAULT_BATCH_SIZE, commit_interval=DEFAULT_COMMIT_INTERVAL, progress=None):
+    """把生成的数据直接流式导入数据库，返回 {实体: ImportStats}
+
+    各表共用一份名称缓存：刚导入的人物、公司、奖项的ID直接从缓存中取，
+    导入电影的关系时不用再按名称查询。
+    """
+    name_cache = {}
+    results = {}
+    for entity, records in generator.records():
+        results[entity] = import_records(
+            entity, records, batch_size, commit_interval,
+            progress=(lambda stats, entity=entity: progress(entity, stats)) if progress else None,
+            name_cache=name_cache)
+    return results
+
+def write_jsonl(generator, directory):
+    """写成 <实体>.jsonl 文件，返回 {实体: 行数}"""
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for entity, records in generator.records():
+        count = 0
+        with open(os.path.join(directory, f"{entity}.jsonl"), "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        counts[entity] = count
+    return counts
@@ -1,712 +1,1054 @@
 # db.py
-import pymysql
+import copy
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from backends import BACKENDS, MySQLBackend, SQLiteBackend
+from migrations import AWARD_TOTALS, LINK_LOG_OPERATIONS
+from query_stats import record_connect
+
+# 数据库连接参数，从环境变量读取：
+#   MOVIE_DB_BACKEND   mysql（默认）或 sqlite
+#   MOVIE_DB_HOST、MOVIE_DB_PORT、MOVIE_DB_USER、MOVIE_DB_PASSWORD、MOVIE_DB_NAME   MySQL 的连接参数
+#   MOVIE_DB_PATH      SQLite 的数据库文件（默认 movies.sqlite3）
+DB_CONFIG = {
+    "host": os.environ.get("MOVIE_DB_HOST", "localhost"),
+    "port": int(os.environ.get("MOVIE_DB_PORT", "3306")),
+    "user": os.environ.get("MOVIE_DB_USER", "root"),
+    "password": os.environ.get("MOVIE_DB_PASSWORD", "123456"),
+    "database": os.environ.get("MOVIE_DB_NAME", "test01"),
+    "charset": "utf8mb4",
+}
+SQLITE_PATH = os.environ.get("MOVIE_DB_PATH", "movies.sqlite3")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def _create_backend(name, path=None):
+    if name not in BACKENDS:
+        raise ValueError(f"未知的数据库后端: {name}（可选 {', '.join(BACKENDS)}）")
+    if name == "sqlite":
+        return SQLiteBackend(path or SQLITE_PATH)
+    return MySQLBackend(DB_CONFIG)
+
+def get_backend():
+    """当前使用的存储后端（见 backends.py），首次调用时按 MOVIE_DB_BACKEND 创建"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(os.environ.get("MOVIE_DB_BACKEND", "mysql"))
+        return _backend
+
+def configure_backend(name, path=None):
+    """切换存储后端（mysql 或 sqlite，path 为 SQLite 的数据库文件），
+    关闭原来的连接池并清空读缓存"""
+    global _backend
+    backend = _create_backend(name, path)
+    with _backend_lock:
+        _backend = backend
+    close_pool()
+    clear_caches()
+    return backend
 
 def get_connection():
-    return pymysql.connect(
-        host="localhost",
-        user="root",
-        password="123456",
-        database="test01",
-        charset="utf8mb4",
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    """新建一个数据库连接（一般请通过 connection() 从连接池获取）
+
+    游标默认带统计（query_stats.InstrumentedCursor 或 SQLite 的对应游标），
+    每条查询的耗时记录在 query_stats 中。
+    """
+    started = time.perf_counter()
+    conn = get_backend().connect()
+    record_connect(time.perf_counter() - started)
+    return conn
+
+# 连接池
+DEFAULT_POOL_MAX_SIZE = 10
+
+class PoolTimeoutError(Exception):
+    """在等待时间内没有可用的连接"""
+
+
+class ConnectionPool:
+    """线程安全的数据库连接池
+
+    参数:
+        factory: 新建连接的函数
+        backend: 连接所属的存储后端，用于检查连接状态；默认为 get_backend()
+        min_size: 池中至少保留的连接数
+        max_size: 最多同时存在的连接数（包括已借出的）
+        idle_timeout: 空闲超过该秒数的连接会被回收（保留 min_size 个）
+        ping_interval: 空闲超过该秒数的连接在借出前先 ping 检查，断开时自动重连
+        checkout_timeout: 连接耗尽时最多等待的秒数
+    """
+    def __init__(self, factory=get_connection, min_size=1, max_size=DEFAULT_POOL_MAX_SIZE,
+                 idle_timeout=300, ping_interval=30, checkout_timeout=30, backend=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("连接池大小配置无效")
+        self.factory = factory
+        self.backend = backend or get_backend()
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (连接, 归还时间)，右端是最近归还的
+        self._size = 0  # 已创建且未关闭的连接数
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "creations": 0,
+            "pings": 0,
+            "evictions": 0,
+            "discards": 0,
+        }
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append((self._create(), time.monotonic()))
+
+    def _create(self):
+        conn = self.factory()
+        with self._cond:
+            self._stats["creations"] += 1
+        return conn
+
+    def _release_slot(self, count=1):
+        with self._cond:
+            self._size -= count
+            self._cond.notify(count)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self):
+        """回收空闲过久的连接，返回需要在锁外关闭的连接"""
+        expired = []
+        now = time.monotonic()
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0][1] > self.idle_timeout):
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        self._stats["evictions"] += len(expired)
+        return expired
+
+    def acquire(self):
+        """借出一个连接，连接耗尽时最多等待 checkout_timeout 秒"""
+        conn = None
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("连接池已关闭")
+            self._stats["checkouts"] += 1
+            expired = self._evict_idle_locked()
+            wait_start = None
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                now = time.monotonic()
+                if wait_start is None:
+                    wait_start = now
+                    self._stats["waits"] += 1
+                remaining = wait_start + self.checkout_timeout - now
+                if remaining <= 0:
+                    self._stats["wait_time"] += now - wait_start
+                    raise PoolTimeoutError(f"{self.checkout_timeout} 秒内没有可用的数据库连接")
+                self._cond.wait(remaining)
+            if wait_start is not None:
+                self._stats["wait_time"] += time.monotonic() - wait_start
+
+        for old in expired:
+            self._close_quietly(old)
+
+        if conn is None:
+            try:
+                return self._create()
+            except Exception:
+                self._release_slot()
+                raise
+
+        if time.monotonic() - last_used >= self.ping_interval:
+            try:
+                with self._cond:
+                    self._stats["pings"] += 1
+                self.backend.ping(conn)
+            except Exception:
+                # 重连失败则换一个新连接，仍失败就把异常抛给调用方
+                self._close_quietly(conn)
+                with self._cond:
+                    self._stats["discards"] += 1
+                try:
+                    return self._create()
+                except Exception:
+                    self._release_slot()
+                    raise
+        return conn
+
+    def release(self, conn, discard=False):
+        """归还连接；未结束的事务会被回滚，discard=True 时直接关闭该连接"""
+        if not discard:
+            try:
+                if not self.backend.is_open(conn):
+                    discard = True
+                elif self.backend.in_transaction(conn):
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                self._stats["discards"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            expired = self._evict_idle_locked()
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_quietly(conn)
+        for old in expired:
+            self._close_quietly(old)
+
+    @contextmanager
+    def connection(self):
+        """以上下文管理器的方式借用连接，退出时自动归还"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException as e:
+            broken = self.backend.is_disconnect(e, conn)
+            self.release(conn, discard=broken)
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self):
+        """返回连接池统计信息"""
+        with self._cond:
+            result = dict(self._stats)
+            result.update(size=self._size, idle=len(self._idle),
+                          in_use=self._size - len(self._idle),
+                          min_size=self.min_size, max_size=self.max_size)
+        return result
+
+    def grow(self, max_size):
+        """把 max_size 提高到至少 max_size，不影响已有的连接；正在等待连接的线程随即可以新建连接"""
+        with self._cond:
+            if max_size > self.max_size:
+                self._cond.notify(max_size - self.max_size)
+                self.max_size = max_size
+
+    def close(self):
+        """关闭所有空闲连接，已借出的连接在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+
+_pool = None
+_pool_options = {}
+_pool_lock = threading.Lock()
+
+def configure_pool(**options):
+    """设置连接池参数（min_size、max_size、idle_timeout、ping_interval、checkout_timeout），
+    下次取连接时按新参数重建连接池"""
+    global _pool
+    with _pool_lock:
+        _pool_options.update(options)
+        old, _pool = _pool, None
+    if old is not None:
+        old.close()
+
+def reserve_pool_size(max_size):
+    """保证全局连接池的 max_size 至少为 max_size（如 async_db 的并发调用数）
+
+    与 configure_pool 不同，不重建连接池：已有的连接和正在使用它们的调用不受影响，
+    max_size 已经足够时什么也不做。
+    """
+    with _pool_lock:
+        if max_size > _pool_options.get("max_size", DEFAULT_POOL_MAX_SIZE):
+            _pool_options["max_size"] = max_size
+        if _pool is not None:
+            _pool.grow(max_size)
+
+def get_pool():
+    """获取全局连接池（首次调用时创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(**_pool_options)
+        return _pool
+
+def close_pool():
+    """关闭全局连接池"""
+    configure_pool()
+
+def get_pool_stats():
+    """返回全局连接池的统计信息（借出次数、等待次数、新建连接数等）"""
+    return get_pool().stats()
+
+_local = threading.local()
+
+@contextmanager
+def using_pool(pool):
+    """在当前线程中临时改用另一个连接池（如 index_advisor 记录查询用的池），其他线程仍使用全局连接池"""
+    previous = getattr(_local, "pool", None)
+    _local.pool = pool
+    try:
+        yield pool
+    finally:
+        _local.pool = previous
+
+def connection():
+    """从连接池借用连接的上下文管理器，db.py 中所有操作都通过它访问数据库"""
+    pool = getattr(_local, "pool", None)
+    return (pool or get_pool()).connection()
+
+# 读缓存
+class QueryCache:
+    """线程安全的读缓存：按最近使用淘汰（LRU），条目超过 ttl 秒后过期
+
+    每个条目记录它的所属记录 owner=(表名, ID)（按ID查询时）和依赖的其他表 deps，
+    写操作通过 invalidate()/invalidate_owners() 删除受影响的条目。
+    """
+    def __init__(self, max_entries=256, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # 键 -> (过期时间, 值, owner, deps)
+        self._lock = threading.Lock()
+        self.generation = 0  # 每次失效加1，用来丢弃失效前开始的查询结果
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        """返回 (是否命中, 值)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return False, None
+
+    def put(self, key, value, owner=None, deps=(), generation=None):
+        """保存查询结果；generation 与当前不一致时说明查询期间数据有变化，不保存"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value, owner, frozenset(deps))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def discard(self, predicate):
+        """删除 predicate(owner, deps) 为真的条目"""
+        with self._lock:
+            self.generation += 1
+            stale = [key for key, (_, _, owner, deps) in self._entries.items() if predicate(owner, deps)]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        self.discard(lambda owner, deps: True)
+
+    def stats(self):
+        with self._lock:
+            result = dict(self._stats)
+            result.update(entries=len(self._entries), max_entries=self.max_entries, ttl=self.ttl)
+        return result
+
+
+# 每个实体一个缓存：按ID查询的结果放在所属实体的缓存中，不按ID的查询放在主表的缓存中
+CACHES = {
+    "Movies": QueryCache(),
+    "People": QueryCache(),
+    "Companies": QueryCache(),
+    "Awards": QueryCache(),
+}
+
+def cached(table, deps=(), by_id=False):
+    """读缓存装饰器
+
+    参数:
+        table: 主表（使用该表的缓存）
+        deps: 结果中还包含哪些表的数据，这些表的任何记录变化时都会使结果失效
+        by_id: 第一个参数是 table 的记录ID；该记录本身或它的关系变化时结果失效
+    """
+    def decorate(func):
+        def lookup(*args):
+            """只查缓存，返回 (是否命中, 结果, 查询前的世代)；未命中时查询后用 store() 保存"""
+            cache = CACHES[table]
+            generation = cache.generation
+            found, value = cache.get((func.__name__,) + args)
+            # 返回副本，调用方修改结果不会影响缓存
+            return found, copy.deepcopy(value) if found else None, generation
+
+        def store(generation, args, value):
+            owner = (table, args[0]) if by_id else None
+            CACHES[table].put((func.__name__,) + args, value, owner, (table,) + tuple(deps), generation)
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            found, value, generation = lookup(*args)
+            if not found:
+                value = func(*args)
+                store(generation, args, value)
+                value = copy.deepcopy(value)
+            return value
+        wrapper.uncached = func
+        wrapper.lookup = lookup
+        wrapper.store = store
+        return wrapper
+    return decorate
+
+def invalidate(table, record_id=None):
+    """table 的记录 record_id 被新增、修改或删除（record_id 为 None 表示不确定是哪些记录）
+
+    删除：该记录自己的条目、不按ID的 table 查询，以及依赖 table 的其他实体的条目。
+    """
+    invalidate_many(table, None if record_id is None else [record_id])
+
+def invalidate_many(table, record_ids):
+    """同 invalidate，一次处理多条记录"""
+    record_ids = None if record_ids is None else set(record_ids)
+    def stale(owner, deps):
+        if owner is None:
+            return table in deps
+        if owner[0] == table:
+            return record_ids is None or owner[1] in record_ids
+        return table in deps
+    for cache in CACHES.values():
+        cache.discard(stale)
+
+def invalidate_owners(*owners):
+    """这些记录的关系有变化（记录本身没变），只删除它们按ID查询的条目"""
+    owners = set(owners)
+    for cache in CACHES.values():
+        cache.discard(lambda owner, deps: owner in owners)
+
+LINK_OPERATIONS = frozenset(LINK_LOG_OPERATIONS.values())  # 关系表增删改的日志类型
+
+def invalidate_from_logs(logs):
+    """按 operation_logs 中的记录使缓存失效，用于感知其他客户端的修改
+
+    关系表的增删改按引用的实体写日志（operation_type 为 LINK_OPERATIONS 之一），
+    与本客户端修改关系时一样，只删除这些实体按ID查询的条目。
+    """
+    owners = set()
+    for log in logs:
+        if log['table_name'] not in CACHES:
+            continue
+        if log['operation_type'] in LINK_OPERATIONS:
+            owners.add((log['table_name'], log['record_id']))
+        else:
+            invalidate(log['table_name'], log['record_id'])
+    if owners:
+        invalidate_owners(*owners)
+
+def clear_caches():
+    for cache in CACHES.values():
+        cache.clear()
+
+def get_cache_stats():
+    """返回各实体缓存的命中、未命中、淘汰和失效次数"""
+    return {table: cache.stats() for table, cache in CACHES.items()}
 
 # 初始化数据库对象（创建表、触发器、存储过程和视图）
 def init_database():
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        # 创建电影表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Movies (
-                movie_id INT AUTO_INCREMENT PRIMARY KEY,
-                title VARCHAR(200) NOT NULL,
-                release_year INT,
-                director VARCHAR(100),
-                genre VARCHAR(50),
-                box_office DECIMAL(15,2),
-                description TEXT
-            )
-        """)
-        
-        # 创建公司表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Companies (
-                company_id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(200) NOT NULL,
-                country VARCHAR(100),
-                founded_year INT,
-                industry VARCHAR(100),
-                revenue DECIMAL(15,2),
-                description TEXT
-            )
-        """)
-
-        # 创建日志表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS operation_logs (
-                log_id INT AUTO_INCREMENT PRIMARY KEY,
-                operation_type VARCHAR(50),
-                table_name VARCHAR(50),
-                record_id INT,
-                operation_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # 创建奖项表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Awards (
-                award_id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(200) NOT NULL,
-                category VARCHAR(100),
-                year INT,
-                description TEXT
-            )
-        """)
-        
-        # 创建人物-奖项关系表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS People_Awards (
-                people_award_id INT AUTO_INCREMENT PRIMARY KEY,
-                people_id INT,
-                award_id INT,
-                award_year INT,
-                FOREIGN KEY (people_id) REFERENCES People(people_id) ON DELETE CASCADE,
-                FOREIGN KEY (award_id) REFERENCES Awards(award_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # 创建电影-奖项关系表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Movie_Awards (
-                movie_award_id INT AUTO_INCREMENT PRIMARY KEY,
-                movie_id INT,
-                award_id INT,
-                award_year INT,
-                FOREIGN KEY (movie_id) REFERENCES Movies(movie_id) ON DELETE CASCADE,
-                FOREIGN KEY (award_id) REFERENCES Awards(award_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # 创建电影-公司关系表（制作和发行）
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Movie_Companies (
-                movie_company_id INT AUTO_INCREMENT PRIMARY KEY,
-                movie_id INT,
-                company_id INT,
-                relationship_type ENUM('制作', '发行') NOT NULL,
-                FOREIGN KEY (movie_id) REFERENCES Movies(movie_id) ON DELETE CASCADE,
-                FOREIGN KEY (company_id) REFERENCES Companies(company_id) ON DELETE CASCADE
-            )
-        """)
-
-        # 创建演员-电影关系表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Movie_Actors (
-                movie_actor_id INT AUTO_INCREMENT PRIMARY KEY,
-                movie_id INT,
-                people_id INT,
-                role VARCHAR(100),  -- 角色名称
-                is_protagonist BOOLEAN DEFAULT FALSE,  -- 是否是主演
-                FOREIGN KEY (movie_id) REFERENCES Movies(movie_id) ON DELETE CASCADE,
-                FOREIGN KEY (people_id) REFERENCES People(people_id) ON DELETE CASCADE
-            )
-        """)
-
-        # 创建UI设置表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS UI_Settings (
-                setting_id INT AUTO_INCREMENT PRIMARY KEY,
-                setting_name VARCHAR(100) NOT NULL,
-                setting_value LONGTEXT,
-                setting_type VARCHAR(50),
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-        """)
-
-        # 创建触发器 - People表
-        cursor.execute("DROP TRIGGER IF EXISTS after_person_insert")
-        cursor.execute("""
-            CREATE TRIGGER after_person_insert
-            AFTER INSERT ON People
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('INSERT', 'People', NEW.people_id);
-            END
-        """)
-        
-        # 创建触发器 - Movies表
-        cursor.execute("DROP TRIGGER IF EXISTS after_movie_insert")
-        cursor.execute("""
-            CREATE TRIGGER after_movie_insert
-            AFTER INSERT ON Movies
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('INSERT', 'Movies', NEW.movie_id);
-            END
-        """)
-        
-        # 创建触发器 - Companies表
-        cursor.execute("DROP TRIGGER IF EXISTS after_company_insert")
-        cursor.execute("""
-            CREATE TRIGGER after_company_insert
-            AFTER INSERT ON Companies
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('INSERT', 'Companies', NEW.company_id);
-            END
-        """)
-        
-        # 创建触发器 - Awards表
-        cursor.execute("DROP TRIGGER IF EXISTS after_award_insert")
-        cursor.execute("""
-            CREATE TRIGGER after_award_insert
-            AFTER INSERT ON Awards
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('INSERT', 'Awards', NEW.award_id);
-            END
-        """)
-        
-        # 创建存储过程 - People表
-        cursor.execute("DROP PROCEDURE IF EXISTS update_person_info")
-        cursor.execute("""
-            CREATE PROCEDURE update_person_info(
-                IN p_id INT,
-                IN p_name VARCHAR(100),
-                IN p_country VARCHAR(100),
-                IN p_masterpiece TEXT,
-                IN p_brief_intro TEXT
-            )
-            BEGIN
-                UPDATE People 
-                SET name = p_name,
-                    country = p_country,
-                    masterpiece = p_masterpiece,
-                    brief_intro = p_brief_intro
-                WHERE people_id = p_id;
-                
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('UPDATE', 'People', p_id);
-            END
-        """)
-        
-        # 创建存储过程 - Movies表
-        cursor.execute("DROP PROCEDURE IF EXISTS update_movie_info")
-        cursor.execute("""
-            CREATE PROCEDURE update_movie_info(
-                IN m_id INT,
-                IN m_title VARCHAR(200),
-                IN m_year INT,
-                IN m_director VARCHAR(100),
-                IN m_genre VARCHAR(50),
-                IN m_box_office DECIMAL(15,2),
-                IN m_description TEXT
-            )
-            BEGIN
-                UPDATE Movies 
-                SET title = m_title,
-                    release_year = m_year,
-                    director = m_director,
-                    genre = m_genre,
-                    box_office = m_box_office,
-                    description = m_description
-                WHERE movie_id = m_id;
-                
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('UPDATE', 'Movies', m_id);
-            END
-        """)
-        
-        # 创建存储过程 - Companies表
-        cursor.execute("DROP PROCEDURE IF EXISTS update_company_info")
-        cursor.execute("""
-            CREATE PROCEDURE update_company_info(
-                IN c_id INT,
-                IN c_name VARCHAR(200),
-                IN c_country VARCHAR(100),
-                IN c_year INT,
-                IN c_industry VARCHAR(100),
-                IN c_revenue DECIMAL(15,2),
-                IN c_description TEXT
-            )
-            BEGIN
-                UPDATE Companies 
-                SET name = c_name,
-                    country = c_country,
-                    founded_year = c_year,
-                    industry = c_industry,
-                    revenue = c_revenue,
-                    description = c_description
-                WHERE company_id = c_id;
-                
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('UPDATE', 'Companies', c_id);
-            END
-        """)
-        
-        # 创建存储过程 - Awards表
-        cursor.execute("DROP PROCEDURE IF EXISTS update_award_info")
-        cursor.execute("""
-            CREATE PROCEDURE update_award_info(
-                IN a_id INT,
-                IN a_name VARCHAR(200),
-                IN a_category VARCHAR(100),
-                IN a_year INT,
-                IN a_description TEXT
-            )
-            BEGIN
-                UPDATE Awards 
-                SET name = a_name,
-                    category = a_category,
-                    year = a_year,
-                    description = a_description
-                WHERE award_id = a_id;
-                
-                INSERT INTO operation_logs (operation_type, table_name, record_id)
-                VALUES ('UPDATE', 'Awards', a_id);
-            END
-        """)
-        
-        # 创建视图 - People
-        cursor.execute("DROP VIEW IF EXISTS people_summary")
-        cursor.execute("""
-            CREATE VIEW people_summary AS
-            SELECT people_id, name, country, masterpiece
-            FROM People
-        """)
-        
-        # 创建视图 - Movies
-        cursor.execute("DROP VIEW IF EXISTS movies_summary")
-        cursor.execute("""
-            CREATE VIEW movies_summary AS
-            SELECT movie_id, title, release_year, director, genre
-            FROM Movies
-        """)
-        
-        # 创建视图 - Companies
-        cursor.execute("DROP VIEW IF EXISTS companies_summary")
-        cursor.execute("""
-            CREATE VIEW companies_summary AS
-            SELECT company_id, name, country, industry, founded_year
-            FROM Companies
-        """)
-        
-        # 创建视图 - Awards
-        cursor.execute("DROP VIEW IF EXISTS awards_summary")
-        cursor.execute("""
-            CREATE VIEW awards_summary AS
-            SELECT award_id, name, category, year
-            FROM Awards
-        """)
-        
-        # 创建获奖情况视图（人物）
-        cursor.execute("DROP VIEW IF EXISTS people_awards_view")
-        cursor.execute("""
-            CREATE VIEW people_awards_view AS
-            SELECT 
-                p.people_id,
-                p.name as person_name,
-                a.name as award_name,
-                a.category as award_category,
-                pa.award_year
-            FROM People p
-            JOIN People_Awards pa ON p.people_id = pa.people_id
-            JOIN Awards a ON pa.award_id = a.award_id
-        """)
-        
-        # 创建获奖情况视图（电影）
-        cursor.execute("DROP VIEW IF EXISTS movie_awards_view")
-        cursor.execute("""
-            CREATE VIEW movie_awards_view AS
-            SELECT 
-                m.movie_id,
-                m.title as movie_title,
-                a.name as award_name,
-                a.category as award_category,
-                ma.award_year
-            FROM Movies m
-            JOIN Movie_Awards ma ON m.movie_id = ma.movie_id
-            JOIN Awards a ON ma.award_id = a.award_id
-        """)
-        
-        # 创建电影公司关系视图
-        cursor.execute("DROP VIEW IF EXISTS movie_companies_view")
-        cursor.execute("""
-            CREATE VIEW movie_companies_view AS
-            SELECT 
-                m.movie_id,
-                m.title as movie_title,
-                c.name as company_name,
-                mc.relationship_type
-            FROM Movies m
-            JOIN Movie_Companies mc ON m.movie_id = mc.movie_id
-            JOIN Companies c ON mc.company_id = c.company_id
-        """)
-        
-        # 创建演员参演情况视图
-        cursor.execute("DROP VIEW IF EXISTS movie_actors_view")
-        cursor.execute("""
-            CREATE VIEW movie_actors_view AS
-            SELECT 
-                m.movie_id,
-                m.title as movie_title,
-                p.people_id,
-                p.name as actor_name,
-                ma.role,
-                ma.is_protagonist
-            FROM Movies m
-            JOIN Movie_Actors ma ON m.movie_id = ma.movie_id
-            JOIN People p ON ma.people_id = p.people_id
-        """)
-
-        # 创建人物获奖汇总视图
-        cursor.execute("DROP VIEW IF EXISTS people_awards_summary")
-        cursor.execute("""
-            CREATE VIEW people_awards_summary AS
-            SELECT 
-                p.people_id,
-                p.name,
-                GROUP_CONCAT(
-                    CONCAT(a.name, ' (', pa.award_year, ')')
-                    ORDER BY pa.award_year DESC
-                    SEPARATOR '; '
-                ) as awards_list,
-                COUNT(*) as total_awards
-            FROM People p
-            LEFT JOIN People_Awards pa ON p.people_id = pa.people_id
-            LEFT JOIN Awards a ON pa.award_id = a.award_id
-            GROUP BY p.people_id, p.name
-        """)
-
-        # 创建电影获奖汇总视图
-        cursor.execute("DROP VIEW IF EXISTS movies_awards_summary")
-        cursor.execute("""
-            CREATE VIEW movies_awards_summary AS
-            SELECT 
-                m.movie_id,
-                m.title,
-                GROUP_CONCAT(
-                    CONCAT(a.name, ' (', ma.award_year, ')')
-                    ORDER BY ma.award_year DESC
-                    SEPARATOR '; '
-                ) as awards_list,
-                COUNT(*) as total_awards
-            FROM Movies m
-            LEFT JOIN Movie_Awards ma ON m.movie_id = ma.movie_id
-            LEFT JOIN Awards a ON ma.award_id = a.award_id
-            GROUP BY m.movie_id, m.title
-        """)
-
-    conn.commit()
-    conn.close()
+    """执行尚未执行的数据库结构变更（见 migrations.py，SQLite 见 sqlite_migrations.py），
+    返回执行了的 [(版本号, 说明), ...]
+
+    结构已是最新时不执行任何 DDL。
+    """
+    with connection() as conn, conn.cursor() as cursor:
+        applied = get_backend().migrate(cursor)
+        conn.commit()
+    return applied
+
+def _fetch_row(cursor, table, record_id):
+    """写操作后读取受影响的记录，返回给调用方用于只更新界面中的这一行"""
+    pk = PAGE_TABLES[table][0]
+    cursor.execute(f"SELECT * FROM {table} WHERE {pk} = %s", (record_id,))
+    return cursor.fetchone()
 
 # Movies表操作
 def fetch_all_movies():
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM Movies")
-        result = cursor.fetchall()
-    conn.close()
-    return result
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM Movies")
+            return cursor.fetchall()
 
 def insert_movie(title, release_year, director, genre, box_office, description):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             sql = """INSERT INTO Movies (title, release_year, director, genre, box_office, description) 
                     VALUES (%s, %s, %s, %s, %s, %s)"""
             cursor.execute(sql, (title, release_year, director, genre, box_office, description))
+            record_id = cursor.lastrowid
+            row = _fetch_row(cursor, "Movies", record_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("Movies", record_id)
+    return row
 
 def update_movie_with_procedure(movie_id, title, release_year, director, genre, box_office, description):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute("CALL update_movie_info(%s, %s, %s, %s, %s, %s, %s)",
-                         (movie_id, title, release_year, director, genre, box_office, description))
+            get_backend().call_update(cursor, "update_movie_info",
+                                      (movie_id, title, release_year, director, genre, box_office, description))
+            row = _fetch_row(cursor, "Movies", movie_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("Movies", movie_id)
+    return row
 
 def delete_movie_with_transaction(movie_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         conn.begin()
         with conn.cursor() as cursor:
+            row = _fetch_row(cursor, "Movies", movie_id)
             cursor.execute("INSERT INTO operation_logs (operation_type, table_name, record_id) VALUES ('DELETE', 'Movies', %s)", (movie_id,))
             cursor.execute("DELETE FROM Movies WHERE movie_id = %s", (movie_id,))
         conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    invalidate("Movies", movie_id)
+    return row
 
 def get_movies_summary():
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT * FROM movies_summary")
             result = cursor.fetchall()
         return result
-    finally:
-        conn.close()
 
 # Companies表操作
+@cached("Companies")
 def fetch_all_companies():
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM Companies")
-        result = cursor.fetchall()
-    conn.close()
-    return result
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM Companies")
+            return cursor.fetchall()
 
 def insert_company(name, country, founded_year, industry, revenue, description):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             sql = """INSERT INTO Companies (name, country, founded_year, industry, revenue, description) 
                     VALUES (%s, %s, %s, %s, %s, %s)"""
             cursor.execute(sql, (name, country, founded_year, industry, revenue, description))
+            record_id = cursor.lastrowid
+            row = _fetch_row(cursor, "Companies", record_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("Companies", record_id)
+    return row
 
 def update_company_with_procedure(company_id, name, country, founded_year, industry, revenue, description):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute("CALL update_company_info(%s, %s, %s, %s, %s, %s, %s)",
-                         (company_id, name, country, founded_year, industry, revenue, description))
+            get_backend().call_update(cursor, "update_company_info",
+                                      (company_id, name, country, founded_year, industry, revenue, description))
+            row = _fetch_row(cursor, "Companies", company_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("Companies", company_id)
+    return row
 
 def delete_company_with_transaction(company_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         conn.begin()
         with conn.cursor() as cursor:
+            row = _fetch_row(cursor, "Companies", company_id)
             cursor.execute("INSERT INTO operation_logs (operation_type, table_name, record_id) VALUES ('DELETE', 'Companies', %s)", (company_id,))
             cursor.execute("DELETE FROM Companies WHERE company_id = %s", (company_id,))
         conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    invalidate("Companies", company_id)
+    return row
 
 def get_companies_summary():
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT * FROM companies_summary")
             result = cursor.fetchall()
         return result
-    finally:
-        conn.close()
 
 # 保留原有的People表操作函数
 def fetch_all_people():
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM People")
-        result = cursor.fetchall()
-    conn.close()
-    return result
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM People")
+            return cursor.fetchall()
 
 def insert_person(name, country, masterpiece, brief_intro):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             sql = "INSERT INTO People (name, country, masterpiece, brief_intro) VALUES (%s, %s, %s, %s)"
             cursor.execute(sql, (name, country, masterpiece, brief_intro))
+            record_id = cursor.lastrowid
+            row = _fetch_row(cursor, "People", record_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("People", record_id)
+    return row
 
 def update_person_with_procedure(people_id, name, country, masterpiece, brief_intro):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute("CALL update_person_info(%s, %s, %s, %s, %s)",
-                         (people_id, name, country, masterpiece, brief_intro))
+            get_backend().call_update(cursor, "update_person_info",
+                                      (people_id, name, country, masterpiece, brief_intro))
+            row = _fetch_row(cursor, "People", people_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("People", people_id)
+    return row
 
 def delete_person_with_transaction(people_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         conn.begin()
         with conn.cursor() as cursor:
+            row = _fetch_row(cursor, "People", people_id)
             cursor.execute("INSERT INTO operation_logs (operation_type, table_name, record_id) VALUES ('DELETE', 'People', %s)", (people_id,))
             cursor.execute("DELETE FROM People WHERE people_id = %s", (people_id,))
         conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    invalidate("People", people_id)
+    return row
 
 def get_people_summary():
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT * FROM people_summary")
             result = cursor.fetchall()
         return result
-    finally:
-        conn.close()
 
 def get_operation_logs():
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT * FROM operation_logs ORDER BY operation_time DESC")
             result = cursor.fetchall()
         return result
-    finally:
-        conn.close()
+
+def tail_operation_logs(after_log_id=None, limit=500):
+    """增量读取操作日志，按 log_id 升序返回
+
+    after_log_id 为 None 时返回最新的 limit 条；否则只返回 log_id 更大的新日志，
+    新日志超过 limit 条时只返回其中最新的 limit 条。
+    """
+    where, params = "", []
+    if after_log_id is not None:
+        where = "WHERE log_id > %s"
+        params = [after_log_id]
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT * FROM (
+                    SELECT * FROM operation_logs {where}
+                    ORDER BY log_id DESC
+                    LIMIT %s
+                ) latest
+                ORDER BY log_id
+            """, params + [limit])
+            return cursor.fetchall()
+
+def latest_log_id():
+    """当前最大的日志ID，没有日志时返回0
+
+    在一次写操作之前和之后各取一次，这次写入的日志ID一定在 (之前, 之后] 内。
+    """
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT MAX(log_id) AS log_id FROM operation_logs")
+            row = cursor.fetchone()
+            return (row and row['log_id']) or 0
 
 # 奖项相关操作
+@cached("Awards")
 def fetch_all_awards():
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT * FROM Awards")
-        result = cursor.fetchall()
-    conn.close()
-    return result
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM Awards")
+            return cursor.fetchall()
 
 def insert_award(name, category, year, description):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             sql = """INSERT INTO Awards (name, category, year, description) 
                     VALUES (%s, %s, %s, %s)"""
             cursor.execute(sql, (name, category, year, description))
+            record_id = cursor.lastrowid
+            row = _fetch_row(cursor, "Awards", record_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("Awards", record_id)
+    return row
 
 def update_award_with_procedure(award_id, name, category, year, description):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute("CALL update_award_info(%s, %s, %s, %s, %s)",
-                         (award_id, name, category, year, description))
+            get_backend().call_update(cursor, "update_award_info",
+                                      (award_id, name, category, year, description))
+            row = _fetch_row(cursor, "Awards", award_id)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate("Awards", award_id)
+    return row
 
 def delete_award_with_transaction(award_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         conn.begin()
         with conn.cursor() as cursor:
+            row = _fetch_row(cursor, "Awards", award_id)
             cursor.execute("INSERT INTO operation_logs (operation_type, table_name, record_id) VALUES ('DELETE', 'Awards', %s)", (award_id,))
             cursor.execute("DELETE FROM Awards WHERE award_id = %s", (award_id,))
         conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    invalidate("Awards", award_id)
+    return row
 
-# 关系操作函数
-def add_person_award(people_id, award_id, award_year):
-    conn = get_connection()
-    try:
+# 批量删除：一个事务内分批 DELETE ... WHERE id IN (...)，日志也批量写入
+def delete_many(table, ids):
+    """删除 PAGE_TABLES 中表的多条记录，返回实际删除的ID列表（不存在的ID忽略）"""
+    pk = PAGE_TABLES[table][0]
+    ids = list(dict.fromkeys(ids))
+    lock_rows = get_backend().lock_rows
+    deleted = []
+    with connection() as conn:
+        conn.begin()
         with conn.cursor() as cursor:
-            sql = """INSERT INTO People_Awards (people_id, award_id, award_year) 
-                    VALUES (%s, %s, %s)"""
-            cursor.execute(sql, (people_id, award_id, award_year))
+            for chunk in _chunks(ids, DETAILS_BATCH_SIZE):
+                marks = _in_placeholders(len(chunk))
+                cursor.execute(f"SELECT {pk} FROM {table} WHERE {pk} IN ({marks}){lock_rows}", chunk)
+                existing = [row[pk] for row in cursor.fetchall()]
+                if not existing:
+                    continue
+                # executemany 会合并为一条多行 INSERT
+                cursor.executemany(
+                    "INSERT INTO operation_logs (operation_type, table_name, record_id) VALUES (%s, %s, %s)",
+                    [('DELETE', table, record_id) for record_id in existing])
+                cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({_in_placeholders(len(existing))})", existing)
+                deleted.extend(existing)
         conn.commit()
-    finally:
-        conn.close()
+    invalidate_many(table, deleted)
+    return deleted
 
-def add_movie_award(movie_id, award_id, award_year):
-    conn = get_connection()
-    try:
+def delete_movies(movie_ids):
+    return delete_many("Movies", movie_ids)
+
+def delete_people(people_ids):
+    return delete_many("People", people_ids)
+
+def delete_companies(company_ids):
+    return delete_many("Companies", company_ids)
+
+def delete_awards(award_ids):
+    return delete_many("Awards", award_ids)
+
+# 分页查询（键集分页）
+# 表名 -> (主键, 允许排序的列)
+PAGE_TABLES = {
+    "Movies": ("movie_id", ("movie_id", "title", "release_year", "director", "genre", "box_office")),
+    "People": ("people_id", ("people_id", "name", "country")),
+    "Companies": ("company_id", ("company_id", "name", "country", "founded_year", "industry", "revenue")),
+    "Awards": ("award_id", ("award_id", "name", "category", "year")),
+}
+
+DEFAULT_PAGE_SIZE = 200
+
+def fetch_page(table, after_id=None, limit=DEFAULT_PAGE_SIZE, order_by=None, descending=False):
+    """按键集分页读取一页数据
+
+    参数:
+        table: PAGE_TABLES 中的表名
+        after_id: 上一页返回的续页标记，None 表示第一页
+        limit: 每页行数
+        order_by: 排序列，默认按主键；非主键列以主键作为次序键
+        descending: 是否降序
+
+    返回 (rows, next_token)，没有下一页时 next_token 为 None。
+    按主键排序时续页标记就是最后一行的ID，否则是 (排序值, ID) 元组。
+    """
+    pk, sortable = PAGE_TABLES[table]
+    order_by = order_by or pk
+    if order_by not in sortable:
+        raise ValueError(f"{table} 不支持按 {order_by} 排序")
+    if limit < 1:
+        raise ValueError("limit 必须大于0")
+
+    op, direction = ("<", "DESC") if descending else (">", "ASC")
+    where, params = "", []
+    if after_id is not None:
+        if order_by == pk:
+            where = f"WHERE {pk} {op} %s"
+            params = [after_id]
+        else:
+            last_value, last_id = after_id
+            # MySQL 中 NULL 升序排在最前、降序排在最后
+            if last_value is None:
+                if descending:
+                    where = f"WHERE {order_by} IS NULL AND {pk} < %s"
+                else:
+                    where = f"WHERE ({order_by} IS NULL AND {pk} > %s) OR {order_by} IS NOT NULL"
+                params = [last_id]
+            else:
+                where = f"WHERE ({order_by} {op} %s OR ({order_by} = %s AND {pk} {op} %s))"
+                if descending:
+                    where += f" OR {order_by} IS NULL"
+                params = [last_value, last_value, last_id]
+
+    if order_by == pk:
+        order = f"{pk} {direction}"
+    else:
+        order = f"{order_by} {direction}, {pk} {direction}"
+
+    with connection() as conn:
         with conn.cursor() as cursor:
-            sql = """INSERT INTO Movie_Awards (movie_id, award_id, award_year) 
-                    VALUES (%s, %s, %s)"""
-            cursor.execute(sql, (movie_id, award_id, award_year))
-        conn.commit()
-    finally:
-        conn.close()
+            # 多取一行用来判断是否还有下一页
+            cursor.execute(f"SELECT * FROM {table} {where} ORDER BY {order} LIMIT %s",
+                           params + [limit + 1])
+            rows = list(cursor.fetchall())
 
-def add_movie_company(movie_id, company_id, relationship_type):
-    conn = get_connection()
-    try:
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_token = last[pk] if order_by == pk else (last[order_by], last[pk])
+    return rows, next_token
+
+def fetch_rows(table, ids):
+    """按主键读取 PAGE_TABLES 中表的若干行，返回 {ID: 行}，不存在的ID不出现在结果中"""
+    pk = PAGE_TABLES[table][0]
+    ids = list(dict.fromkeys(ids))
+    result = {}
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            for chunk in _chunks(ids, DETAILS_BATCH_SIZE):
+                cursor.execute(f"SELECT * FROM {table} WHERE {pk} IN ({_in_placeholders(len(chunk))})", chunk)
+                for row in cursor.fetchall():
+                    result[row[pk]] = row
+    return result
+
+def fetch_movies_page(after_id=None, limit=DEFAULT_PAGE_SIZE, order_by="movie_id", descending=False):
+    return fetch_page("Movies", after_id, limit, order_by, descending)
+
+def fetch_people_page(after_id=None, limit=DEFAULT_PAGE_SIZE, order_by="people_id", descending=False):
+    return fetch_page("People", after_id, limit, order_by, descending)
+
+def fetch_companies_page(after_id=None, limit=DEFAULT_PAGE_SIZE, order_by="company_id", descending=False):
+    return fetch_page("Companies", after_id, limit, order_by, descending)
+
+def fetch_awards_page(after_id=None, limit=DEFAULT_PAGE_SIZE, order_by="award_id", descending=False):
+    return fetch_page("Awards", after_id, limit, order_by, descending)
+
+# 全文检索（MySQL 为 FULLTEXT 索引 + ngram 分词，SQLite 为 FTS5 + 二元分词，都支持中文）
+# 表名 -> (主键, 检索的列)
+SEARCH_TABLES = {
+    "Movies": ("movie_id", ("title", "description")),
+    "People": ("people_id", ("name", "brief_intro")),
+    "Companies": ("company_id", ("name", "description")),
+    "Awards": ("award_id", ("name", "description")),
+}
+
+# 检索语句由后端生成（backends.py），索引在 migrations.py 的第5版 / sqlite_migrations.py 的第4版中建立
+
+def _search_words(text):
+    """拆分检索词，并去掉检索式的运算符（BOOLEAN MODE 的 +-<>()~*@ 和引号）"""
+    words = []
+    for word in text.split():
+        word = "".join(ch for ch in word if ch not in '+-<>()~*@"\'')
+        if word:
+            words.append(word)
+    return words
+
+def search(table, query, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """全文检索，按相关度从高到低分页返回 (rows, next_token)
+
+    每行多一个 score 列表示相关度。相关度是计算出的浮点数，
+    不适合做键集比较，所以续页标记是已返回的行数。
+    """
+    pk, columns = SEARCH_TABLES[table]
+    statement = get_backend().search_sql(table, pk, columns, _search_words(query))
+    if statement is None:
+        return [], None
+    sql, params = statement
+    offset = after_id or 0
+
+    with connection() as conn:
         with conn.cursor() as cursor:
-            sql = """INSERT INTO Movie_Companies (movie_id, company_id, relationship_type) 
-                    VALUES (%s, %s, %s)"""
-            cursor.execute(sql, (movie_id, company_id, relationship_type))
+            cursor.execute(sql, params + [limit + 1, offset])
+            rows = list(cursor.fetchall())
+
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_token = offset + limit
+    return rows, next_token
+
+def search_refinable(query):
+    """search_matches() 与 search() 对该查询的判断是否一定相同
+
+    只有一个词、只含字母数字且不短于分词长度时，全文检索等价于子串匹配；
+    多个词、单字（前缀匹配）、带标点的词由分词规则处理，与子串判断可能不一致。
+    """
+    words = _search_words(query)
+    return (len(words) == 1 and words[0].isalnum()
+            and len(words[0]) >= get_backend().NGRAM_TOKEN_SIZE)
+
+def search_matches(table, row, query):
+    """判断一行是否满足检索条件（每个词都作为子串出现在检索列中）
+
+    用于在已经取得的检索结果中继续筛选，不必再查询数据库；
+    只有 search_refinable(query) 为真时结果与 search() 相同。
+    """
+    _, columns = SEARCH_TABLES[table]
+    text = " ".join(str(row.get(column) or "") for column in columns).lower()
+    return all(word.lower() in text for word in _search_words(query))
+
+def search_movies(query, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    return search("Movies", query, after_id, limit)
+
+def search_people(query, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    return search("People", query, after_id, limit)
+
+def search_companies(query, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    return search("Companies", query, after_id, limit)
+
+def search_awards(query, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    return search("Awards", query, after_id, limit)
+
+# 关系操作函数
+# 关系表 -> (列, 唯一键包含的前几列, [(列序号, 该列引用的实体), ...])
+# 唯一键由第8版迁移建立，见 migrations.py
+LINK_TABLES = {
+    "Movie_Actors": (("movie_id", "people_id", "role", "is_protagonist"), 2, ((0, "Movies"), (1, "People"))),
+    "People_Awards": (("people_id", "award_id", "award_year"), 3, ((0, "People"),)),
+    "Movie_Awards": (("movie_id", "award_id", "award_year"), 3, ((0, "Movies"),)),
+    "Movie_Companies": (("movie_id", "company_id", "relationship_type"), 3, ((0, "Movies"),)),
+}
+
+def link_insert_sql(table, update=False):
+    """关系表的 INSERT 语句，可以直接用于 executemany
+
+    唯一键冲突时：update=False 保留已有的行不变（受影响行数为0，
+    rowcount 即新增的条数）；update=True 用新值覆盖唯一键以外的列。
+    """
+    columns, key_size, _ = LINK_TABLES[table]
+    values = columns[key_size:] if update else ()
+    return get_backend().upsert_sql(table, columns, columns[:key_size], values)
+
+def _write_links(table, links, update):
+    columns, key_size, owners = LINK_TABLES[table]
+    pending = {}
+    for link in links:
+        link = tuple(link)
+        if update:
+            pending[link[:key_size]] = link  # 同一唯一键以最后一条为准
+        else:
+            pending.setdefault(link[:key_size], link)
+    if not pending:
+        return 0
+    links = list(pending.values())
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.executemany(link_insert_sql(table, update), links)
+            count = cursor.rowcount
         conn.commit()
-    finally:
-        conn.close()
+    invalidate_owners(*{(entity, link[index]) for link in links for index, entity in owners})
+    return count
+
+def add_links(table, links):
+    """在一个事务中批量添加关系，返回实际添加的条数
+
+    links 中每个元组按 LINK_TABLES 中的列顺序排列。已经存在的关系和 links 中
+    重复的关系会被跳过（演员按 电影+演员 判断，其余按全部列判断）。
+    """
+    return _write_links(table, links, update=False)
+
+def upsert_links(table, links):
+    """批量添加或更新关系：已存在的关系用新值覆盖唯一键以外的列（如演员的角色）
+
+    返回受影响行数：新增的行计1，更新的行 MySQL 计2、SQLite 计1，没有变化的行 MySQL 计0。
+    """
+    return _write_links(table, links, update=True)
+
+def add_movie_actors(links):
+    """links: [(movie_id, people_id, role, is_protagonist), ...]"""
+    return add_links("Movie_Actors", links)
+
+def add_person_awards(links):
+    """links: [(people_id, award_id, award_year), ...]"""
+    return add_links("People_Awards", links)
+
+def add_movie_awards(links):
+    """links: [(movie_id, award_id, award_year), ...]"""
+    return add_links("Movie_Awards", links)
+
+def add_movie_companies(links):
+    """links: [(movie_id, company_id, relationship_type), ...]"""
+    return add_links("Movie_Companies", links)
+
+def upsert_movie_actors(links):
+    """links: [(movie_id, people_id, role, is_protagonist), ...]，已有的演员更新角色和是否主演"""
+    return upsert_links("Movie_Actors", links)
+
+def add_person_award(people_id, award_id, award_year):
+    return add_person_awards([(people_id, award_id, award_year)])
+
+def add_movie_award(movie_id, award_id, award_year):
+    return add_movie_awards([(movie_id, award_id, award_year)])
+
+def add_movie_company(movie_id, company_id, relationship_type):
+    return add_movie_companies([(movie_id, company_id, relationship_type)])
 
 # 获取关系数据
+@cached("People", deps=("Awards",), by_id=True)
 def get_person_awards(people_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("""
                 SELECT * FROM people_awards_view
                 WHERE people_id = %s
             """, (people_id,))
             return cursor.fetchall()
-    finally:
-        conn.close()
 
+@cached("Movies", deps=("Awards",), by_id=True)
 def get_movie_awards(movie_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("""
                 SELECT * FROM movie_awards_view
                 WHERE movie_id = %s
             """, (movie_id,))
             return cursor.fetchall()
-    finally:
-        conn.close()
 
+@cached("Movies", deps=("Companies",), by_id=True)
 def get_movie_companies(movie_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("""
                 SELECT * FROM movie_companies_view
                 WHERE movie_id = %s
             """, (movie_id,))
             return cursor.fetchall()
-    finally:
-        conn.close()
 
 # 添加新的关系操作函数
 def add_movie_actor(movie_id, people_id, role, is_protagonist=False):
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            sql = """INSERT INTO Movie_Actors (movie_id, people_id, role, is_protagonist) 
-                    VALUES (%s, %s, %s, %s)"""
-            cursor.execute(sql, (movie_id, people_id, role, is_protagonist))
-        conn.commit()
-    finally:
-        conn.close()
+    return add_movie_actors([(movie_id, people_id, role, is_protagonist)])
 
+@cached("Movies", deps=("People",), by_id=True)
 def get_movie_actors(movie_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("""
                 SELECT * FROM movie_actors_view
@@ -714,12 +1056,10 @@ def get_movie_actors(movie_id):
                 ORDER BY is_protagonist DESC, actor_name
             """, (movie_id,))
             return cursor.fetchall()
-    finally:
-        conn.close()
 
+@cached("People", deps=("Movies",), by_id=True)
 def get_actor_movies(people_id):
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("""
                 SELECT * FROM movie_actors_view
@@ -727,180 +1067,258 @@ def get_actor_movies(people_id):
                 ORDER BY movie_title
             """, (people_id,))
             return cursor.fetchall()
-    finally:
-        conn.close()
 
 # 获取获奖汇总信息
-def get_person_awards_summary(people_id=None):
-    conn = get_connection()
-    try:
+# 汇总保存在 people_award_totals / movie_award_totals 表中，由触发器增量维护（见 migrations.py 第7版）
+def get_person_awards_summary(people_id=None, limit=None, awarded_only=False):
+    """人物获奖汇总；不指定 people_id 时返回全部人物，按获奖数从多到少排列
+
+    参数:
+        limit: 只返回前 limit 条（获奖排行榜）
+        awarded_only: 只返回至少获得一个奖项的人物
+    """
+    with connection() as conn:
         with conn.cursor() as cursor:
             if people_id:
-                cursor.execute("SELECT * FROM people_awards_summary WHERE people_id = %s", (people_id,))
+                cursor.execute("SELECT * FROM people_award_totals WHERE people_id = %s", (people_id,))
             else:
-                cursor.execute("SELECT * FROM people_awards_summary ORDER BY total_awards DESC")
+                # 沿 (total_awards, people_id) 索引倒序扫描，不需要排序
+                where = " WHERE total_awards > 0" if awarded_only else ""
+                sql = f"SELECT * FROM people_award_totals{where} ORDER BY total_awards DESC, people_id DESC"
+                if limit:
+                    cursor.execute(sql + " LIMIT %s", (limit,))
+                else:
+                    cursor.execute(sql)
             return cursor.fetchall()
-    finally:
-        conn.close()
 
-def get_movie_awards_summary(movie_id=None):
-    conn = get_connection()
-    try:
+def get_movie_awards_summary(movie_id=None, limit=None, awarded_only=False):
+    """电影获奖汇总；不指定 movie_id 时返回全部电影，按获奖数从多到少排列
+
+    参数:
+        limit: 只返回前 limit 条（获奖排行榜）
+        awarded_only: 只返回至少获得一个奖项的电影
+    """
+    with connection() as conn:
         with conn.cursor() as cursor:
             if movie_id:
-                cursor.execute("SELECT * FROM movies_awards_summary WHERE movie_id = %s", (movie_id,))
+                cursor.execute("SELECT * FROM movie_award_totals WHERE movie_id = %s", (movie_id,))
             else:
-                cursor.execute("SELECT * FROM movies_awards_summary ORDER BY total_awards DESC")
+                where = " WHERE total_awards > 0" if awarded_only else ""
+                sql = f"SELECT * FROM movie_award_totals{where} ORDER BY total_awards DESC, movie_id DESC"
+                if limit:
+                    cursor.execute(sql + " LIMIT %s", (limit,))
+                else:
+                    cursor.execute(sql)
             return cursor.fetchall()
-    finally:
-        conn.close()
+
+def rebuild_award_summaries():
+    """按关系表重新计算全部获奖汇总（用于修复直接改库等触发器覆盖不到的情况）"""
+    backend = get_backend()
+    with connection() as conn:
+        conn.begin()
+        with conn.cursor() as cursor:
+            for kind, (totals, *_) in AWARD_TOTALS.items():
+                cursor.execute(f"DELETE FROM {totals}")
+                cursor.execute(backend.award_totals_refresh(kind))
+        conn.commit()
 
 # 获取综合信息
+DETAILS_BATCH_SIZE = 1000  # 批量读取详细信息时每条 IN 查询最多包含的ID数
+
+def _in_placeholders(count):
+    return ", ".join(["%s"] * count)
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _attach_rows(details, rows, key_column, field):
+    """把关系查询的结果按 key_column 分配到各条记录的 field 列表中"""
+    for row in rows:
+        item = details.get(row.pop(key_column))
+        if item is not None:
+            item[field].append(row)
+
+@cached("People", deps=("Movies", "Awards"), by_id=True)
 def get_person_details(people_id):
     """获取人物的综合信息，包括获奖情况和参演作品"""
-    conn = get_connection()
-    try:
+    return get_person_details_many([people_id]).get(people_id)
+
+def get_person_details_many(people_ids):
+    """批量获取人物的综合信息，返回 {people_id: 综合信息}，不存在的ID不出现在结果中
+
+    每种关系对一批ID只查询一次（WHERE people_id IN (...)），
+    查询次数与ID的个数无关。
+    """
+    ids = list(dict.fromkeys(people_ids))
+    details = {}
+    if not ids:
+        return details
+    with connection() as conn:
         with conn.cursor() as cursor:
-            # 基本信息
-            cursor.execute("SELECT * FROM People WHERE people_id = %s", (people_id,))
-            person = cursor.fetchone()
-            if not person:
-                return None
+            for chunk in _chunks(ids, DETAILS_BATCH_SIZE):
+                marks = _in_placeholders(len(chunk))
 
-            # 获奖信息
-            cursor.execute("""
-                SELECT 
-                    a.name as award_name,
-                    a.category as award_category,
-                    pa.award_year
-                FROM People_Awards pa
-                JOIN Awards a ON pa.award_id = a.award_id
-                WHERE pa.people_id = %s
-                ORDER BY pa.award_year DESC
-            """, (people_id,))
-            awards = cursor.fetchall()
+                # 基本信息
+                cursor.execute(f"SELECT * FROM People WHERE people_id IN ({marks})", chunk)
+                for person in cursor.fetchall():
+                    details[person['people_id']] = {
+                        'basic_info': person,
+                        'awards': [],
+                        'movies': []
+                    }
 
-            # 参演作品
-            cursor.execute("""
-                SELECT 
-                    m.title,
-                    ma.role,
-                    ma.is_protagonist
-                FROM Movie_Actors ma
-                JOIN Movies m ON ma.movie_id = m.movie_id
-                WHERE ma.people_id = %s
-                ORDER BY m.release_year DESC
-            """, (people_id,))
-            movies = cursor.fetchall()
+                # 获奖信息
+                cursor.execute(f"""
+                    SELECT 
+                        pa.people_id,
+                        a.name as award_name,
+                        a.category as award_category,
+                        pa.award_year
+                    FROM People_Awards pa
+                    JOIN Awards a ON pa.award_id = a.award_id
+                    WHERE pa.people_id IN ({marks})
+                    ORDER BY pa.award_year DESC
+                """, chunk)
+                _attach_rows(details, cursor.fetchall(), 'people_id', 'awards')
 
-            return {
-                'basic_info': person,
-                'awards': awards,
-                'movies': movies
-            }
-    finally:
-        conn.close()
+                # 参演作品
+                cursor.execute(f"""
+                    SELECT 
+                        ma.people_id,
+                        m.title,
+                        ma.role,
+                        ma.is_protagonist
+                    FROM Movie_Actors ma
+                    JOIN Movies m ON ma.movie_id = m.movie_id
+                    WHERE ma.people_id IN ({marks})
+                    ORDER BY m.release_year DESC
+                """, chunk)
+                _attach_rows(details, cursor.fetchall(), 'people_id', 'movies')
+
+    return {people_id: details[people_id] for people_id in ids if people_id in details}
+
+# 电影综合信息中的关系：字段 -> 查询（{marks} 为一批 movie_id 的占位符）
+MOVIE_DETAIL_SECTIONS = {
+    # 获奖信息
+    "awards": """
+        SELECT 
+            ma.movie_id,
+            a.name as award_name,
+            a.category as award_category,
+            ma.award_year
+        FROM Movie_Awards ma
+        JOIN Awards a ON ma.award_id = a.award_id
+        WHERE ma.movie_id IN ({marks})
+        ORDER BY ma.award_year DESC
+    """,
+    # 演员阵容
+    "actors": """
+        SELECT 
+            ma.movie_id,
+            p.name,
+            ma.role,
+            ma.is_protagonist
+        FROM Movie_Actors ma
+        JOIN People p ON ma.people_id = p.people_id
+        WHERE ma.movie_id IN ({marks})
+        ORDER BY ma.is_protagonist DESC, p.name
+    """,
+    # 相关公司
+    "companies": """
+        SELECT 
+            mc.movie_id,
+            c.name,
+            mc.relationship_type
+        FROM Movie_Companies mc
+        JOIN Companies c ON mc.company_id = c.company_id
+        WHERE mc.movie_id IN ({marks})
+    """,
+}
+
+def assemble_movie_details(movie, sections=None):
+    """由基本信息和各种关系组成电影的综合信息（get_movie_details 返回的结构）
 
+    sections 为 {字段: [行, ...]}（MOVIE_DETAIL_SECTIONS 的字段，行中不含 movie_id），
+    缺少的字段为空列表。get_movie_details_many 和 async_db.get_movie_details 都用它组装结果。
+    """
+    sections = sections or {}
+    return {'basic_info': movie, **{field: list(sections.get(field, ())) for field in MOVIE_DETAIL_SECTIONS}}
+
+@cached("Movies", deps=("People", "Awards", "Companies"), by_id=True)
 def get_movie_details(movie_id):
     """获取电影的综合信息，包括获奖情况、演员阵容和相关公司"""
-    conn = get_connection()
-    try:
+    return get_movie_details_many([movie_id]).get(movie_id)
+
+def get_movie_details_many(movie_ids):
+    """批量获取电影的综合信息，返回 {movie_id: 综合信息}，不存在的ID不出现在结果中
+
+    每种关系对一批ID只查询一次（WHERE movie_id IN (...)），
+    查询次数与ID的个数无关。
+    """
+    ids = list(dict.fromkeys(movie_ids))
+    details = {}
+    if not ids:
+        return details
+    with connection() as conn:
         with conn.cursor() as cursor:
-            # 基本信息
-            cursor.execute("SELECT * FROM Movies WHERE movie_id = %s", (movie_id,))
-            movie = cursor.fetchone()
-            if not movie:
-                return None
+            for chunk in _chunks(ids, DETAILS_BATCH_SIZE):
+                marks = _in_placeholders(len(chunk))
 
-            # 获奖信息
-            cursor.execute("""
-                SELECT 
-                    a.name as award_name,
-                    a.category as award_category,
-                    ma.award_year
-                FROM Movie_Awards ma
-                JOIN Awards a ON ma.award_id = a.award_id
-                WHERE ma.movie_id = %s
-                ORDER BY ma.award_year DESC
-            """, (movie_id,))
-            awards = cursor.fetchall()
+                # 基本信息
+                cursor.execute(f"SELECT * FROM Movies WHERE movie_id IN ({marks})", chunk)
+                for movie in cursor.fetchall():
+                    details[movie['movie_id']] = assemble_movie_details(movie)
 
-            # 演员阵容
-            cursor.execute("""
-                SELECT 
-                    p.name,
-                    ma.role,
-                    ma.is_protagonist
-                FROM Movie_Actors ma
-                JOIN People p ON ma.people_id = p.people_id
-                WHERE ma.movie_id = %s
-                ORDER BY ma.is_protagonist DESC, p.name
-            """, (movie_id,))
-            actors = cursor.fetchall()
+                for field, sql in MOVIE_DETAIL_SECTIONS.items():
+                    cursor.execute(sql.format(marks=marks), chunk)
+                    _attach_rows(details, cursor.fetchall(), 'movie_id', field)
 
-            # 相关公司
-            cursor.execute("""
-                SELECT 
-                    c.name,
-                    mc.relationship_type
-                FROM Movie_Companies mc
-                JOIN Companies c ON mc.company_id = c.company_id
-                WHERE mc.movie_id = %s
-            """, (movie_id,))
-            companies = cursor.fetchall()
-
-            return {
-                'basic_info': movie,
-                'awards': awards,
-                'actors': actors,
-                'companies': companies
-            }
-    finally:
-        conn.close()
+    return {movie_id: details[movie_id] for movie_id in ids if movie_id in details}
+
+def get_movie_details_section(field, movie_ids):
+    """只查询综合信息中的一种关系（MOVIE_DETAIL_SECTIONS 的字段），返回 {movie_id: [行, ...]}
+
+    各种关系可以分别在不同的连接上并发查询（见 async_db.get_movie_details）。
+    """
+    ids = list(dict.fromkeys(movie_ids))
+    result = {movie_id: [] for movie_id in ids}
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            for chunk in _chunks(ids, DETAILS_BATCH_SIZE):
+                cursor.execute(MOVIE_DETAIL_SECTIONS[field].format(marks=_in_placeholders(len(chunk))), chunk)
+                for row in cursor.fetchall():
+                    result[row.pop('movie_id')].append(row)
+    return result
 
 # UI设置相关函数
 def save_ui_setting(setting_name, setting_value, setting_type="string", description=None):
-    """保存UI设置到数据库"""
-    conn = get_connection()
-    try:
+    """保存UI设置到数据库（setting_name 唯一，已有同名设置时覆盖）"""
+    with connection() as conn:
         with conn.cursor() as cursor:
-            sql = """INSERT INTO UI_Settings (setting_name, setting_value, setting_type, description)
-                    VALUES (%s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE 
-                    setting_value = VALUES(setting_value),
-                    setting_type = VALUES(setting_type),
-                    description = VALUES(description)"""
+            sql = get_backend().upsert_sql("UI_Settings",
+                                           ("setting_name", "setting_value", "setting_type", "description"),
+                                           ("setting_name",), ("setting_value", "setting_type", "description"))
             cursor.execute(sql, (setting_name, setting_value, setting_type, description))
         conn.commit()
-    finally:
-        conn.close()
 
 def get_ui_setting(setting_name):
     """获取UI设置"""
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT * FROM UI_Settings WHERE setting_name = %s", (setting_name,))
             return cursor.fetchone()
-    finally:
-        conn.close()
 
 def get_all_ui_settings():
     """获取所有UI设置"""
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT * FROM UI_Settings ORDER BY setting_name")
             return cursor.fetchall()
-    finally:
-        conn.close()
 
 def delete_ui_setting(setting_name):
     """删除UI设置"""
-    conn = get_connection()
-    try:
+    with connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("DELETE FROM UI_Settings WHERE setting_name = %s", (setting_name,))
         conn.commit()
-    finally:
-        conn.close()
@@ -0,0 +1,23 @@
+import argparse
+
+from db import close_pool
+from exporter import EXPORT_SOURCES, DEFAULT_FETCH_SIZE, export
+
+def main():
+    parser = argparse.ArgumentParser(description="把表或视图流式导出到 CSV/JSONL/Parquet 文件")
+    parser.add_argument("source", choices=EXPORT_SOURCES, metavar="source", help="表或视图名，例如 Movies、movie_actors_view")
+    parser.add_argument("path", help="输出文件，扩展名为 .csv/.jsonl/.parquet")
+    parser.add_argument("--format", choices=("csv", "jsonl", "parquet"), help="文件格式（默认按扩展名判断）")
+    parser.add_argument("--fetch-size", type=int, default=DEFAULT_FETCH_SIZE, help="每批读取的行数")
+    args = parser.parse_args()
+
+    print(f"开始导出 {args.source} ...")
+    try:
+        count = export(args.source, args.path, args.format, fetch_size=args.fetch_size,
+                       progress=lambda count: print(f"\r已导出 {count} 行", end="", flush=True))
+    finally:
+        close_pool()
+    print(f"\r已导出 {count} 行到 {args.path}")
+
+if __name__ == '__main__':
+    main()
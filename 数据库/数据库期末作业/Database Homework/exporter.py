@@ -0,0 +1,151 @@
+# exporter.py
+"""流式导出表和视图到 CSV/JSONL/Parquet 文件
+
+用不缓冲的游标（MySQL 为 pymysql 的 SSCursor，服务器端逐批返回；SQLite 的游标本身
+逐行读取）读取，每次只在内存中保留 fetch_size 行，因此导出任意大小的表占用的内存都是固定的。
+"""
+import csv
+import datetime
+import decimal
+import json
+import os
+
+from db import connection, get_backend
+
+DEFAULT_FETCH_SIZE = 5000  # 每批读取的行数，也是 Parquet 每个行组的行数
+
+# 可以导出的表和视图
+EXPORT_SOURCES = (
+    "Movies", "People", "Companies", "Awards",
+    "People_Awards", "Movie_Awards", "Movie_Companies", "Movie_Actors",
+    "operation_logs",
+    "movies_summary", "people_summary", "companies_summary", "awards_summary",
+    "people_awards_view", "movie_awards_view", "movie_companies_view", "movie_actors_view",
+    "people_awards_summary", "movies_awards_summary", "people_award_totals", "movie_award_totals",
+)
+
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+
+
+def stream_batches(source, fetch_size=DEFAULT_FETCH_SIZE):
+    """逐批读取表或视图，生成 (cursor.description, 行列表)，行为元组
+
+    生成器没有读完就被关闭时，剩余的结果会被读掉丢弃，连接随后归还连接池。
+    """
+    if source not in EXPORT_SOURCES:
+        raise ValueError(f"不能导出: {source}")
+    with connection() as conn:
+        with get_backend().stream_cursor(conn) as cursor:
+            cursor.execute(f"SELECT * FROM {source}")
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield cursor.description, rows
+
+def _column_names(description):
+    return [column[0] for column in description]
+
+def _json_value(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"无法转换为 JSON: {type(value).__name__}")
+
+def write_csv(path, batches):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        header_written = False
+        for description, rows in batches:
+            if not header_written:
+                writer.writerow(_column_names(description))
+                header_written = True
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+def write_jsonl(path, batches):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for description, rows in batches:
+            columns = _column_names(description)
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_value))
+                f.write("\n")
+            count += len(rows)
+    return count
+
+def write_parquet(path, batches):
+    """每批写成 Parquet 的一个行组（需要安装 pyarrow）"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("导出 Parquet 需要先安装 pyarrow：pip install pyarrow") from None
+    from pymysql.constants import FIELD_TYPE
+    integer_types = (FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.INT24,
+                     FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG, FIELD_TYPE.YEAR)
+    types = {
+        FIELD_TYPE.FLOAT: pa.float64(), FIELD_TYPE.DOUBLE: pa.float64(),
+        FIELD_TYPE.DECIMAL: pa.string(), FIELD_TYPE.NEWDECIMAL: pa.string(),  # 保留精度，按字符串保存
+        FIELD_TYPE.DATE: pa.date32(),
+        FIELD_TYPE.DATETIME: pa.timestamp("us"), FIELD_TYPE.TIMESTAMP: pa.timestamp("us"),
+    }
+    count = 0
+    writer = None
+    try:
+        for description, rows in batches:
+            if writer is None:
+                # 列的类型按 MySQL 的列类型确定，不从数据推断，保证每个行组的结构一致
+                # （SQLite 不提供列类型，全部按字符串保存）
+                schema = pa.schema([
+                    (column[0], pa.int64() if column[1] in integer_types else types.get(column[1], pa.string()))
+                    for column in description
+                ])
+                writer = pq.ParquetWriter(path, schema)
+            arrays = []
+            for i, field in enumerate(schema):
+                values = [row[i] for row in rows]
+                if pa.types.is_string(field.type):
+                    values = [None if value is None else str(value) for value in values]
+                arrays.append(pa.array(values, type=field.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+def _counted(batches, progress):
+    count = 0
+    for description, rows in batches:
+        yield description, rows
+        count += len(rows)
+        progress(count)
+
+def export(source, path, file_format=None, fetch_size=DEFAULT_FETCH_SIZE, progress=None):
+    """把表或视图 source 导出到 path，返回导出的行数
+
+    file_format 为 csv/jsonl/parquet，默认按扩展名判断；
+    progress 每写完一批调用一次 progress(已导出行数)。
+    """
+    if file_format is None:
+        file_format = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise ValueError(f"无法从文件名判断格式: {path}")
+    if file_format not in WRITERS:
+        raise ValueError(f"不支持的文件格式: {file_format}")
+    stream = stream_batches(source, fetch_size)
+    batches = stream if progress is None else _counted(stream, progress)
+    try:
+        return WRITERS[file_format](path, batches)
+    finally:
+        stream.close()
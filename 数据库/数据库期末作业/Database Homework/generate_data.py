@@ -0,0 +1,35 @@
+import argparse
+
+from db import close_pool
+from datagen import DEFAULT_COUNTS, DataGenerator, load, write_jsonl
+from importer import DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_INTERVAL
+
+def main():
+    parser = argparse.ArgumentParser(description="生成模拟数据并导入数据库（或写成 JSONL 文件）")
+    for entity, count in DEFAULT_COUNTS.items():
+        parser.add_argument(f"--{entity}", type=int, default=count, help=f"生成的行数（默认 {count}）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子，相同的种子和行数生成相同的数据")
+    parser.add_argument("--output", help="写成 <目录>/<实体>.jsonl，不导入数据库")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="每条 INSERT 包含的行数")
+    parser.add_argument("--commit-interval", type=int, default=DEFAULT_COMMIT_INTERVAL, help="每导入多少行提交一次")
+    args = parser.parse_args()
+
+    generator = DataGenerator({entity: getattr(args, entity) for entity in DEFAULT_COUNTS}, seed=args.seed)
+    if args.output:
+        for entity, count in write_jsonl(generator, args.output).items():
+            print(f"{entity}: {count} 行")
+        print(f"已写入 {args.output}")
+        return
+
+    try:
+        results = load(generator, batch_size=args.batch_size, commit_interval=args.commit_interval,
+                       progress=lambda entity, stats: print(f"\r{entity}: {stats}", end="", flush=True))
+    finally:
+        close_pool()
+    print()
+    for entity, stats in results.items():
+        print(f"{entity}: {stats}")
+    print("生成完成！")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import argparse
+
+from db import close_pool
+from importer import ENTITIES, DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_INTERVAL, import_file
+
+def main():
+    parser = argparse.ArgumentParser(description="从 CSV/JSONL 文件批量导入数据")
+    parser.add_argument("entity", choices=sorted(ENTITIES), help="导入的数据类型")
+    parser.add_argument("path", help="CSV 或 JSONL 文件")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="文件格式（默认按扩展名判断）")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="每条 INSERT 包含的行数")
+    parser.add_argument("--commit-interval", type=int, default=DEFAULT_COMMIT_INTERVAL, help="每导入多少行提交一次")
+    args = parser.parse_args()
+
+    print(f"开始导入 {args.path} ...")
+    try:
+        stats = import_file(args.entity, args.path, args.format,
+                            batch_size=args.batch_size,
+                            commit_interval=args.commit_interval,
+                            progress=lambda stats: print(f"\r{stats}", end="", flush=True))
+    finally:
+        close_pool()
+    print(f"\r{stats}")
+    for name, count in sorted(stats.missing.items()):
+        print(f"  找不到 {name}（{count} 次）")
+    print("导入完成！")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+# importer.py
+"""批量导入 Movies/People/Companies/Awards 数据
+
+从 CSV 或 JSONL 文件流式读取，每 batch_size 行用一条多行 INSERT 写入
+（MySQL 的 innodb_autoinc_lock_mode 为 2 时不能保证ID连续，改为逐行 INSERT），
+每 commit_interval 行提交一次。关系（演员、公司、奖项）按名称查找对应的ID。
+
+CSV 中的关系列写成 "名称:字段; 名称:字段" 的形式，例如
+    actors:    "张三:主角:1; 李四:配角"     （名称:角色:是否主演）
+    companies: "某某影业:制作; 某某发行:发行"（名称:关系类型）
+    awards:    "金马奖:2020; 金鸡奖:2021"   （名称:获奖年份）
+JSONL 中也可以写成对象列表，例如 {"actors": [{"name": "张三", "role": "主角", "is_protagonist": true}]}。
+"""
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from db import connection, clear_caches, get_backend, link_insert_sql, _chunks, _in_placeholders, DETAILS_BATCH_SIZE
+
+DEFAULT_BATCH_SIZE = 1000  # 每条多行 INSERT 包含的行数
+DEFAULT_COMMIT_INTERVAL = 10000  # 每导入多少行提交一次
+
+# 实体 -> (表名, 主键, 列名, 整数列, 支持的关系列)
+ENTITIES = {
+    "movies": ("Movies", "movie_id",
+               ("title", "release_year", "director", "genre", "box_office", "description"),
+               ("release_year",), ("actors", "companies", "awards")),
+    "people": ("People", "people_id",
+               ("name", "country", "masterpiece", "brief_intro"),
+               (), ("awards",)),
+    "companies": ("Companies", "company_id",
+                  ("name", "country", "founded_year", "industry", "revenue", "description"),
+                  ("founded_year",), ()),
+    "awards": ("Awards", "award_id",
+               ("name", "category", "year", "description"),
+               ("year",), ()),
+}
+
+# 关系列 -> (关系表, 被引用的表, 被引用表的主键)
+RELATIONS = {
+    "actors": ("Movie_Actors", "People", "people_id"),
+    "companies": ("Movie_Companies", "Companies", "company_id"),
+    "awards": (None, "Awards", "award_id"),  # 关系表取决于实体：Movie_Awards 或 People_Awards
+}
+
+RELATIONSHIP_TYPES = ("制作", "发行")
+
+
+class ImportStats:
+    """导入统计"""
+    def __init__(self):
+        self.rows = 0  # 写入的行数
+        self.skipped = 0  # 缺少必填列而跳过的行数
+        self.links = 0  # 写入的关系数
+        self.missing = {}  # 找不到的关系名称 -> 次数
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        text = (f"已导入 {self.rows} 行，关系 {self.links} 条，跳过 {self.skipped} 行，"
+                f"用时 {self.elapsed:.1f} 秒（{self.rows_per_second:.0f} 行/秒）")
+        if self.missing:
+            text += f"，找不到 {sum(self.missing.values())} 个关联名称"
+        return text
+
+
+# 读取文件
+def read_records(path, file_format=None):
+    """逐行读取 CSV 或 JSONL 文件，返回字典的迭代器（不会一次读入整个文件）"""
+    if file_format is None:
+        file_format = "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json") else "csv"
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+    elif file_format == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path} 第 {line_no} 行不是有效的 JSON: {e}") from e
+    else:
+        raise ValueError(f"不支持的文件格式: {file_format}")
+
+def _clean(value):
+    """去掉首尾空白，空字符串视为 NULL"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+def _to_int(value):
+    value = _clean(value)
+    return None if value is None else int(value)
+
+def _split_items(value):
+    """关系列可以是列表，也可以是用分号分隔的字符串"""
+    value = _clean(value)
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in str(value).replace("；", ";").split(";") if item.strip()]
+
+def _fields(item, names):
+    """把 "名称:字段:字段" 或字典形式的关系拆成字段元组"""
+    if isinstance(item, dict):
+        return tuple(_clean(item.get(name)) for name in names)
+    parts = [_clean(part) for part in str(item).replace("：", ":").split(":")]
+    parts += [None] * (len(names) - len(parts))
+    return tuple(parts[:len(names)])
+
+def _is_true(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y", "是", "主演")
+    return bool(value)
+
+def parse_relations(entity, record):
+    """解析一行中的关系列，返回 {关系列: [字段元组, ...]}"""
+    relations = {}
+    for column in ENTITIES[entity][4]:
+        items = _split_items(record.get(column))
+        if column == "actors":
+            parsed = [(name, role, _is_true(flag))
+                      for name, role, flag in (_fields(item, ("name", "role", "is_protagonist")) for item in items)]
+        elif column == "companies":
+            parsed = [_fields(item, ("name", "relationship_type")) for item in items]
+        else:
+            parsed = [(name, _to_int(year)) for name, year in (_fields(item, ("name", "award_year")) for item in items)]
+        relations[column] = [fields for fields in parsed if fields[0]]
+    return relations
+
+
+# 按名称查找ID
+class NameResolver:
+    """按名称查找 People/Companies/Awards 的ID，查过的名称会缓存下来
+
+    同名的记录有多条时取ID最小的一条。
+    """
+    def __init__(self, cursor, cache=None):
+        self.cursor = cursor
+        self.cache = {} if cache is None else cache  # (表名, 名称) -> ID，找不到时为 None
+
+    def resolve(self, table, pk, names):
+        """批量查找一组名称，返回 {名称: ID}（找不到的名称不出现在结果中）"""
+        unknown = list(dict.fromkeys(name for name in names if (table, name) not in self.cache))
+        for chunk in _chunks(unknown, DETAILS_BATCH_SIZE):
+            for name in chunk:
+                self.cache[(table, name)] = None
+            self.cursor.execute(
+                f"SELECT name, MIN({pk}) AS id FROM {table} WHERE name IN ({_in_placeholders(len(chunk))}) GROUP BY name",
+                chunk)
+            for row in self.cursor.fetchall():
+                self.cache[(table, row['name'])] = row['id']
+        result = {}
+        for name in names:
+            found = self.cache[(table, name)]
+            if found is not None:
+                result[name] = found
+        return result
+
+    def remember(self, table, name, record_id):
+        """记录本次导入新写入的名称，之后的关系可以直接引用"""
+        if name is not None and self.cache.get((table, name)) is None:
+            self.cache[(table, name)] = record_id
+
+
+# 写入
+def _insert_rows(cursor, table, columns, rows, step):
+    """用一条多行 INSERT 写入 rows，返回各行的自增ID
+
+    一条多行 INSERT 分配的自增值是连续的，第一行的ID由后端根据 lastrowid 算出。
+    step 为 None 表示不能保证ID连续（见 MySQLBackend.auto_increment_step），
+    这时逐行 INSERT，各行的ID分别取 lastrowid，关系才不会挂到别的记录上。
+    """
+    marks = "(" + _in_placeholders(len(columns)) + ")"
+    if step is None:
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {marks}"
+        record_ids = []
+        for row in rows:
+            cursor.execute(sql, row)
+            record_ids.append(cursor.lastrowid)
+        return record_ids
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([marks] * len(rows))
+    cursor.execute(sql, [value for row in rows for value in row])
+    first_id = get_backend().first_insert_id(cursor, len(rows), step)
+    return [first_id + i * step for i in range(len(rows))]
+
+def _insert_links(entity, cursor, resolver, record_ids, batch_relations, stats):
+    """写入一批记录的关系"""
+    for column in ENTITIES[entity][4]:
+        link_table, target_table, target_pk = RELATIONS[column]
+        if column == "awards":
+            link_table = "Movie_Awards" if entity == "movies" else "People_Awards"
+        names = [fields[0] for relations in batch_relations for fields in relations[column]]
+        if not names:
+            continue
+        ids = resolver.resolve(target_table, target_pk, names)
+
+        links = []
+        for record_id, relations in zip(record_ids, batch_relations):
+            for fields in relations[column]:
+                target_id = ids.get(fields[0])
+                if target_id is None:
+                    key = f"{target_table}:{fields[0]}"
+                    stats.missing[key] = stats.missing.get(key, 0) + 1
+                    continue
+                if column == "companies" and fields[1] not in RELATIONSHIP_TYPES:
+                    raise ValueError(f"关系类型只能是 {'/'.join(RELATIONSHIP_TYPES)}: {fields[1]}")
+                links.append((record_id, target_id) + tuple(fields[1:]))
+        if not links:
+            continue
+
+        # 已存在的关系（唯一键冲突）会被跳过，rowcount 只计新增的
+        cursor.executemany(link_insert_sql(link_table), links)
+        stats.links += cursor.rowcount
+
+def import_records(entity, records, batch_size=DEFAULT_BATCH_SIZE,
+                   commit_interval=DEFAULT_COMMIT_INTERVAL, progress=None, name_cache=None):
+    """把 records（字典的迭代器）导入到 entity 对应的表
+
+    参数:
+        entity: movies/people/companies/awards
+        batch_size: 每条多行 INSERT 包含的行数
+        commit_interval: 每导入多少行提交一次；中途出错时只回滚最后一次提交之后的行
+        progress: 每写入一批后调用 progress(stats)
+        name_cache: 多次导入共用的名称缓存（字典），先导入的人物、公司、奖项
+                    之后按名称引用时不用再查询数据库
+
+    返回 ImportStats。
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f"未知的数据类型: {entity}")
+    table, _, columns, int_columns, _ = ENTITIES[entity]
+    stats = ImportStats()
+    records = iter(records)
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            step = get_backend().auto_increment_step(cursor)
+            resolver = NameResolver(cursor, name_cache)
+            uncommitted = 0
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                rows, batch_relations = [], []
+                for record in batch:
+                    row = tuple(_to_int(record.get(column)) if column in int_columns else _clean(record.get(column))
+                                for column in columns)
+                    if row[0] is None:
+                        stats.skipped += 1
+                        continue
+                    rows.append(row)
+                    batch_relations.append(parse_relations(entity, record))
+                if not rows:
+                    continue
+
+                record_ids = _insert_rows(cursor, table, columns, rows, step)
+                if table in ("People", "Companies", "Awards"):
+                    for row, record_id in zip(rows, record_ids):
+                        resolver.remember(table, row[0], record_id)
+                _insert_links(entity, cursor, resolver, record_ids, batch_relations, stats)
+
+                stats.rows += len(rows)
+                uncommitted += len(rows)
+                if uncommitted >= commit_interval:
+                    conn.commit()
+                    uncommitted = 0
+                if progress is not None:
+                    progress(stats)
+        conn.commit()
+    clear_caches()
+    return stats
+
+def import_file(entity, path, file_format=None, **options):
+    """从 CSV/JSONL 文件导入，参数同 import_records"""
+    return import_records(entity, read_records(path, file_format), **options)
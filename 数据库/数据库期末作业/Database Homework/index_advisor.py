@@ -0,0 +1,152 @@
+# index_advisor.py
+"""索引检查：对 db.py 中的查询执行 EXPLAIN，找出全表扫描和文件排序
+
+用示例参数调用 db.py 中的各个读取函数，记录它们实际执行的 SELECT 语句，
+再逐条 EXPLAIN。写操作不会被调用。只支持 MySQL 后端。
+"""
+import pymysql
+
+import db
+from query_stats import InstrumentedCursor
+
+# EXPLAIN 中需要提示的情况
+SCAN_TYPES = {"ALL": "全表扫描"}
+EXTRA_WARNINGS = {"Using filesort": "文件排序", "Using temporary": "临时表"}
+
+
+class RecordingCursor(InstrumentedCursor):
+    """记录执行过的 SELECT 语句（参数已代入），耗时照常计入 query_stats"""
+    recorded = []
+
+    def execute(self, query, args=None):
+        if query.lstrip().upper().startswith("SELECT"):
+            RecordingCursor.recorded.append(" ".join(self.mogrify(query, args).split()))
+        return super().execute(query, args)
+
+def _recording_connection():
+    return pymysql.connect(cursorclass=RecordingCursor, **db.DB_CONFIG)
+
+def _first_id(cursor, table, pk):
+    cursor.execute(f"SELECT MIN({pk}) AS id FROM {table}")
+    row = cursor.fetchone()
+    return row['id'] if row and row['id'] is not None else 1
+
+def _first_ids(cursor, table, pk, count=3):
+    """前几条记录的ID，用来检查批量读取（WHERE ... IN (...)）的查询"""
+    cursor.execute(f"SELECT {pk} AS id FROM {table} ORDER BY {pk} LIMIT %s", (count,))
+    return [row['id'] for row in cursor.fetchall()] or [1, 2]
+
+def _next_page(table, column):
+    """读第一行后以它作为续页标记再读一页，用来检查带续页条件的查询"""
+    pk = db.PAGE_TABLES[table][0]
+    rows, _ = db.fetch_page(table, limit=1, order_by=column)
+    if rows:
+        token = rows[0][pk] if column == pk else (rows[0][column], rows[0][pk])
+        db.fetch_page(table, token, limit=20, order_by=column)
+
+def sample_calls(cursor):
+    """db.py 中的读取函数及示例参数"""
+    movie_id = _first_id(cursor, "Movies", "movie_id")
+    people_id = _first_id(cursor, "People", "people_id")
+    movie_ids = _first_ids(cursor, "Movies", "movie_id")
+    people_ids = _first_ids(cursor, "People", "people_id")
+    calls = []
+    for table, (pk, sortable) in db.PAGE_TABLES.items():
+        for column in sortable:
+            calls.append((f"fetch_page({table}, {column})",
+                          lambda t=table, c=column: db.fetch_page(t, limit=20, order_by=c)))
+            calls.append((f"fetch_page({table}, {column}, 续页)",
+                          lambda t=table, c=column: _next_page(t, c)))
+        calls.append((f"fetch_rows({table})",
+                      lambda t=table, ids=_first_ids(cursor, table, pk): db.fetch_rows(t, ids)))
+    for table in db.SEARCH_TABLES:
+        calls.append((f"search({table})", lambda t=table: db.search(t, "电影", limit=20)))
+    calls += [
+        ("tail_operation_logs", lambda: db.tail_operation_logs(None, 500)),
+        ("tail_operation_logs(续读)", lambda: db.tail_operation_logs(0, 500)),
+        ("get_operation_logs", db.get_operation_logs),
+        ("get_movie_details", lambda: db.get_movie_details(movie_id)),
+        ("get_person_details", lambda: db.get_person_details(people_id)),
+        ("get_movie_details_many", lambda: db.get_movie_details_many(movie_ids)),
+        ("get_person_details_many", lambda: db.get_person_details_many(people_ids)),
+        ("get_movie_actors", lambda: db.get_movie_actors(movie_id)),
+        ("get_actor_movies", lambda: db.get_actor_movies(people_id)),
+        ("get_movie_awards", lambda: db.get_movie_awards(movie_id)),
+        ("get_person_awards", lambda: db.get_person_awards(people_id)),
+        ("get_movie_companies", lambda: db.get_movie_companies(movie_id)),
+        ("get_person_awards_summary", lambda: db.get_person_awards_summary()),
+        ("get_movie_awards_summary", lambda: db.get_movie_awards_summary()),
+        ("get_person_awards_summary(awarded_only)", lambda: db.get_person_awards_summary(awarded_only=True)),
+        ("get_movie_awards_summary(awarded_only)", lambda: db.get_movie_awards_summary(awarded_only=True)),
+        ("get_person_awards_summary(id)", lambda: db.get_person_awards_summary(people_id)),
+        ("get_movie_awards_summary(id)", lambda: db.get_movie_awards_summary(movie_id)),
+        ("get_movies_summary", db.get_movies_summary),
+        ("get_people_summary", db.get_people_summary),
+        ("get_companies_summary", db.get_companies_summary),
+        # 读取整张表，全表扫描是预期的结果，列出来是为了确认没有额外的文件排序或临时表
+        ("fetch_all_movies", db.fetch_all_movies),
+        ("fetch_all_people", db.fetch_all_people),
+        ("fetch_all_companies", db.fetch_all_companies),
+        ("fetch_all_awards", db.fetch_all_awards),
+        ("get_all_ui_settings", db.get_all_ui_settings),
+        ("get_ui_setting", lambda: db.get_ui_setting("theme")),
+    ]
+    return calls
+
+def explain(cursor, sql):
+    """返回该语句 EXPLAIN 结果中需要提示的问题列表"""
+    cursor.execute("EXPLAIN " + sql)
+    problems = []
+    for row in cursor.fetchall():
+        table = row.get('table')
+        scan = SCAN_TYPES.get(row.get('type'))
+        if scan:
+            problems.append(f"{table}: {scan}（约 {row.get('rows')} 行）")
+        extra = row.get('Extra') or ""
+        for marker, text in EXTRA_WARNINGS.items():
+            if marker in extra:
+                problems.append(f"{table}: {text}")
+    return problems
+
+def advise():
+    """执行检查，返回 [(函数, SQL, 问题列表), ...]"""
+    RecordingCursor.recorded = []
+    db.clear_caches()  # 缓存命中时不会执行查询
+    # 只在本线程中改用记录查询的连接池，全局连接池和其他线程不受影响
+    pool = db.ConnectionPool(factory=_recording_connection, min_size=0, max_size=2)
+    try:
+        with db.using_pool(pool):
+            with db.connection() as conn, conn.cursor() as cursor:
+                calls = sample_calls(cursor)
+            results = []
+            seen = set()
+            for name, call in calls:
+                RecordingCursor.recorded = []
+                call()
+                for sql in RecordingCursor.recorded:
+                    if sql in seen or "information_schema" in sql:
+                        continue
+                    seen.add(sql)
+                    with db.connection() as conn, conn.cursor() as cursor:
+                        problems = explain(cursor, sql)
+                    results.append((name, sql, problems))
+        return results
+    finally:
+        pool.close()
+
+def main():
+    if db.get_backend().name != "mysql":
+        print("索引检查只支持 MySQL 后端（依赖 MySQL 的 EXPLAIN 输出）")
+        return
+    results = advise()
+    flagged = [result for result in results if result[2]]
+    for name, sql, problems in flagged:
+        print(f"[{name}]")
+        print(f"  {sql}")
+        for problem in problems:
+            print(f"  - {problem}")
+    print(f"共检查 {len(results)} 条查询，{len(flagged)} 条需要注意")
+    db.close_pool()
+
+if __name__ == '__main__':
+    main()
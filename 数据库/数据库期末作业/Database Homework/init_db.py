@@ -1,9 +1,22 @@
-from db import init_database
+import argparse
+
+from db import init_database, rebuild_award_summaries
 
 def main():
+    parser = argparse.ArgumentParser(description="初始化数据库（执行尚未执行的结构变更）")
+    parser.add_argument("--rebuild-award-summaries", action="store_true", help="重新计算全部获奖汇总")
+    args = parser.parse_args()
+
     print("开始初始化数据库...")
-    init_database()
+    applied = init_database()
+    for version, description in applied:
+        print(f"  已执行第 {version} 版：{description}")
+    if not applied:
+        print("数据库结构已是最新")
+    if args.rebuild_award_summaries:
+        rebuild_award_summaries()
+        print("获奖汇总已重新计算")
     print("数据库初始化完成！")
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
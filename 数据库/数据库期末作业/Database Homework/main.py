@@ -1,12 +1,16 @@
 # main.py
 import tkinter as tk
+import db
 from window import App
 
 def main():
+    db.init_database()  # 执行尚未执行的结构变更，结构已是最新时只查询一次版本号
     root = tk.Tk()
     root.geometry("1000x1000")  # 设置更大的窗口尺寸以适应新的内容
     app = App(root)
     root.mainloop()
+    app.jobs.shutdown()
+    db.close_pool()  # 退出前关闭连接池中的连接
 
 if __name__ == "__main__":
     main()
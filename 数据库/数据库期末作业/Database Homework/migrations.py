@@ -0,0 +1,709 @@
+# migrations.py
+"""按版本号顺序执行的数据库结构变更
+
+schema_version 表记录已执行的版本和每个版本的校验和。启动时只读一次
+schema_version，结构已是最新时不执行任何 DDL；有新版本时按顺序执行，
+每执行完一个版本就记录下来。已执行的版本不能再修改（校验和不一致时报错），
+结构有变化时请在末尾追加新版本。
+
+每个版本是一组步骤：SQL 字符串直接执行；add_index() 生成的步骤在索引已存在时跳过，
+这样在引入版本记录之前就已建好的库也能安全地执行。
+MySQL 的 DDL 会隐式提交，所以每个步骤都应当可以重复执行
+（IF NOT EXISTS、先 DROP ... IF EXISTS 再 CREATE 等）。
+"""
+import hashlib
+
+import pymysql
+
+MIGRATION_LOCK = "schema_migration"  # 多个进程同时启动时只让一个执行迁移
+LOCK_TIMEOUT = 60
+
+
+class MigrationError(Exception):
+    """迁移记录与代码不一致"""
+
+
+def add_index(table, index_name, columns, kind="INDEX", options="ALGORITHM=INPLACE, LOCK=NONE"):
+    """建索引的步骤：(表名, 索引名, SQL)，索引已存在时跳过
+
+    默认在线建索引（INPLACE，不锁表）；FULLTEXT 索引不支持 LOCK=NONE，需要传入 LOCK=SHARED。
+    """
+    suffix = " WITH PARSER ngram" if kind == "FULLTEXT INDEX" else ""
+    return (table, index_name,
+            f"ALTER TABLE {table} ADD {kind} {index_name} ({', '.join(columns)}){suffix}, {options}")
+
+def unique_key(table, pk, index_name, columns, keep="first"):
+    """删除 columns 相同的重复行，再建唯一索引
+
+    keep="first" 保留主键最小（最早写入）的一行，"last" 保留最新的一行。
+    删除重复行和建索引之间若又写入了重复行，建索引会失败，重新执行迁移即可。
+    """
+    newer = ">" if keep == "first" else "<"
+    match = " AND ".join(f"d.{column} = k.{column}" for column in columns)
+    return [
+        f"DELETE d FROM {table} d JOIN {table} k ON {match} AND d.{pk} {newer} k.{pk}",
+        add_index(table, index_name, columns, "UNIQUE INDEX"),
+    ]
+
+# 获奖汇总表（第7版）：(汇总表, 主表, 主键, 名称列, 关系表)
+# 注意：已执行的版本由这里生成的 SQL 计算校验和，修改会导致校验失败
+AWARD_TOTALS = {
+    "people": ("people_award_totals", "People", "people_id", "name", "People_Awards"),
+    "movies": ("movie_award_totals", "Movies", "movie_id", "title", "Movie_Awards"),
+}
+
+def award_totals_select(kind, where=""):
+    """计算获奖汇总的 SELECT，where 限定需要重新计算的记录"""
+    _, owner, pk, name, link = AWARD_TOTALS[kind]
+    return f"""
+        SELECT
+            o.{pk},
+            o.{name},
+            GROUP_CONCAT(
+                CONCAT(a.name, ' (', l.award_year, ')')
+                ORDER BY l.award_year DESC
+                SEPARATOR '; '
+            ) AS awards_list,
+            COUNT(l.award_id) AS total_awards
+        FROM {owner} o
+        LEFT JOIN {link} l ON o.{pk} = l.{pk}
+        LEFT JOIN Awards a ON l.award_id = a.award_id
+        {where}
+        GROUP BY o.{pk}, o.{name}
+    """
+
+def award_totals_refresh(kind, where=""):
+    """重新计算汇总表中满足 where 的记录"""
+    totals, _, pk, name, _ = AWARD_TOTALS[kind]
+    return (f"REPLACE INTO {totals} ({pk}, {name}, awards_list, total_awards)"
+            + award_totals_select(kind, where))
+
+def _award_totals_steps(kind, view, name_type):
+    """建汇总表、填充数据、建维护触发器，并把原来的汇总视图改为读汇总表"""
+    totals, owner, pk, name, link = AWARD_TOTALS[kind]
+    prefix = totals[:-len("_totals")]
+    steps = [
+        f"""
+            CREATE TABLE IF NOT EXISTS {totals} (
+                {pk} INT PRIMARY KEY,
+                {name} {name_type},
+                awards_list TEXT,
+                total_awards INT NOT NULL DEFAULT 0,
+                INDEX idx_{totals}_rank (total_awards, {pk}),
+                FOREIGN KEY ({pk}) REFERENCES {owner}({pk}) ON DELETE CASCADE
+            )
+        """,
+        award_totals_refresh(kind),
+    ]
+    triggers = [
+        # 增删改关系时重新计算对应的一条记录
+        (f"{prefix}_link_insert", f"AFTER INSERT ON {link}",
+         award_totals_refresh(kind, f"WHERE o.{pk} = NEW.{pk}") + ";"),
+        (f"{prefix}_link_delete", f"AFTER DELETE ON {link}",
+         award_totals_refresh(kind, f"WHERE o.{pk} = OLD.{pk}") + ";"),
+        (f"{prefix}_link_update", f"AFTER UPDATE ON {link}",
+         award_totals_refresh(kind, f"WHERE o.{pk} IN (OLD.{pk}, NEW.{pk})") + ";"),
+        # 新增记录时没有奖项；删除记录时外键级联删除汇总
+        (f"{prefix}_owner_insert", f"AFTER INSERT ON {owner}",
+         f"INSERT INTO {totals} ({pk}, {name}, awards_list, total_awards) VALUES (NEW.{pk}, NEW.{name}, NULL, 0);"),
+        (f"{prefix}_owner_update", f"AFTER UPDATE ON {owner}",
+         f"UPDATE {totals} SET {name} = NEW.{name} WHERE {pk} = NEW.{pk};"),
+        # 奖项改名或改年份后，获得该奖项的记录的汇总文字也要更新
+        (f"{prefix}_award_update", "AFTER UPDATE ON Awards",
+         award_totals_refresh(kind, f"WHERE o.{pk} IN (SELECT {pk} FROM {link} WHERE award_id = NEW.award_id)") + ";"),
+    ]
+    for trigger, event, body in triggers:
+        steps.append(f"DROP TRIGGER IF EXISTS {trigger}")
+        steps.append(f"""
+            CREATE TRIGGER {trigger}
+            {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+    steps.append(f"DROP VIEW IF EXISTS {view}")
+    steps.append(f"""
+            CREATE VIEW {view} AS
+            SELECT {pk}, {name}, awards_list, total_awards
+            FROM {totals}
+        """)
+    return steps
+
+
+# 关系表的操作日志（第9版）：关系表 -> [(列, 该列引用的实体), ...]
+# 关系增删改时为引用的每个实体各写一条日志，record_id 为实体的ID，
+# 其他客户端据此使该实体按ID缓存的综合信息、演员表等失效（见 db.invalidate_from_logs）
+LINK_LOG_OWNERS = {
+    "Movie_Actors": (("movie_id", "Movies"), ("people_id", "People")),
+    "People_Awards": (("people_id", "People"),),
+    "Movie_Awards": (("movie_id", "Movies"),),
+    "Movie_Companies": (("movie_id", "Movies"),),
+}
+# 触发事件 -> 日志的 operation_type
+LINK_LOG_OPERATIONS = {"INSERT": "LINK_INSERT", "UPDATE": "LINK_UPDATE", "DELETE": "LINK_DELETE"}
+
+def link_log_triggers():
+    """关系表写日志的触发器：[(触发器名, 事件, 触发器体), ...]，SQLite 的结构也使用"""
+    triggers = []
+    for link, owners in LINK_LOG_OWNERS.items():
+        for event, operation in LINK_LOG_OPERATIONS.items():
+            row = "OLD" if event == "DELETE" else "NEW"
+            body = " ".join(
+                f"INSERT INTO operation_logs (operation_type, table_name, record_id) "
+                f"VALUES ('{operation}', '{owner}', {row}.{column});"
+                for column, owner in owners)
+            triggers.append((f"{link.lower()}_log_{event.lower()}", f"AFTER {event} ON {link}", body))
+    return triggers
+
+def _link_log_steps():
+    steps = []
+    for trigger, event, body in link_log_triggers():
+        steps.append(f"DROP TRIGGER IF EXISTS {trigger}")
+        steps.append(f"""
+            CREATE TRIGGER {trigger}
+            {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+    return steps
+
+
+# (版本号, 说明, 步骤列表)
+MIGRATIONS = [
+    (1, "建表", [
+        # 创建电影表
+        """
+            CREATE TABLE IF NOT EXISTS Movies (
+                movie_id INT AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(200) NOT NULL,
+                release_year INT,
+                director VARCHAR(100),
+                genre VARCHAR(50),
+                box_office DECIMAL(15,2),
+                description TEXT
+            )
+        """,
+        
+        # 创建人物表
+        """
+            CREATE TABLE IF NOT EXISTS People (
+                people_id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                country VARCHAR(100),
+                masterpiece TEXT,
+                brief_intro TEXT
+            )
+        """,
+        
+        # 创建公司表
+        """
+            CREATE TABLE IF NOT EXISTS Companies (
+                company_id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                country VARCHAR(100),
+                founded_year INT,
+                industry VARCHAR(100),
+                revenue DECIMAL(15,2),
+                description TEXT
+            )
+        """,
+
+        # 创建日志表
+        """
+            CREATE TABLE IF NOT EXISTS operation_logs (
+                log_id INT AUTO_INCREMENT PRIMARY KEY,
+                operation_type VARCHAR(50),
+                table_name VARCHAR(50),
+                record_id INT,
+                operation_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+        
+        # 创建奖项表
+        """
+            CREATE TABLE IF NOT EXISTS Awards (
+                award_id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                category VARCHAR(100),
+                year INT,
+                description TEXT
+            )
+        """,
+        
+        # 创建人物-奖项关系表
+        """
+            CREATE TABLE IF NOT EXISTS People_Awards (
+                people_award_id INT AUTO_INCREMENT PRIMARY KEY,
+                people_id INT,
+                award_id INT,
+                award_year INT,
+                FOREIGN KEY (people_id) REFERENCES People(people_id) ON DELETE CASCADE,
+                FOREIGN KEY (award_id) REFERENCES Awards(award_id) ON DELETE CASCADE
+            )
+        """,
+        
+        # 创建电影-奖项关系表
+        """
+            CREATE TABLE IF NOT EXISTS Movie_Awards (
+                movie_award_id INT AUTO_INCREMENT PRIMARY KEY,
+                movie_id INT,
+                award_id INT,
+                award_year INT,
+                FOREIGN KEY (movie_id) REFERENCES Movies(movie_id) ON DELETE CASCADE,
+                FOREIGN KEY (award_id) REFERENCES Awards(award_id) ON DELETE CASCADE
+            )
+        """,
+        
+        # 创建电影-公司关系表（制作和发行）
+        """
+            CREATE TABLE IF NOT EXISTS Movie_Companies (
+                movie_company_id INT AUTO_INCREMENT PRIMARY KEY,
+                movie_id INT,
+                company_id INT,
+                relationship_type ENUM('制作', '发行') NOT NULL,
+                FOREIGN KEY (movie_id) REFERENCES Movies(movie_id) ON DELETE CASCADE,
+                FOREIGN KEY (company_id) REFERENCES Companies(company_id) ON DELETE CASCADE
+            )
+        """,
+
+        # 创建演员-电影关系表
+        """
+            CREATE TABLE IF NOT EXISTS Movie_Actors (
+                movie_actor_id INT AUTO_INCREMENT PRIMARY KEY,
+                movie_id INT,
+                people_id INT,
+                role VARCHAR(100),  -- 角色名称
+                is_protagonist BOOLEAN DEFAULT FALSE,  -- 是否是主演
+                FOREIGN KEY (movie_id) REFERENCES Movies(movie_id) ON DELETE CASCADE,
+                FOREIGN KEY (people_id) REFERENCES People(people_id) ON DELETE CASCADE
+            )
+        """,
+
+        # 创建UI设置表
+        """
+            CREATE TABLE IF NOT EXISTS UI_Settings (
+                setting_id INT AUTO_INCREMENT PRIMARY KEY,
+                setting_name VARCHAR(100) NOT NULL,
+                setting_value LONGTEXT,
+                setting_type VARCHAR(50),
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """,
+    ]),
+    (2, "触发器：插入时写操作日志", [
+        # 创建触发器 - People表
+        "DROP TRIGGER IF EXISTS after_person_insert",
+        """
+            CREATE TRIGGER after_person_insert
+            AFTER INSERT ON People
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('INSERT', 'People', NEW.people_id);
+            END
+        """,
+        
+        # 创建触发器 - Movies表
+        "DROP TRIGGER IF EXISTS after_movie_insert",
+        """
+            CREATE TRIGGER after_movie_insert
+            AFTER INSERT ON Movies
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('INSERT', 'Movies', NEW.movie_id);
+            END
+        """,
+        
+        # 创建触发器 - Companies表
+        "DROP TRIGGER IF EXISTS after_company_insert",
+        """
+            CREATE TRIGGER after_company_insert
+            AFTER INSERT ON Companies
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('INSERT', 'Companies', NEW.company_id);
+            END
+        """,
+        
+        # 创建触发器 - Awards表
+        "DROP TRIGGER IF EXISTS after_award_insert",
+        """
+            CREATE TRIGGER after_award_insert
+            AFTER INSERT ON Awards
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('INSERT', 'Awards', NEW.award_id);
+            END
+        """,
+    ]),
+    (3, "存储过程：更新时写操作日志", [
+        # 创建存储过程 - People表
+        "DROP PROCEDURE IF EXISTS update_person_info",
+        """
+            CREATE PROCEDURE update_person_info(
+                IN p_id INT,
+                IN p_name VARCHAR(100),
+                IN p_country VARCHAR(100),
+                IN p_masterpiece TEXT,
+                IN p_brief_intro TEXT
+            )
+            BEGIN
+                UPDATE People 
+                SET name = p_name,
+                    country = p_country,
+                    masterpiece = p_masterpiece,
+                    brief_intro = p_brief_intro
+                WHERE people_id = p_id;
+                
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('UPDATE', 'People', p_id);
+            END
+        """,
+        
+        # 创建存储过程 - Movies表
+        "DROP PROCEDURE IF EXISTS update_movie_info",
+        """
+            CREATE PROCEDURE update_movie_info(
+                IN m_id INT,
+                IN m_title VARCHAR(200),
+                IN m_year INT,
+                IN m_director VARCHAR(100),
+                IN m_genre VARCHAR(50),
+                IN m_box_office DECIMAL(15,2),
+                IN m_description TEXT
+            )
+            BEGIN
+                UPDATE Movies 
+                SET title = m_title,
+                    release_year = m_year,
+                    director = m_director,
+                    genre = m_genre,
+                    box_office = m_box_office,
+                    description = m_description
+                WHERE movie_id = m_id;
+                
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('UPDATE', 'Movies', m_id);
+            END
+        """,
+        
+        # 创建存储过程 - Companies表
+        "DROP PROCEDURE IF EXISTS update_company_info",
+        """
+            CREATE PROCEDURE update_company_info(
+                IN c_id INT,
+                IN c_name VARCHAR(200),
+                IN c_country VARCHAR(100),
+                IN c_year INT,
+                IN c_industry VARCHAR(100),
+                IN c_revenue DECIMAL(15,2),
+                IN c_description TEXT
+            )
+            BEGIN
+                UPDATE Companies 
+                SET name = c_name,
+                    country = c_country,
+                    founded_year = c_year,
+                    industry = c_industry,
+                    revenue = c_revenue,
+                    description = c_description
+                WHERE company_id = c_id;
+                
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('UPDATE', 'Companies', c_id);
+            END
+        """,
+        
+        # 创建存储过程 - Awards表
+        "DROP PROCEDURE IF EXISTS update_award_info",
+        """
+            CREATE PROCEDURE update_award_info(
+                IN a_id INT,
+                IN a_name VARCHAR(200),
+                IN a_category VARCHAR(100),
+                IN a_year INT,
+                IN a_description TEXT
+            )
+            BEGIN
+                UPDATE Awards 
+                SET name = a_name,
+                    category = a_category,
+                    year = a_year,
+                    description = a_description
+                WHERE award_id = a_id;
+                
+                INSERT INTO operation_logs (operation_type, table_name, record_id)
+                VALUES ('UPDATE', 'Awards', a_id);
+            END
+        """,
+    ]),
+    (4, "视图", [
+        # 创建视图 - People
+        "DROP VIEW IF EXISTS people_summary",
+        """
+            CREATE VIEW people_summary AS
+            SELECT people_id, name, country, masterpiece
+            FROM People
+        """,
+        
+        # 创建视图 - Movies
+        "DROP VIEW IF EXISTS movies_summary",
+        """
+            CREATE VIEW movies_summary AS
+            SELECT movie_id, title, release_year, director, genre
+            FROM Movies
+        """,
+        
+        # 创建视图 - Companies
+        "DROP VIEW IF EXISTS companies_summary",
+        """
+            CREATE VIEW companies_summary AS
+            SELECT company_id, name, country, industry, founded_year
+            FROM Companies
+        """,
+        
+        # 创建视图 - Awards
+        "DROP VIEW IF EXISTS awards_summary",
+        """
+            CREATE VIEW awards_summary AS
+            SELECT award_id, name, category, year
+            FROM Awards
+        """,
+        
+        # 创建获奖情况视图（人物）
+        "DROP VIEW IF EXISTS people_awards_view",
+        """
+            CREATE VIEW people_awards_view AS
+            SELECT 
+                p.people_id,
+                p.name as person_name,
+                a.name as award_name,
+                a.category as award_category,
+                pa.award_year
+            FROM People p
+            JOIN People_Awards pa ON p.people_id = pa.people_id
+            JOIN Awards a ON pa.award_id = a.award_id
+        """,
+        
+        # 创建获奖情况视图（电影）
+        "DROP VIEW IF EXISTS movie_awards_view",
+        """
+            CREATE VIEW movie_awards_view AS
+            SELECT 
+                m.movie_id,
+                m.title as movie_title,
+                a.name as award_name,
+                a.category as award_category,
+                ma.award_year
+            FROM Movies m
+            JOIN Movie_Awards ma ON m.movie_id = ma.movie_id
+            JOIN Awards a ON ma.award_id = a.award_id
+        """,
+        
+        # 创建电影公司关系视图
+        "DROP VIEW IF EXISTS movie_companies_view",
+        """
+            CREATE VIEW movie_companies_view AS
+            SELECT 
+                m.movie_id,
+                m.title as movie_title,
+                c.name as company_name,
+                mc.relationship_type
+            FROM Movies m
+            JOIN Movie_Companies mc ON m.movie_id = mc.movie_id
+            JOIN Companies c ON mc.company_id = c.company_id
+        """,
+        
+        # 创建演员参演情况视图
+        "DROP VIEW IF EXISTS movie_actors_view",
+        """
+            CREATE VIEW movie_actors_view AS
+            SELECT 
+                m.movie_id,
+                m.title as movie_title,
+                p.people_id,
+                p.name as actor_name,
+                ma.role,
+                ma.is_protagonist
+            FROM Movies m
+            JOIN Movie_Actors ma ON m.movie_id = ma.movie_id
+            JOIN People p ON ma.people_id = p.people_id
+        """,
+
+        # 创建人物获奖汇总视图
+        "DROP VIEW IF EXISTS people_awards_summary",
+        """
+            CREATE VIEW people_awards_summary AS
+            SELECT 
+                p.people_id,
+                p.name,
+                GROUP_CONCAT(
+                    CONCAT(a.name, ' (', pa.award_year, ')')
+                    ORDER BY pa.award_year DESC
+                    SEPARATOR '; '
+                ) as awards_list,
+                COUNT(*) as total_awards
+            FROM People p
+            LEFT JOIN People_Awards pa ON p.people_id = pa.people_id
+            LEFT JOIN Awards a ON pa.award_id = a.award_id
+            GROUP BY p.people_id, p.name
+        """,
+
+        # 创建电影获奖汇总视图
+        "DROP VIEW IF EXISTS movies_awards_summary",
+        """
+            CREATE VIEW movies_awards_summary AS
+            SELECT 
+                m.movie_id,
+                m.title,
+                GROUP_CONCAT(
+                    CONCAT(a.name, ' (', ma.award_year, ')')
+                    ORDER BY ma.award_year DESC
+                    SEPARATOR '; '
+                ) as awards_list,
+                COUNT(*) as total_awards
+            FROM Movies m
+            LEFT JOIN Movie_Awards ma ON m.movie_id = ma.movie_id
+            LEFT JOIN Awards a ON ma.award_id = a.award_id
+            GROUP BY m.movie_id, m.title
+        """,
+    ]),
+    (5, "全文索引（ngram 分词，支持中文）", [
+        add_index("Movies", "ft_movies", ("title", "description"), "FULLTEXT INDEX", "ALGORITHM=INPLACE, LOCK=SHARED"),
+        add_index("People", "ft_people", ("name", "brief_intro"), "FULLTEXT INDEX", "ALGORITHM=INPLACE, LOCK=SHARED"),
+        add_index("Companies", "ft_companies", ("name", "description"), "FULLTEXT INDEX", "ALGORITHM=INPLACE, LOCK=SHARED"),
+        add_index("Awards", "ft_awards", ("name", "description"), "FULLTEXT INDEX", "ALGORITHM=INPLACE, LOCK=SHARED"),
+    ]),
+    (6, "为常用的过滤、排序和关联列建立索引", [
+        # 按年份、类型、导演筛选和排序电影；InnoDB 二级索引自带主键，
+        # 所以 ORDER BY release_year, movie_id 的分页也能直接走索引
+        add_index("Movies", "idx_movies_release_year", ("release_year",)),
+        add_index("Movies", "idx_movies_genre_year", ("genre", "release_year")),
+        add_index("Movies", "idx_movies_director", ("director",)),
+        add_index("People", "idx_people_name", ("name",)),
+        add_index("People", "idx_people_country", ("country",)),
+        # 导入数据时按名称查找公司和奖项
+        add_index("Companies", "idx_companies_name", ("name",)),
+        add_index("Awards", "idx_awards_name", ("name",)),
+        add_index("Awards", "idx_awards_year", ("year",)),
+        add_index("operation_logs", "idx_logs_time", ("operation_time",)),
+        add_index("operation_logs", "idx_logs_record", ("table_name", "record_id")),
+        # 查主演：WHERE movie_id = ? ORDER BY is_protagonist
+        add_index("Movie_Actors", "idx_movie_actors_protagonist", ("movie_id", "is_protagonist")),
+    ]),
+    (7, "获奖汇总表：由触发器增量维护，替代 GROUP BY 视图", [
+        *_award_totals_steps("people", "people_awards_summary", "VARCHAR(100)"),
+        *_award_totals_steps("movies", "movies_awards_summary", "VARCHAR(200)"),
+        # 删除奖项时外键级联删除关系不会触发关系表的触发器，所以先显式删除关系
+        "DROP TRIGGER IF EXISTS award_totals_award_delete",
+        """
+            CREATE TRIGGER award_totals_award_delete
+            BEFORE DELETE ON Awards
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM People_Awards WHERE award_id = OLD.award_id;
+                DELETE FROM Movie_Awards WHERE award_id = OLD.award_id;
+            END
+        """,
+    ]),
+    (8, "关系表和UI设置的唯一键（先删除已有的重复行）", [
+        # 同一位演员在一部电影中只出现一次；奖项和公司关系按全部列判断重复
+        *unique_key("Movie_Actors", "movie_actor_id", "uk_movie_actors", ("movie_id", "people_id")),
+        *unique_key("People_Awards", "people_award_id", "uk_people_awards", ("people_id", "award_id", "award_year")),
+        *unique_key("Movie_Awards", "movie_award_id", "uk_movie_awards", ("movie_id", "award_id", "award_year")),
+        *unique_key("Movie_Companies", "movie_company_id", "uk_movie_companies",
+                    ("movie_id", "company_id", "relationship_type")),
+        # 之前 save_ui_setting 每次保存都新增一行，保留最后保存的值
+        *unique_key("UI_Settings", "setting_id", "uk_ui_settings_name", ("setting_name",), keep="last"),
+    ]),
+    # 外键级联删除不会触发关系表的触发器，但删除实体本身有日志，
+    # 依赖该实体的其他缓存（如人物参演作品依赖电影）会按依赖失效
+    (9, "触发器：关系表增删改时写操作日志", _link_log_steps()),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def _step_sql(step):
+    return step if isinstance(step, str) else step[2]
+
+def checksum(steps):
+    """一个版本的校验和（忽略空白的差异）"""
+    digest = hashlib.sha256()
+    for step in steps:
+        digest.update(" ".join(_step_sql(step).split()).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+def index_exists(cursor, table, index_name):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cursor.fetchone() is not None
+
+def applied_versions(cursor):
+    """返回 {版本号: 校验和}；schema_version 表不存在时返回 None"""
+    try:
+        cursor.execute("SELECT version, checksum FROM schema_version")
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] == 1146:  # 表不存在
+            return None
+        raise
+    return {row['version']: row['checksum'] for row in cursor.fetchall()}
+
+def _pending(applied, migrations=MIGRATIONS):
+    """校验已执行的版本，返回尚未执行的版本（migrations 默认为本文件中 MySQL 的版本）"""
+    pending = []
+    for version, description, steps in migrations:
+        if version not in applied:
+            pending.append((version, description, steps))
+        elif applied[version] != checksum(steps):
+            raise MigrationError(f"第 {version} 版迁移（{description}）执行后被修改过，请改为追加新版本")
+    return pending
+
+def migrate(cursor):
+    """执行尚未执行的版本，返回执行了的 [(版本号, 说明), ...]
+
+    结构已是最新时只执行一条 SELECT。
+    """
+    applied = applied_versions(cursor)
+    if applied is not None and not _pending(applied):
+        return []
+
+    cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK, LOCK_TIMEOUT))
+    if not cursor.fetchone()['locked']:
+        raise MigrationError("等待其他进程执行迁移超时")
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(200),
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # 拿到锁之后重新读取，其他进程可能已经执行过了
+        done = []
+        for version, description, steps in _pending(applied_versions(cursor)):
+            for step in steps:
+                if isinstance(step, str):
+                    cursor.execute(step)
+                elif not index_exists(cursor, step[0], step[1]):
+                    cursor.execute(step[2])
+            cursor.execute("INSERT INTO schema_version (version, description, checksum) VALUES (%s, %s, %s)",
+                           (version, description, checksum(steps)))
+            cursor.connection.commit()
+            done.append((version, description))
+        return done
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+        cursor.fetchall()
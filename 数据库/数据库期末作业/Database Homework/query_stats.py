@@ -0,0 +1,321 @@
+# query_stats.py
+"""查询统计：记录每条 SQL 的耗时和行数，超过阈值的写入慢查询日志
+
+db.py 新建的连接默认使用 InstrumentedCursor，所有 execute/executemany/callproc
+都会被计时，按 SQL 指纹（字面量和占位符替换为 ?，IN 列表合并为 (...)）汇总。
+执行时间是发送语句并读取结果的时间（普通游标在 execute 中已读入全部行），
+读取时间是 fetch* 所用的时间（SSCursor 在这里才逐批从服务器读取）。
+参数只保留数字，字符串等按类型和长度记录，不会把用户数据写进日志。
+"""
+import decimal
+import functools
+import logging
+import re
+import threading
+import time
+
+import pymysql
+
+SLOW_QUERY_THRESHOLD = 0.5  # 超过该秒数的查询写入慢查询日志
+SLOW_QUERY_LOG = "slow_queries.log"
+MAX_PARAMS = 5  # 日志中最多显示的参数个数
+
+# 直方图各桶的上限（毫秒），最后一个桶收集更慢的查询
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_enabled = True
+_slow_logger = logging.getLogger("db.slow_query")
+_slow_logger.propagate = False
+_slow_log_lock = threading.Lock()
+
+
+def configure(enabled=None, slow_threshold=None, slow_log=None):
+    """设置是否统计、慢查询阈值（秒）和慢查询日志文件"""
+    global _enabled, SLOW_QUERY_THRESHOLD, SLOW_QUERY_LOG
+    if enabled is not None:
+        _enabled = enabled
+    if slow_threshold is not None:
+        SLOW_QUERY_THRESHOLD = slow_threshold
+    if slow_log is not None and slow_log != SLOW_QUERY_LOG:
+        SLOW_QUERY_LOG = slow_log
+        with _slow_log_lock:
+            for handler in list(_slow_logger.handlers):
+                _slow_logger.removeHandler(handler)
+                handler.close()
+
+def _log_slow(entry):
+    with _slow_log_lock:
+        if not _slow_logger.handlers:
+            handler = logging.FileHandler(SLOW_QUERY_LOG, encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            _slow_logger.addHandler(handler)
+            _slow_logger.setLevel(logging.INFO)
+    _slow_logger.info(entry)
+
+
+# SQL 指纹
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """把 SQL 归一化为指纹：同一条语句换了参数或 IN 列表长度，指纹相同"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = bytes(sql).decode("utf-8", errors="replace")
+    sql = " ".join(sql.split())
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _LISTS.sub("(...)", sql)
+    return _REPEATED_LISTS.sub("(...)", sql)
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float, decimal.Decimal)):
+        return repr(value)
+    if isinstance(value, (str, bytes, bytearray, list, tuple, set, dict)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+def redact(args):
+    """参数的脱敏表示：数字原样保留，其他值只保留类型和长度"""
+    if args is None:
+        return ""
+    if isinstance(args, dict):
+        items = [f"{key}={_redact_value(value)}" for key, value in list(args.items())[:MAX_PARAMS]]
+    elif isinstance(args, (list, tuple)):
+        items = [_redact_value(value) for value in args[:MAX_PARAMS]]
+    else:
+        return _redact_value(args)
+    if len(args) > MAX_PARAMS:
+        items.append(f"...共 {len(args)} 个")
+    return "(" + ", ".join(items) + ")"
+
+
+# 统计
+class Histogram:
+    """按 HISTOGRAM_BOUNDS 分桶的耗时直方图，百分位数取所在桶的上限"""
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        milliseconds = seconds * 1000
+        index = 0
+        while index < len(HISTOGRAM_BOUNDS) and milliseconds > HISTOGRAM_BOUNDS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """第 p 百分位的耗时（秒）"""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                if index < len(HISTOGRAM_BOUNDS):
+                    return min(HISTOGRAM_BOUNDS[index] / 1000, self.max)
+                break
+        return self.max
+
+
+class QueryStat:
+    """一个指纹的累计统计"""
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.histogram = Histogram()
+        self.execute_time = 0.0
+        self.fetch_time = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.sample = ""  # 最慢一次的参数（已脱敏）
+
+    def snapshot(self):
+        histogram = self.histogram
+        return {
+            "fingerprint": self.fingerprint,
+            "count": histogram.count,
+            "total": histogram.total,
+            "mean": histogram.total / histogram.count if histogram.count else 0.0,
+            "p50": histogram.percentile(50),
+            "p95": histogram.percentile(95),
+            "p99": histogram.percentile(99),
+            "max": histogram.max,
+            "execute": self.execute_time,
+            "fetch": self.fetch_time,
+            "rows": self.rows,
+            "errors": self.errors,
+            "sample": self.sample,
+            "buckets": list(histogram.buckets),
+        }
+
+
+class QueryStats:
+    """线程安全的查询统计，按 SQL 指纹汇总；另外单独统计建立连接的耗时"""
+    ORDERS = ("total", "mean", "p95", "max", "count", "rows")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries = {}
+        self._connects = Histogram()
+
+    def record(self, sql, args, execute_time, fetch_time, rows, failed=False):
+        key = fingerprint(sql)
+        total = execute_time + fetch_time
+        with self._lock:
+            stat = self._queries.get(key)
+            if stat is None:
+                stat = self._queries[key] = QueryStat(key)
+            if total >= stat.histogram.max:
+                stat.sample = redact(args)
+            stat.histogram.add(total)
+            stat.execute_time += execute_time
+            stat.fetch_time += fetch_time
+            stat.rows += rows
+            stat.errors += failed
+        if total >= SLOW_QUERY_THRESHOLD:
+            _log_slow(f"{total * 1000:.1f} ms（执行 {execute_time * 1000:.1f} ms，读取 {fetch_time * 1000:.1f} ms）"
+                      f" 行数 {rows}{' 出错' if failed else ''} | {key} | 参数 {redact(args)}")
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self._connects.add(seconds)
+
+    def top(self, n=20, order_by="total"):
+        """按 order_by 从大到小返回前 n 个指纹的统计"""
+        if order_by not in self.ORDERS:
+            raise ValueError(f"不支持的排序方式: {order_by}")
+        with self._lock:
+            snapshots = [stat.snapshot() for stat in self._queries.values()]
+        snapshots.sort(key=lambda item: item[order_by], reverse=True)
+        return snapshots[:n]
+
+    def connects(self):
+        with self._lock:
+            histogram = self._connects
+            return {
+                "count": histogram.count,
+                "total": histogram.total,
+                "mean": histogram.total / histogram.count if histogram.count else 0.0,
+                "p95": histogram.percentile(95),
+                "max": histogram.max,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._connects = Histogram()
+
+
+STATS = QueryStats()
+
+def top_queries(n=20, order_by="total"):
+    return STATS.top(n, order_by)
+
+def connect_stats():
+    return STATS.connects()
+
+def reset_stats():
+    STATS.reset()
+
+def record_connect(seconds):
+    if _enabled:
+        STATS.record_connect(seconds)
+
+
+# 计时游标
+class _Instrumented:
+    """给游标的 execute/executemany/callproc 和 fetch* 计时
+
+    一条语句的统计在下一条语句执行或游标关闭时记录，这样 SSCursor 之后
+    逐批读取的时间也能算进去。
+    """
+    counts_fetched_rows = False  # 不缓冲的游标要读完才知道行数
+    _pending = None  # [SQL, 参数, 执行时间, 读取时间, 行数]
+    _nested = False
+
+    def _timed(self, sql, args, call):
+        if self._nested or not _enabled:
+            return call()
+        self._finish()
+        self._nested = True
+        started = time.perf_counter()
+        try:
+            result = call()
+        except Exception:
+            STATS.record(sql, args, time.perf_counter() - started, 0.0, 0, failed=True)
+            raise
+        finally:
+            self._nested = False
+        rows = 0 if self.counts_fetched_rows else max(self.rowcount, 0)
+        self._pending = [sql, args, time.perf_counter() - started, 0.0, rows]
+        return result
+
+    def _timed_fetch(self, fetch, count, *args):
+        if self._pending is None or self._nested:
+            return fetch(*args)
+        self._nested = True
+        started = time.perf_counter()
+        try:
+            result = fetch(*args)
+        finally:
+            self._nested = False
+        self._pending[3] += time.perf_counter() - started
+        if self.counts_fetched_rows:
+            self._pending[4] += count(result)
+        return result
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            STATS.record(*pending)
+
+    def execute(self, query, args=None):
+        execute = super().execute
+        return self._timed(query, args, lambda: execute(query, args))
+
+    def executemany(self, query, args):
+        # 分批发送时内部会多次调用 execute，整体按一条语句计时
+        executemany = super().executemany
+        return self._timed(query, args, lambda: executemany(query, args))
+
+    def callproc(self, procname, args=()):
+        callproc = super().callproc
+        return self._timed(f"CALL {procname}", args, lambda: callproc(procname, args))
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone, lambda row: row is not None)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, len, size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall, len)
+
+    def close(self):
+        # SSCursor 关闭时会读掉剩余的结果，这部分也算读取时间
+        started = time.perf_counter()
+        try:
+            super().close()
+        finally:
+            if self._pending is not None:
+                self._pending[3] += time.perf_counter() - started
+            self._finish()
+
+
+class InstrumentedCursor(_Instrumented, pymysql.cursors.DictCursor):
+    """带统计的 DictCursor，db.py 的默认游标"""
+
+
+class InstrumentedSSCursor(_Instrumented, pymysql.cursors.SSCursor):
+    """带统计的不缓冲游标（用于流式导出）"""
+    counts_fetched_rows = True
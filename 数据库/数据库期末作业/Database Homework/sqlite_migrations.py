@@ -0,0 +1,428 @@
+# sqlite_migrations.py
+"""SQLite 后端的数据库结构，与 migrations.py 中 MySQL 的最新结构等价
+
+版本记录、校验和的规则与 migrations.py 相同（见那里的说明），但版本号独立编号。
+SQLite 的 DDL 可以放在事务中，待执行的版本在一个事务（BEGIN IMMEDIATE）中执行，
+失败时全部回滚；写锁同时保证多个进程不会同时执行迁移。
+
+与 MySQL 的不同之处：
+- 没有存储过程：更新记录并写日志由 backends.SQLiteBackend.call_update 在同一事务中完成
+- 全文检索用 FTS5 表，由触发器同步。文本先由 ngrams() 切成重叠的二字片段，
+  检索效果与 MySQL 的 ngram 分词（ngram_token_size=2）一致。ngrams 是在每个连接上
+  注册的 Python 函数，用其他工具直接修改这几张表会因为找不到该函数而失败
+- 外键级联删除会触发关系表的触发器，不需要 MySQL 中删除奖项前先删除关系的触发器
+"""
+import re
+
+from migrations import AWARD_TOTALS, checksum, link_log_triggers, _pending
+
+NGRAM_TOKEN_SIZE = 2  # 与 MySQL 的 ngram_token_size 一致
+
+# 实体表 -> (FTS5 表, 主键, 检索的列)，列与 db.SEARCH_TABLES 一致
+FTS_TABLES = {
+    "Movies": ("fts_movies", "movie_id", ("title", "description")),
+    "People": ("fts_people", "people_id", ("name", "brief_intro")),
+    "Companies": ("fts_companies", "company_id", ("name", "description")),
+    "Awards": ("fts_awards", "award_id", ("name", "description")),
+}
+
+_WORD = re.compile(r"\w+")
+
+def ngrams(*texts):
+    """把文本切成重叠的二字片段，用空格连接（只有一个字的词保留原样）
+
+    例如 "电影追逐 Love" -> "电影 影追 追逐 lo ov ve"，FTS5 再按空格分词。
+    """
+    tokens = []
+    for text in texts:
+        if text is None:
+            continue
+        for word in _WORD.findall(str(text).lower()):
+            if len(word) <= NGRAM_TOKEN_SIZE:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + NGRAM_TOKEN_SIZE] for i in range(len(word) - NGRAM_TOKEN_SIZE + 1))
+    return " ".join(tokens)
+
+def fts_query(words):
+    """把检索词转换为 FTS5 的检索式，每个词都必须出现；没有可检索的内容时返回 None
+
+    每个词的二字片段组成一个短语（片段必须连续出现，即该词是某个词的一部分），
+    只有一个字的词做前缀匹配。
+    """
+    terms = []
+    for word in words:
+        for part in _WORD.findall(word.lower()):
+            if len(part) < NGRAM_TOKEN_SIZE:
+                terms.append(f'"{part}"*')
+            else:
+                terms.append(f'"{ngrams(part)}"')
+    return " AND ".join(terms) or None
+
+
+def award_totals_select(kind, where=""):
+    """计算获奖汇总的 SELECT，与 migrations.award_totals_select 的结果相同
+
+    SQLite 3.44 之前的 group_concat 不支持 ORDER BY，改为对排好序的子查询做聚合。
+    """
+    _, owner, pk, name, link = AWARD_TOTALS[kind]
+    return f"""
+        SELECT
+            o.{pk},
+            o.{name},
+            (SELECT group_concat(item, '; ') FROM (
+                SELECT a.name || ' (' || l.award_year || ')' AS item
+                FROM {link} l
+                JOIN Awards a ON l.award_id = a.award_id
+                WHERE l.{pk} = o.{pk}
+                ORDER BY l.award_year DESC
+            )) AS awards_list,
+            (SELECT COUNT(l.award_id) FROM {link} l WHERE l.{pk} = o.{pk}) AS total_awards
+        FROM {owner} o
+        {where}
+    """
+
+def award_totals_refresh(kind, where=""):
+    """重新计算汇总表中满足 where 的记录"""
+    totals, _, pk, name, _ = AWARD_TOTALS[kind]
+    return (f"REPLACE INTO {totals} ({pk}, {name}, awards_list, total_awards)"
+            + award_totals_select(kind, where))
+
+def _trigger(name, event, body):
+    return [
+        f"DROP TRIGGER IF EXISTS {name}",
+        f"""
+            CREATE TRIGGER {name}
+            {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """,
+    ]
+
+def _fts_steps(table):
+    fts, pk, columns = FTS_TABLES[table]
+    new = ", ".join(f"NEW.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(body, tokenize = 'unicode61 remove_diacritics 0')",
+        f"DELETE FROM {fts}",
+        f"INSERT INTO {fts} (rowid, body) SELECT {pk}, ngrams({', '.join(columns)}) FROM {table}",
+        *_trigger(f"{fts}_insert", f"AFTER INSERT ON {table}",
+                  f"INSERT INTO {fts} (rowid, body) VALUES (NEW.{pk}, ngrams({new}));"),
+        *_trigger(f"{fts}_update", f"AFTER UPDATE OF {', '.join(columns)} ON {table}",
+                  f"UPDATE {fts} SET body = ngrams({new}) WHERE rowid = NEW.{pk};"),
+        *_trigger(f"{fts}_delete", f"AFTER DELETE ON {table}",
+                  f"DELETE FROM {fts} WHERE rowid = OLD.{pk};"),
+    ]
+
+def _award_totals_steps(kind, view, name_type):
+    totals, owner, pk, name, link = AWARD_TOTALS[kind]
+    prefix = totals[:-len("_totals")]
+    return [
+        f"""
+            CREATE TABLE IF NOT EXISTS {totals} (
+                {pk} INTEGER PRIMARY KEY,
+                {name} {name_type},
+                awards_list TEXT,
+                total_awards INT NOT NULL DEFAULT 0,
+                FOREIGN KEY ({pk}) REFERENCES {owner}({pk}) ON DELETE CASCADE
+            )
+        """,
+        f"CREATE INDEX IF NOT EXISTS idx_{totals}_rank ON {totals} (total_awards, {pk})",
+        award_totals_refresh(kind),
+        *_trigger(f"{prefix}_link_insert", f"AFTER INSERT ON {link}",
+                  award_totals_refresh(kind, f"WHERE o.{pk} = NEW.{pk}") + ";"),
+        *_trigger(f"{prefix}_link_delete", f"AFTER DELETE ON {link}",
+                  award_totals_refresh(kind, f"WHERE o.{pk} = OLD.{pk}") + ";"),
+        *_trigger(f"{prefix}_link_update", f"AFTER UPDATE ON {link}",
+                  award_totals_refresh(kind, f"WHERE o.{pk} IN (OLD.{pk}, NEW.{pk})") + ";"),
+        *_trigger(f"{prefix}_owner_insert", f"AFTER INSERT ON {owner}",
+                  f"INSERT INTO {totals} ({pk}, {name}, awards_list, total_awards) "
+                  f"VALUES (NEW.{pk}, NEW.{name}, NULL, 0);"),
+        *_trigger(f"{prefix}_owner_update", f"AFTER UPDATE OF {name} ON {owner}",
+                  f"UPDATE {totals} SET {name} = NEW.{name} WHERE {pk} = NEW.{pk};"),
+        *_trigger(f"{prefix}_award_update", "AFTER UPDATE ON Awards",
+                  award_totals_refresh(kind, f"WHERE o.{pk} IN (SELECT {pk} FROM {link} WHERE award_id = NEW.award_id)")
+                  + ";"),
+        f"DROP VIEW IF EXISTS {view}",
+        f"""
+            CREATE VIEW {view} AS
+            SELECT {pk}, {name}, awards_list, total_awards
+            FROM {totals}
+        """,
+    ]
+
+def _insert_log_trigger(table, pk):
+    return _trigger(f"after_{table.lower()}_insert", f"AFTER INSERT ON {table}",
+                    f"INSERT INTO operation_logs (operation_type, table_name, record_id) "
+                    f"VALUES ('INSERT', '{table}', NEW.{pk});")
+
+
+# (版本号, 说明, 步骤列表)
+MIGRATIONS = [
+    (1, "建表（包括关系表和UI设置的唯一键）", [
+        """
+            CREATE TABLE IF NOT EXISTS Movies (
+                movie_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title VARCHAR(200) NOT NULL,
+                release_year INT,
+                director VARCHAR(100),
+                genre VARCHAR(50),
+                box_office DECIMAL(15,2),
+                description TEXT
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS People (
+                people_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name VARCHAR(100) NOT NULL,
+                country VARCHAR(100),
+                masterpiece TEXT,
+                brief_intro TEXT
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS Companies (
+                company_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name VARCHAR(200) NOT NULL,
+                country VARCHAR(100),
+                founded_year INT,
+                industry VARCHAR(100),
+                revenue DECIMAL(15,2),
+                description TEXT
+            )
+        """,
+        # 时间按本地时间记录，与 MySQL 的 CURRENT_TIMESTAMP 一致
+        """
+            CREATE TABLE IF NOT EXISTS operation_logs (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                operation_type VARCHAR(50),
+                table_name VARCHAR(50),
+                record_id INT,
+                operation_time TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS Awards (
+                award_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name VARCHAR(200) NOT NULL,
+                category VARCHAR(100),
+                year INT,
+                description TEXT
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS People_Awards (
+                people_award_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                people_id INT REFERENCES People(people_id) ON DELETE CASCADE,
+                award_id INT REFERENCES Awards(award_id) ON DELETE CASCADE,
+                award_year INT,
+                CONSTRAINT uk_people_awards UNIQUE (people_id, award_id, award_year)
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS Movie_Awards (
+                movie_award_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                movie_id INT REFERENCES Movies(movie_id) ON DELETE CASCADE,
+                award_id INT REFERENCES Awards(award_id) ON DELETE CASCADE,
+                award_year INT,
+                CONSTRAINT uk_movie_awards UNIQUE (movie_id, award_id, award_year)
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS Movie_Companies (
+                movie_company_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                movie_id INT REFERENCES Movies(movie_id) ON DELETE CASCADE,
+                company_id INT REFERENCES Companies(company_id) ON DELETE CASCADE,
+                relationship_type VARCHAR(10) NOT NULL CHECK (relationship_type IN ('制作', '发行')),
+                CONSTRAINT uk_movie_companies UNIQUE (movie_id, company_id, relationship_type)
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS Movie_Actors (
+                movie_actor_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                movie_id INT REFERENCES Movies(movie_id) ON DELETE CASCADE,
+                people_id INT REFERENCES People(people_id) ON DELETE CASCADE,
+                role VARCHAR(100),  -- 角色名称
+                is_protagonist BOOLEAN DEFAULT FALSE,  -- 是否是主演
+                CONSTRAINT uk_movie_actors UNIQUE (movie_id, people_id)
+            )
+        """,
+        """
+            CREATE TABLE IF NOT EXISTS UI_Settings (
+                setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                setting_name VARCHAR(100) NOT NULL,
+                setting_value TEXT,
+                setting_type VARCHAR(50),
+                description TEXT,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                CONSTRAINT uk_ui_settings_name UNIQUE (setting_name)
+            )
+        """,
+        # 代替 MySQL 的 ON UPDATE CURRENT_TIMESTAMP
+        *_trigger("ui_settings_touch", "AFTER UPDATE ON UI_Settings",
+                  "UPDATE UI_Settings SET updated_at = datetime('now', 'localtime') "
+                  "WHERE setting_id = NEW.setting_id;"),
+    ]),
+    (2, "触发器：插入时写操作日志", [
+        *_insert_log_trigger("People", "people_id"),
+        *_insert_log_trigger("Movies", "movie_id"),
+        *_insert_log_trigger("Companies", "company_id"),
+        *_insert_log_trigger("Awards", "award_id"),
+    ]),
+    (3, "视图", [
+        "DROP VIEW IF EXISTS people_summary",
+        """
+            CREATE VIEW people_summary AS
+            SELECT people_id, name, country, masterpiece
+            FROM People
+        """,
+        "DROP VIEW IF EXISTS movies_summary",
+        """
+            CREATE VIEW movies_summary AS
+            SELECT movie_id, title, release_year, director, genre
+            FROM Movies
+        """,
+        "DROP VIEW IF EXISTS companies_summary",
+        """
+            CREATE VIEW companies_summary AS
+            SELECT company_id, name, country, industry, founded_year
+            FROM Companies
+        """,
+        "DROP VIEW IF EXISTS awards_summary",
+        """
+            CREATE VIEW awards_summary AS
+            SELECT award_id, name, category, year
+            FROM Awards
+        """,
+        "DROP VIEW IF EXISTS people_awards_view",
+        """
+            CREATE VIEW people_awards_view AS
+            SELECT
+                p.people_id,
+                p.name as person_name,
+                a.name as award_name,
+                a.category as award_category,
+                pa.award_year
+            FROM People p
+            JOIN People_Awards pa ON p.people_id = pa.people_id
+            JOIN Awards a ON pa.award_id = a.award_id
+        """,
+        "DROP VIEW IF EXISTS movie_awards_view",
+        """
+            CREATE VIEW movie_awards_view AS
+            SELECT
+                m.movie_id,
+                m.title as movie_title,
+                a.name as award_name,
+                a.category as award_category,
+                ma.award_year
+            FROM Movies m
+            JOIN Movie_Awards ma ON m.movie_id = ma.movie_id
+            JOIN Awards a ON ma.award_id = a.award_id
+        """,
+        "DROP VIEW IF EXISTS movie_companies_view",
+        """
+            CREATE VIEW movie_companies_view AS
+            SELECT
+                m.movie_id,
+                m.title as movie_title,
+                c.name as company_name,
+                mc.relationship_type
+            FROM Movies m
+            JOIN Movie_Companies mc ON m.movie_id = mc.movie_id
+            JOIN Companies c ON mc.company_id = c.company_id
+        """,
+        "DROP VIEW IF EXISTS movie_actors_view",
+        """
+            CREATE VIEW movie_actors_view AS
+            SELECT
+                m.movie_id,
+                m.title as movie_title,
+                p.people_id,
+                p.name as actor_name,
+                ma.role,
+                ma.is_protagonist
+            FROM Movies m
+            JOIN Movie_Actors ma ON m.movie_id = ma.movie_id
+            JOIN People p ON ma.people_id = p.people_id
+        """,
+    ]),
+    (4, "全文检索（FTS5，二字分词）", [
+        *_fts_steps("Movies"),
+        *_fts_steps("People"),
+        *_fts_steps("Companies"),
+        *_fts_steps("Awards"),
+    ]),
+    (5, "为常用的过滤、排序和关联列建立索引", [
+        "CREATE INDEX IF NOT EXISTS idx_movies_release_year ON Movies (release_year)",
+        "CREATE INDEX IF NOT EXISTS idx_movies_genre_year ON Movies (genre, release_year)",
+        "CREATE INDEX IF NOT EXISTS idx_movies_director ON Movies (director)",
+        "CREATE INDEX IF NOT EXISTS idx_people_name ON People (name)",
+        "CREATE INDEX IF NOT EXISTS idx_people_country ON People (country)",
+        "CREATE INDEX IF NOT EXISTS idx_companies_name ON Companies (name)",
+        "CREATE INDEX IF NOT EXISTS idx_awards_name ON Awards (name)",
+        "CREATE INDEX IF NOT EXISTS idx_awards_year ON Awards (year)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_time ON operation_logs (operation_time)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_record ON operation_logs (table_name, record_id)",
+        "CREATE INDEX IF NOT EXISTS idx_movie_actors_protagonist ON Movie_Actors (movie_id, is_protagonist)",
+        # MySQL 会自动为外键建索引，SQLite 不会；级联删除和反向查询都需要
+        "CREATE INDEX IF NOT EXISTS idx_movie_actors_people ON Movie_Actors (people_id)",
+        "CREATE INDEX IF NOT EXISTS idx_people_awards_award ON People_Awards (award_id)",
+        "CREATE INDEX IF NOT EXISTS idx_movie_awards_award ON Movie_Awards (award_id)",
+        "CREATE INDEX IF NOT EXISTS idx_movie_companies_company ON Movie_Companies (company_id)",
+    ]),
+    (6, "获奖汇总表：由触发器增量维护", [
+        *_award_totals_steps("people", "people_awards_summary", "VARCHAR(100)"),
+        *_award_totals_steps("movies", "movies_awards_summary", "VARCHAR(200)"),
+    ]),
+    (7, "触发器：关系表增删改时写操作日志", [
+        step for trigger in link_log_triggers() for step in _trigger(*trigger)
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def applied_versions(cursor):
+    """返回 {版本号: 校验和}；schema_version 表不存在时返回 None"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    if cursor.fetchone() is None:
+        return None
+    cursor.execute("SELECT version, checksum FROM schema_version")
+    return {row['version']: row['checksum'] for row in cursor.fetchall()}
+
+def migrate(cursor):
+    """执行尚未执行的版本，返回执行了的 [(版本号, 说明), ...]
+
+    结构已是最新时只执行两条 SELECT。
+    """
+    applied = applied_versions(cursor)
+    if applied is not None and not _pending(applied, MIGRATIONS):
+        return []
+
+    conn = cursor.connection
+    conn.begin()  # BEGIN IMMEDIATE：其他进程要等这里提交后才能开始迁移
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(200),
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """)
+        # 拿到锁之后重新读取，其他进程可能已经执行过了
+        done = []
+        for version, description, steps in _pending(applied_versions(cursor), MIGRATIONS):
+            for step in steps:
+                cursor.execute(step)
+            cursor.execute("INSERT INTO schema_version (version, description, checksum) VALUES (%s, %s, %s)",
+                           (version, description, checksum(steps)))
+            done.append((version, description))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return done
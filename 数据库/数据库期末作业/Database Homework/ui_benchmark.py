@@ -0,0 +1,363 @@
+# ui_benchmark.py
+"""window.py 的界面基准测试：用合成数据代替数据库，测量 Tk 一侧的耗时
+
+    python ui_benchmark.py --rows 1000 10000 100000 --output results/ui.json
+    xvfb-run python ui_benchmark.py --visible --compare results/ui.json
+
+把 window.db 换成 StubDatabase（每张表 N 行合成数据，按ID即时生成，不访问 MySQL），
+在隐藏的根窗口（--visible 时显示出来，可在 Xvfb 中运行）中创建 App，
+按行数从小到大测量各标签页的刷新、检索、取消检索、选中行填充输入框，以及刷新日志。
+每次测量从调用开始，到后台任务全部完成、结果回调和重绘都处理完为止。
+后台结果的轮询间隔改为 1 毫秒，避免 20 毫秒的轮询间隔掩盖界面本身的耗时。
+"""
+import argparse
+import datetime
+import functools
+import itertools
+import json
+import platform
+import random
+import sys
+import threading
+import time
+import tkinter as tk
+
+import benchmark
+import datagen
+import db
+import window
+
+ROW_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_ITERATIONS = 30  # 每项最多测量的次数
+DEFAULT_BUDGET = 5.0  # 每项最多测量的秒数（至少测量 benchmark.MIN_SAMPLES 次）
+MATCH_RATIO = 0.1  # 检索时匹配的行占全部行的比例
+LOG_BATCH = 20  # 每次刷新日志前新增的日志条数
+SETTLE_TIMEOUT = 60.0  # 等待界面处理完后台结果的最长秒数
+TABS = ("people_tab", "movies_tab", "companies_tab", "awards_tab")
+
+
+# 数据库替身
+class StubDatabase:
+    """代替 db 模块：每张表有 rows 行合成数据，ID 为 1..rows
+
+    行按ID即时生成（同样的种子和ID得到同样的行），不会把全部数据放进内存。
+    只实现列表、检索和日志用到的读取函数；界面调用了其他函数时，
+    后台任务会报错，测量随之中止。
+
+    参数:
+        latency: 每次读取额外等待的秒数，用来模拟数据库的响应时间
+    """
+    DEFAULT_PAGE_SIZE = db.DEFAULT_PAGE_SIZE
+    PAGE_TABLES = db.PAGE_TABLES
+    SEARCH_TABLES = db.SEARCH_TABLES
+    LINK_OPERATIONS = db.LINK_OPERATIONS
+    search_matches = staticmethod(db.search_matches)
+    search_refinable = staticmethod(db.search_refinable)
+
+    def __init__(self, rows, seed=42, match_ratio=MATCH_RATIO, latency=0.0):
+        self.rows = rows
+        self.seed = seed
+        self.matches = max(int(rows * match_ratio), 1)
+        self.latency = latency
+        self.logs = []
+        self._rng = random.Random(seed)
+        self._text = datagen.TextGenerator(self._rng)
+        self._lock = threading.Lock()  # 几个后台线程共用同一个随机数生成器
+        self.row = functools.lru_cache(maxsize=20_000)(self._make_row)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def unavailable(*args, **kwargs):
+            raise RuntimeError(f"界面基准测试的 db 替身没有实现 {name}")
+        return unavailable
+
+    def _make_row(self, table, record_id):
+        with self._lock:
+            rng, text = self._rng, self._text
+            rng.seed(self.seed * 1_000_003 + list(self.PAGE_TABLES).index(table) * 100_000_007 + record_id)
+            if table == "Movies":
+                return {"movie_id": record_id, "title": text.title(), "release_year": rng.randint(1950, 2024),
+                        "director": datagen._person_name(rng), "genre": rng.choice(datagen.GENRES),
+                        "box_office": round(rng.uniform(1e5, 1e9), 2), "description": text.text(12, 40)}
+            if table == "People":
+                return {"people_id": record_id, "name": datagen._person_name(rng),
+                        "country": rng.choice(datagen.COUNTRIES), "masterpiece": text.title(),
+                        "brief_intro": text.text(8, 30)}
+            if table == "Companies":
+                return {"company_id": record_id, "name": datagen._company_name(rng),
+                        "country": rng.choice(datagen.COUNTRIES), "founded_year": rng.randint(1900, 2020),
+                        "industry": rng.choice(datagen.INDUSTRIES), "revenue": round(rng.uniform(1e6, 1e10), 2),
+                        "description": text.text(8, 30)}
+            return {"award_id": record_id, "name": datagen._award_name(rng),
+                    "category": rng.choice(datagen.AWARD_CATEGORIES), "year": rng.randint(1950, 2024),
+                    "description": text.text(8, 30)}
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def fetch_page(self, table, after_id=None, limit=DEFAULT_PAGE_SIZE):
+        """与 db.fetch_page 相同的约定（只支持按主键升序）：返回 (rows, next_token)"""
+        self._wait()
+        first = (after_id or 0) + 1
+        last = min(first + limit - 1, self.rows)
+        rows = [self.row(table, record_id) for record_id in range(first, last + 1)]
+        return rows, (last if last < self.rows else None)
+
+    def fetch_movies_page(self, after_id=None, limit=DEFAULT_PAGE_SIZE):
+        return self.fetch_page("Movies", after_id, limit)
+
+    def fetch_people_page(self, after_id=None, limit=DEFAULT_PAGE_SIZE):
+        return self.fetch_page("People", after_id, limit)
+
+    def fetch_companies_page(self, after_id=None, limit=DEFAULT_PAGE_SIZE):
+        return self.fetch_page("Companies", after_id, limit)
+
+    def fetch_awards_page(self, after_id=None, limit=DEFAULT_PAGE_SIZE):
+        return self.fetch_page("Awards", after_id, limit)
+
+    def fetch_rows(self, table, ids):
+        self._wait()
+        return {record_id: self.row(table, record_id) for record_id in ids if 1 <= record_id <= self.rows}
+
+    def search(self, table, query, after_id=None, limit=DEFAULT_PAGE_SIZE):
+        """均匀分布在全表中的 matches 行匹配任何查询，检索词追加在第一个检索列后面"""
+        self._wait()
+        column = self.SEARCH_TABLES[table][1][0]
+        step = max(self.rows // self.matches, 1)
+        offset = after_id or 0
+        stop = min(offset + limit, self.matches)
+        rows = []
+        for rank in range(offset, stop):
+            row = dict(self.row(table, 1 + rank * step))
+            row[column] = f"{row[column]} {query}"
+            row["score"] = 1.0 / (rank + 1)
+            rows.append(row)
+        return rows, (stop if stop < self.matches else None)
+
+    def add_logs(self, count, rng):
+        """模拟其他客户端的修改：追加 count 条 UPDATE 日志"""
+        tables = list(self.PAGE_TABLES)
+        now = datetime.datetime.now()
+        for _ in range(count):
+            self.logs.append({"log_id": len(self.logs) + 1, "operation_type": "UPDATE",
+                              "table_name": rng.choice(tables), "record_id": rng.randint(1, self.rows),
+                              "operation_time": now})
+
+    def tail_operation_logs(self, after_log_id=None, limit=500):
+        self._wait()
+        start = 0 if after_log_id is None else after_log_id  # log_id 从1开始连续编号
+        return self.logs[max(start, len(self.logs) - limit):]
+
+    def invalidate_from_logs(self, logs):
+        pass
+
+    def clear_caches(self):
+        pass
+
+
+# 界面
+class TrackedJobs(window.BackgroundJobs):
+    """记录提交过的任务，用来判断界面是否已处理完所有后台结果；出错时不弹窗，只记录"""
+    def __init__(self, root, max_workers=4, poll_interval=1):
+        super().__init__(root, max_workers, poll_interval)
+        self.submitted = []
+        self.errors = []
+
+    def submit(self, func, *args, **kwargs):
+        job = super().submit(func, *args, **kwargs)
+        self.submitted.append(job)
+        return job
+
+    def show_error(self, error):
+        self.errors.append(error)
+
+    def idle(self):
+        """没有未完成的任务，结果也都已交给回调"""
+        self.submitted = [job for job in self.submitted if not job.future.done()]
+        return not self.submitted and self.results.empty()
+
+
+def build_app(stub, visible=False):
+    """在新的根窗口中创建使用 stub 的 App"""
+    window.db = stub
+    window.BackgroundJobs = TrackedJobs
+    window.CHANGE_POLL_INTERVAL = 24 * 3600 * 1000  # 不定时轮询日志，只在测量时刷新
+    root = tk.Tk()
+    if not visible:
+        root.withdraw()
+    app = window.App(root)
+    settle(root, app.jobs)
+    return root, app
+
+def settle(root, jobs, timeout=SETTLE_TIMEOUT):
+    """处理事件，直到后台任务都完成、回调和重绘都执行完"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        root.update()
+        if jobs.idle():
+            root.update()  # 回调中安排的 after_idle 重绘
+            if jobs.idle():
+                break
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{timeout} 秒内界面没有处理完后台任务")
+        time.sleep(0.0001)  # 让出 GIL 给后台线程
+    if jobs.errors:
+        error = jobs.errors[0]
+        jobs.errors.clear()
+        raise error
+
+
+class UiRunner:
+    """测量界面操作，结果的格式与 benchmark.py 相同"""
+    def __init__(self, iterations=DEFAULT_ITERATIONS, budget=DEFAULT_BUDGET, only=None, progress=print):
+        self.iterations = iterations
+        self.budget = budget
+        self.only = only
+        self.progress = progress
+        self.results = []
+
+    def measure(self, name, group, root, jobs, call, prepare=None, check=None):
+        """先不计时地执行一次，再反复计时执行 prepare(i)（不计时）、call() 和 settle
+
+        check 在每次执行后调用，用来确认操作确实生效。
+        """
+        if self.only and not any(part in name for part in self.only):
+            return
+        samples = []
+        started = time.perf_counter()
+        for i in range(self.iterations + 1):
+            if prepare:
+                prepare(i)
+            call_started = time.perf_counter()
+            call()
+            settle(root, jobs)
+            elapsed = time.perf_counter() - call_started
+            if check:
+                check(i)
+            if i == 0:
+                continue  # 预热：替身的行缓存、Tk 条目的创建
+            samples.append(elapsed)
+            if time.perf_counter() - started > self.budget and len(samples) >= benchmark.MIN_SAMPLES:
+                break
+        summary = benchmark.summarize(name, group, samples, 0)
+        self.results.append(summary)
+        self.progress(f"{name:<44} p50 {summary['p50_ms']:9.2f} ms  p95 {summary['p95_ms']:9.2f} ms  "
+                      f"p99 {summary['p99_ms']:9.2f} ms  max {summary['max_ms']:9.2f} ms")
+
+
+def run_tab(runner, root, app, tab, rows, rng):
+    name = type(tab).__name__
+    app.notebook.select(tab)
+    settle(root, app.jobs)
+
+    runner.measure(f"{name}.refresh_data[{rows}]", "refresh", root, app.jobs, tab.refresh_data)
+
+    def set_query(i):
+        app.search_var.set(f"{rng.choice(benchmark.SEARCH_WORDS)} q{i:06d}")  # 每次都不命中检索缓存
+
+    def check_search(i):
+        if tab.tree.source is tab.source:
+            raise RuntimeError(f"{name} 检索后仍显示全部数据")
+
+    def check_cleared(i):
+        if tab.tree.source is not tab.source:
+            raise RuntimeError(f"{name} 取消检索后没有恢复显示全部数据")
+
+    runner.measure(f"{name}.perform_search[{rows}]", "search", root, app.jobs, app.perform_search,
+                   prepare=set_query, check=check_search)
+    runner.measure(f"{name}.clear_search[{rows}]", "search", root, app.jobs, app.clear_search,
+                   prepare=lambda i: (set_query(i), app.perform_search(), settle(root, app.jobs)),
+                   check=check_cleared)
+
+    # 依次单击可见的各行：<<TreeviewSelect>> -> on_tree_select -> fill_input_fields
+    items = tab.tree._items
+    clicked = {}
+
+    def select(i):
+        item = items[i % len(items)]  # 相邻两次单击的是不同的行
+        clicked["id"] = str(tab.tree.tree.item(item)['values'][0])
+        tab.tree.tree.focus(item)
+        tab.tree.tree.selection_set(item)
+
+    def check_selected(i):
+        if tab.input_vars["id"].get() != clicked["id"]:
+            raise RuntimeError(f"{name} 选中第 {i % len(items)} 行后没有填充输入框")
+
+    if len(items) >= 2:
+        clicks = itertools.count()
+        runner.measure(f"{name}.select[{rows}]", "select", root, app.jobs, lambda: select(next(clicks)),
+                       check=check_selected)
+    tab.clear_inputs()
+
+def run_size(runner, rows, seed, visible=False, latency=0.0):
+    rng = random.Random(seed)
+    stub = StubDatabase(rows, seed, latency=latency)
+    stub.add_logs(window.LOG_BUFFER_SIZE, rng)  # 已有的历史日志
+    root, app = build_app(stub, visible)
+    try:
+        for attribute in TABS:
+            run_tab(runner, root, app, getattr(app, attribute), rows, rng)
+        runner.measure(f"App.refresh_logs[{rows}]", "logs", root, app.jobs, app.refresh_logs,
+                       prepare=lambda i: stub.add_logs(LOG_BATCH, rng))
+    finally:
+        app.jobs.shutdown()
+        root.destroy()
+
+def main():
+    parser = argparse.ArgumentParser(description="window.py 界面基准测试（不访问数据库）")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(ROW_COUNTS), help="每张表的行数，可以给多个")
+    parser.add_argument("--seed", type=int, default=42, help="合成数据和检索词的随机种子")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="每项最多测量的次数")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="每项最多测量的秒数")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟每次读取数据库的毫秒数")
+    parser.add_argument("--visible", action="store_true", help="显示窗口（默认隐藏根窗口）")
+    parser.add_argument("--only", nargs="*", help="只测量名称中包含这些字符串的项")
+    parser.add_argument("--output", help="结果保存为 JSON")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--threshold", type=float, default=benchmark.REGRESSION_THRESHOLD,
+                        help="p95 变慢超过该比例时返回非零")
+    args = parser.parse_args()
+
+    runner = UiRunner(args.iterations, args.budget, args.only)
+    try:
+        tk_version = tk.Tcl().call("info", "patchlevel")
+        for rows in sorted(args.rows):
+            print(f"== 每张表 {rows} 行 ==")
+            run_size(runner, rows, args.seed, args.visible, args.latency / 1000)
+    except tk.TclError as e:
+        print(f"无法创建窗口：{e}")
+        print("没有图形界面时请用 xvfb-run python ui_benchmark.py 运行")
+        sys.exit(2)
+
+    report = {
+        "meta": {
+            "rows": sorted(args.rows),
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "budget": args.budget,
+            "latency_ms": args.latency,
+            "visible": args.visible,
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "tk": tk_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": runner.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = benchmark.compare(runner.results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} 项的 p95 变慢超过 {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,570 @@
 # window.py
 # 导入所需的模块
 import tkinter as tk
-from tkinter import messagebox, ttk, simpledialog
+from tkinter import messagebox, ttk, simpledialog, filedialog
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import sys
 import db  # 导入数据库操作模块
+import exporter
+import query_stats
 from PIL import Image, ImageTk
 import os
 
+SEARCH_DELAY = 300  # 边输入边搜索的防抖时间（毫秒）
+LOG_BUFFER_SIZE = 500  # 日志区域最多保留的日志条数
+CHANGE_POLL_INTERVAL = 2000  # 检查操作日志（包括其他客户端的修改）的间隔（毫秒）
+STATS_REFRESH_INTERVAL = 2000  # 查询统计窗口的刷新间隔（毫秒）
+
+class Job:
+    """提交到后台的一次数据库操作"""
+    def __init__(self, key=None, on_success=None, on_error=None):
+        self.key = key
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        """取消任务：还没开始的不再执行，已经在执行的结果会被丢弃"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class BackgroundJobs:
+    """在线程池中执行数据库操作，结果经队列交回 Tk 主线程处理
+
+    工作线程只调用 db 函数，不接触任何 Tk 控件；
+    主线程用 after 定时检查结果队列并调用回调。
+
+    参数:
+        root: Tk 根窗口
+        max_workers: 工作线程数
+        poll_interval: 检查结果队列的间隔（毫秒）
+    """
+    def __init__(self, root, max_workers=4, poll_interval=20):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self.results = queue.Queue()
+        self.latest = {}  # key -> 该 key 最近提交的任务
+        self.closed = False
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, func, *args, on_success=None, on_error=None, key=None, **kwargs):
+        """在后台执行 func(*args, **kwargs)
+
+        参数:
+            on_success: 成功时在主线程调用 on_success(result)
+            on_error: 出错时在主线程调用 on_error(exception)，默认弹出错误框
+            key: 任务标识，提交相同 key 的新任务时取消旧任务（只保留最新的请求）
+        """
+        job = Job(key, on_success, on_error or self.show_error)
+        if key is not None:
+            self.cancel(key)
+            self.latest[key] = job
+
+        def run():
+            if job.cancelled:
+                return
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self.results.put((job, None, e))
+            else:
+                self.results.put((job, result, None))
+
+        job.future = self.executor.submit(run)
+        return job
+
+    def cancel(self, key):
+        """取消指定 key 尚未完成的任务"""
+        job = self.latest.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def show_error(self, error):
+        messagebox.showerror("错误", str(error))
+
+    def _poll(self):
+        """在主线程中处理已完成的任务"""
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if job.key is not None and self.latest.get(job.key) is job:
+                del self.latest[job.key]
+            if job.cancelled:
+                continue
+            try:
+                if error is not None:
+                    job.on_error(error)
+                elif job.on_success is not None:
+                    job.on_success(result)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        if not self.closed:
+            self.root.after(self.poll_interval, self._poll)
+
+    def shutdown(self):
+        """停止轮询并取消排队中的任务"""
+        self.closed = True
+        for job in list(self.latest.values()):
+            job.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PagedRowSource:
+    """按页读取数据的行数据源，只缓存最近访问的若干页
+
+    参数:
+        fetch_page: 分页函数 fetch_page(after_id, limit)，返回 (rows, next_token)
+        page_size: 每页行数
+        max_pages: 最多缓存的页数，超出后淘汰最久未访问的页
+        jobs: BackgroundJobs，提供时在后台读取缺失的页，读完后调用 on_loaded()
+    """
+    def __init__(self, fetch_page, page_size=db.DEFAULT_PAGE_SIZE, max_pages=10, jobs=None):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.jobs = jobs
+        self.on_loaded = None  # 后台读完一页后的回调
+        self.loading = set()  # 正在后台读取的页号
+        self.tokens = [None]  # 第 i 页的续页标记
+        self.starts = [0]  # 第 i 页第一行的行号
+        self.pages = OrderedDict()  # 页号 -> 行列表
+        self.exhausted = False  # 是否已读到最后一页
+        self.total = None  # 读到最后一页后的总行数
+
+    def _load(self, index):
+        """读取第 index 页；后台读取时先返回 None"""
+        if self.jobs is None:
+            return self._store(index, self.fetch_page(self.tokens[index], self.page_size))
+        if index not in self.loading:
+            self.loading.add(index)
+            self.jobs.submit(self.fetch_page, self.tokens[index], self.page_size,
+                             on_success=lambda result: self._loaded(index, result),
+                             on_error=lambda error: self._failed(index, error))
+        return None
+
+    def _loaded(self, index, result):
+        self.loading.discard(index)
+        self._store(index, result)
+        if self.on_loaded is not None:
+            self.on_loaded()
+
+    def _failed(self, index, error):
+        self.loading.discard(index)
+        self.jobs.show_error(error)
+
+    def _store(self, index, result):
+        rows, next_token = result
+        rows = list(rows)
+        self.pages[index] = rows
+        self.pages.move_to_end(index)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+        if index == len(self.tokens) - 1 and not self.exhausted:
+            if next_token is None:
+                self.exhausted = True
+                self.total = self.starts[index] + len(rows)
+            else:
+                self.tokens.append(next_token)
+                self.starts.append(self.starts[index] + len(rows))
+        return rows
+
+    def _page(self, index):
+        if index in self.pages:
+            self.pages.move_to_end(index)
+            return self.pages[index]
+        return self._load(index)
+
+    def seed(self, rows, next_token):
+        """用已经取得的第一页初始化"""
+        self._store(0, (rows, next_token))
+
+    def patch(self, key, updated):
+        """用 updated（ID -> 新的行）替换已缓存的页中的行，key 为ID列名"""
+        for page in self.pages.values():
+            for i, row in enumerate(page):
+                new = updated.get(row[key])
+                if new is not None:
+                    page[i] = new
+
+    def append(self, row):
+        """在末尾追加一行（按主键排序时新增的记录总在最后）"""
+        if not self.exhausted:
+            return  # 还没读到末尾，以后读到最后一页时自然包含这一行
+        last = len(self.tokens) - 1
+        if last in self.pages:
+            self.pages[last].append(row)
+            self.total += 1
+        else:
+            # 最后一页不在缓存中，下次访问时重新读取
+            self.exhausted = False
+            self.total = None
+
+    def remove(self, key, record_id):
+        """从已缓存的页中删除一行，之后各页的起始行号前移；行不在缓存中时返回 False"""
+        for index, page in self.pages.items():
+            for i, row in enumerate(page):
+                if row[key] == record_id:
+                    del page[i]
+                    for later in range(index + 1, len(self.starts)):
+                        self.starts[later] -= 1
+                    if self.total is not None:
+                        self.total -= 1
+                    return True
+        return False
+
+    def row_count(self):
+        """已知的总行数；还没读到最后一页时返回一个会随滚动增长的估计值"""
+        if self.exhausted:
+            return self.total
+        return self.starts[-1] + self.page_size
+
+    def rows(self, start, stop):
+        """返回行号在 [start, stop) 内的行，超出末尾的部分被截断"""
+        # 需要时顺着续页标记向后读，直到覆盖 stop；后台读取时先返回已有的行
+        while not self.exhausted and self.starts[-1] < stop:
+            if self._load(len(self.tokens) - 1) is None:
+                break
+        result = []
+        index = max(bisect_right(self.starts, start) - 1, 0)
+        while len(result) < stop - start and index < len(self.tokens):
+            page = self._page(index)
+            if page is None:
+                break
+            first = max(start - self.starts[index], 0)
+            result.extend(page[first:first + stop - start - len(result)])
+            index += 1
+        return result
+
+
+class ListRowSource:
+    """内存中的行数据源，用于已完整取得的结果"""
+    exhausted = True
+
+    def __init__(self, data):
+        self.data = data
+        self.on_loaded = None
+
+    def row_count(self):
+        return len(self.data)
+
+    def rows(self, start, stop):
+        return self.data[start:stop]
+
+    def patch(self, key, updated, deleted=()):
+        """替换 updated 中的行，去掉 deleted 中的行"""
+        self.data = [updated.get(row[key], row) for row in self.data if row[key] not in deleted]
+
+
+class SearchCache:
+    """检索结果的 LRU 缓存：查询 -> 完整的结果行
+
+    参数:
+        max_entries: 最多缓存的查询数
+        max_rows: 结果行数不超过该值的查询才缓存
+    """
+    def __init__(self, max_entries=32, max_rows=1000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.lower().split())
+
+    def get(self, key):
+        rows = self.entries.get(key)
+        if rows is not None:
+            self.entries.move_to_end(key)
+        return rows
+
+    def get_superset(self, key, accept=None):
+        """找到 key 由其追加字符得到的最长缓存查询，返回它的结果
+
+        追加字符只会让条件更严格，所以新结果一定包含在旧结果中。
+        accept(缓存的查询) 为假的查询不使用。
+        """
+        best = None
+        for cached in self.entries:
+            if accept is not None and not accept(cached):
+                continue
+            if key.startswith(cached) and (best is None or len(cached) > len(best)):
+                best = cached
+        return None if best is None else self.get(best)
+
+    def put(self, key, rows):
+        if len(rows) > self.max_rows:
+            return
+        self.entries[key] = rows
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class VirtualTreeview(ttk.Frame):
+    """虚拟列表：只在 Treeview 中保留可见的几行，滚动时从数据源取行并复用这些行
+
+    无论数据源有多少行，Tk 中的条目数都只等于可见行数，
+    滚动只是改写这些条目的值，不再逐行 insert/delete。
+    """
+    def __init__(self, parent, columns, row_values, height=15):
+        super().__init__(parent)
+        self.row_values = row_values  # 把数据源中的一行转换为显示的值
+        self.source = None
+        self.offset = 0  # 第一可见行的行号
+        self.visible = height  # 可见行数
+        self.selected_index = None  # 当前行（最后点击或用方向键移到的行）的行号
+        self.selected = {}  # 所有选中行：行号 -> ID（第一列），包括滚动到可见范围之外的
+        self._extend = False  # 最近一次点击是否按住了 Ctrl/Shift（追加选择）
+        self.select_callback = None
+        self.on_empty = None  # 数据源读完且为空时的一次性回调
+        self._items = []  # 复用的 Treeview 条目
+        self._redraw_pending = False
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=height, selectmode="extended")
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<ButtonPress-1>', self._on_click, add='+')
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        for key, delta in (('<Up>', -1), ('<Down>', 1), ('<Prior>', None), ('<Next>', None)):
+            self.tree.bind(key, lambda e, d=delta, k=key: self._on_key(k, d))
+
+    def heading(self, column, **kw):
+        return self.tree.heading(column, **kw)
+
+    def column(self, column, **kw):
+        return self.tree.column(column, **kw)
+
+    def bind_select(self, callback):
+        """设置选中行变化时的回调，参数为该行在 Treeview 中的值"""
+        self.select_callback = callback
+
+    def set_source(self, source, keep_offset=False, on_empty=None):
+        """切换数据源并重绘
+
+        参数:
+            keep_offset: 是否保持当前滚动位置和选中行
+            on_empty: 数据源读完后发现没有任何行时调用一次
+        """
+        self.source = source
+        self.on_empty = on_empty
+        source.on_loaded = lambda: self._source_loaded(source)
+        if not keep_offset:
+            self.offset = 0
+            self.clear_selection()
+        self.redraw()
+
+    def row_count(self):
+        return self.source.row_count() if self.source else 0
+
+    def selected_values(self):
+        """当前选中行的值，没有选中时返回 None"""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return self.tree.item(selection[0])['values']
+
+    def selected_ids(self):
+        """所有选中行的ID，按行号排列"""
+        return [self.selected[index] for index in sorted(self.selected)]
+
+    def clear_selection(self):
+        self.selected_index = None
+        self.selected = {}
+        self.tree.selection_set(())
+
+    def redraw(self):
+        """按当前偏移量从数据源取出可见行，写入复用的条目"""
+        self._redraw_pending = False
+        rows = self.source.rows(self.offset, self.offset + self.visible) if self.source else []
+        # 读到末尾后偏移量可能超出范围，退回到最后一屏
+        if self.source and self.source.exhausted and len(rows) < self.visible and self.offset > 0:
+            self.offset = max(self.source.row_count() - self.visible, 0)
+            rows = self.source.rows(self.offset, self.offset + self.visible)
+
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", tk.END))
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+        for item, row in zip(self._items, rows):
+            self.tree.item(item, values=self.row_values(row))
+        self.tree.yview_moveto(0)
+
+        # 选中的行滚动回可见范围时保持选中
+        wanted = tuple(item for i, item in enumerate(self._items) if self.offset + i in self.selected)
+        if self.tree.selection() != wanted:
+            self.tree.selection_set(wanted)
+        self._update_scrollbar()
+
+        if self.on_empty and self.source and self.source.exhausted and self.source.row_count() == 0:
+            callback, self.on_empty = self.on_empty, None
+            callback()
+
+    def _source_loaded(self, source):
+        if source is self.source:
+            self.schedule_redraw()
+
+    def schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def _update_scrollbar(self):
+        total = self.row_count()
+        if total <= 0:
+            self.vsb.set(0, 1)
+            return
+        self.vsb.set(self.offset / total, min((self.offset + self.visible) / total, 1.0))
+
+    def _set_offset(self, offset):
+        total = self.row_count()
+        offset = max(0, min(int(offset), max(total - self.visible, 0)))
+        if offset != self.offset:
+            self.offset = offset
+            self.schedule_redraw()
+
+    def _scroll_by(self, rows):
+        self._set_offset(self.offset + rows)
+        return "break"
+
+    def yview(self, *args):
+        """滚动条回调"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._set_offset(float(args[1]) * self.row_count())
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(self.visible - 1, 1)
+            self._scroll_by(amount)
+
+    def _on_mousewheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_key(self, key, delta):
+        if delta is None:
+            delta = -max(self.visible - 1, 1) if key == '<Prior>' else max(self.visible - 1, 1)
+        current = self.offset if self.selected_index is None else self.selected_index
+        index = max(0, min(current + delta, self.row_count() - 1))
+        # 移动选中行，必要时滚动使其可见
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible:
+            self.offset = index - self.visible + 1
+        self.selected_index = index
+        values = self.source.rows(index, index + 1) if self.source else []
+        self.selected = {index: self.row_values(values[0])[0]} if values else {}
+        self.redraw()
+        return "break"
+
+    def _on_configure(self, event):
+        """根据控件高度计算可见行数"""
+        if self._items and self.tree.bbox(self._items[0]):
+            _, top, _, row_height = self.tree.bbox(self._items[0])
+        else:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+            top = row_height
+        visible = max((event.height - top) // max(row_height, 1), 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.schedule_redraw()
+
+    def _on_click(self, event):
+        self._extend = bool(event.state & 0x0005)  # Shift 或 Control
+
+    def _on_select(self, event):
+        shown = range(self.offset, self.offset + len(self._items))
+        visible = {self.offset + self._items.index(item): self.tree.item(item)['values'][0]
+                   for item in self.tree.selection() if item in self._items}
+        if visible.keys() == {index for index in self.selected if index in shown}:
+            return  # redraw 同步选中状态时触发的事件
+        if self._extend:
+            # 追加选择：保留可见范围之外的选中行
+            self.selected = {index: value for index, value in self.selected.items() if index not in shown}
+            self.selected.update(visible)
+        else:
+            self.selected = visible
+        if not visible:
+            return
+        focus = self.tree.focus()
+        index = self.offset + self._items.index(focus) if focus in self._items else min(visible)
+        if index not in visible or index == self.selected_index:
+            return
+        self.selected_index = index
+        if self.select_callback:
+            self.select_callback(self.tree.item(self._items[index - self.offset])['values'])
+
+class PendingLinks(ttk.Frame):
+    """关系对话框中待添加的多行：逐行加入列表，再一次批量提交"""
+    def __init__(self, parent, columns):
+        super().__init__(parent)
+        self.links = []  # 提交给数据库的元组，与列表中的行一一对应
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=5)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        ttk.Button(self, text="移除选中", command=self.remove_selected).grid(row=1, column=0, sticky=tk.E, pady=2)
+        self.columnconfigure(0, weight=1)
+
+    def add(self, link, values):
+        """加入一行，已在列表中时返回 False"""
+        if link in self.links:
+            return False
+        self.links.append(link)
+        self.tree.insert("", tk.END, values=values)
+        return True
+
+    def remove_selected(self):
+        items = self.tree.get_children()
+        for index in sorted((items.index(item) for item in self.tree.selection()), reverse=True):
+            del self.links[index]
+            self.tree.delete(items[index])
+
+    def clear(self):
+        self.links = []
+        self.tree.delete(*self.tree.get_children())
+
 class EntityTab(ttk.Frame):
     """实体标签页的基类，提供通用的UI和功能"""
-    def __init__(self, parent, refresh_logs):
+    table = None  # 对应的数据表名（由子类指定）
+
+    def __init__(self, parent, refresh_logs, jobs):
         super().__init__(parent)
         self.refresh_logs = refresh_logs  # 刷新日志的回调函数
+        self.jobs = jobs  # 后台任务，数据库操作都在这里执行
         self.tree = None  # 树形视图控件
         self.input_vars = {}  # 输入变量字典
         self.selected_id = None  # 当前选中的记录ID
+        self.source = None  # 列表的数据源
+        self.search_cache = SearchCache()  # 最近的检索结果
+        self.local_changes = []  # 本客户端已应用到列表的修改 (写入前的日志ID, 写入后的日志ID, 操作类型, 记录ID集合)
+        self.seen_log_id = 0  # 已分发给各标签页的最新日志ID
         
         # 设置界面样式
         style = ttk.Style()
@@ -54,15 +605,14 @@ class EntityTab(ttk.Frame):
             entry.configure(state='readonly')  # ID字段设为只读
         return entry
 
-    def on_tree_select(self, event):
-        """树形视图选择事件处理"""
-        selected_items = self.tree.selection()
-        if not selected_items:
+    def on_tree_select(self, values):
+        """列表选择事件处理"""
+        if not values:
             return
         
-        item = selected_items[0]
-        values = self.tree.item(item)['values']
         self.selected_id = values[0]  # 第一列总是ID
+        # 选中了新的记录，之前尚未完成的详细信息读取不再需要
+        self.jobs.cancel((self, "details"))
         
         # 填充输入框
         self.input_vars["id"].set(str(values[0]))
@@ -76,9 +626,212 @@ class EntityTab(ttk.Frame):
         """构建用户界面（由子类实现）"""
         pass
 
+    def fetch_page(self, after_id, limit):
+        """分页读取数据，返回 (rows, next_token)（由子类实现）"""
+        return [], None
+
+    def row_values(self, row):
+        """把一条记录转换为列表中的一行（由子类实现）"""
+        return ()
+
+    def create_list(self, parent, columns):
+        """创建虚拟列表并绑定选择事件"""
+        self.tree = VirtualTreeview(parent, columns, self.row_values)
+        self.tree.bind_select(self.on_tree_select)
+        return self.tree
+
+    def reload(self):
+        """重建数据源，列表在后台按需分页读取（保持滚动位置）"""
+        self.search_cache.clear()  # 数据已变化，缓存的检索结果作废
+        self.source = PagedRowSource(self.fetch_page, jobs=self.jobs)
+        self.tree.set_source(self.source, keep_offset=True)
+
     def refresh_data(self):
-        """刷新数据（由子类实现）"""
-        pass
+        """刷新数据和日志"""
+        self.reload()
+        self.refresh_logs()
+
+    def apply_changes(self, changes):
+        """本表的记录被修改了（可能来自其他客户端），只更新受影响的部分
+
+        changes 为 [(操作类型, 记录ID, 日志ID), ...]。有新增或删除时行号会变化，
+        重建数据源；只有修改时只重新读取这些记录并替换列表中对应的行。
+        本客户端自己的修改已经在 apply_local_change 中处理过，跳过。
+        """
+        changes = [(operation, record_id) for operation, record_id, log_id in changes
+                   if not self.is_local_change(operation, record_id, log_id)]
+        if not changes:
+            return
+        self.search_cache.clear()
+        pk = db.PAGE_TABLES[self.table][0]
+        updated = {record_id for operation, record_id in changes if operation == 'UPDATE'}
+        deleted = {record_id for operation, record_id in changes if operation == 'DELETE'}
+        showing_all = self.tree.source is self.source
+        if len(updated) < len(changes):
+            if showing_all:
+                self.reload()
+                return
+            # 正在显示检索结果：去掉已删除的行，全部数据的列表在取消检索时重新读取
+            self.source = PagedRowSource(self.fetch_page, jobs=self.jobs)
+            if isinstance(self.tree.source, ListRowSource) and deleted:
+                self.tree.source.patch(pk, {}, deleted)
+                self.tree.schedule_redraw()
+        if not updated:
+            return
+
+        def patch(rows):
+            self.source.patch(pk, rows)
+            if self.tree.source is not self.source:
+                self.tree.source.patch(pk, rows)
+            self.tree.schedule_redraw()
+
+        self.jobs.submit(db.fetch_rows, self.table, updated, on_success=patch)
+
+    def submit_write(self, write, *args, on_success):
+        """在后台执行 db 的写函数，完成后调用 on_success(返回值, (写入前的日志ID, 写入后的日志ID))
+
+        这次写入的日志ID在这两个ID之间，轮询日志时据此识别本客户端自己的修改。
+        """
+        def run():
+            before = db.latest_log_id()
+            result = write(*args)
+            return result, (before, db.latest_log_id())
+
+        self.jobs.submit(run, on_success=lambda outcome: on_success(*outcome))
+
+    def remember_local_change(self, operation, record_ids, log_range):
+        """记下本客户端的一次修改，轮询日志读到它写入的日志时跳过
+
+        log_range 为 submit_write 给出的 (写入前的日志ID, 写入后的日志ID)。
+        这些日志已经分发过时（轮询先于写操作的回调完成），它们已按其他客户端的修改处理，不再记录。
+        """
+        before, after = log_range
+        if after > self.seen_log_id:
+            self.local_changes.append((before, after, operation, frozenset(record_ids)))
+
+    def is_local_change(self, operation, record_id, log_id):
+        """日志是否由本客户端记下的修改写入"""
+        return any(before < log_id <= after and operation == local_operation and record_id in record_ids
+                   for before, after, local_operation, record_ids in self.local_changes)
+
+    def logs_seen(self, log_id):
+        """log_id 及之前的日志都已分发，之后不会再读到，丢弃已经用完的记录"""
+        self.seen_log_id = max(self.seen_log_id, log_id)
+        self.local_changes = [change for change in self.local_changes if change[1] > self.seen_log_id]
+
+    def on_write_done(self, message, operation, row, log_range):
+        """增删改成功后只更新列表中受影响的那一行，然后提示
+
+        参数:
+            operation: 'INSERT'、'UPDATE' 或 'DELETE'
+            row: db 写函数返回的记录（新增或修改后的值、删除前的值），记录不存在时为 None
+            log_range: submit_write 给出的 (写入前的日志ID, 写入后的日志ID)
+        """
+        if row is not None:
+            self.remember_local_change(operation, [row[db.PAGE_TABLES[self.table][0]]], log_range)
+            self.apply_local_change(operation, row)
+        messagebox.showinfo("成功", message)
+        self.clear_inputs()
+        self.refresh_logs()
+
+    def delete_selected(self, delete_many):
+        """列表中选中了多行时批量删除，返回是否处理了（只选中一行时返回 False，按原来的方式删除）
+
+        delete_many 为 db 中的批量删除函数，在一个事务中删除所有选中的记录。
+        """
+        ids = self.tree.selected_ids()
+        if len(ids) < 2:
+            return False
+        if not messagebox.askyesno("确认", f"确定要删除选中的 {len(ids)} 条记录吗？此操作将在一个事务中执行。"):
+            return True
+
+        def deleted(record_ids, log_range):
+            self.remember_local_change('DELETE', record_ids, log_range)
+            self.reload()
+            self.tree.clear_selection()
+            messagebox.showinfo("成功", f"已删除 {len(record_ids)} 条记录！事务已完成。")
+            self.clear_inputs()
+            self.refresh_logs()
+
+        self.submit_write(delete_many, ids, on_success=deleted)
+        return True
+
+    def apply_local_change(self, operation, row):
+        """把本客户端的一次增删改直接应用到列表中，不重新读取整张表"""
+        pk = db.PAGE_TABLES[self.table][0]
+        record_id = row[pk]
+        self.search_cache.clear()
+        showing_all = self.tree.source is self.source
+        if operation == 'UPDATE':
+            self.source.patch(pk, {record_id: row})
+            if not showing_all:
+                self.tree.source.patch(pk, {record_id: row})
+        elif operation == 'INSERT':
+            self.source.append(row)  # 检索结果中不加入新记录
+        else:
+            if not self.source.remove(pk, record_id):
+                # 不知道这一行在哪一页，无法修正后面各页的行号，重建数据源
+                if showing_all:
+                    self.reload()
+                    return
+                self.source = PagedRowSource(self.fetch_page, jobs=self.jobs)
+            if isinstance(self.tree.source, ListRowSource):
+                self.tree.source.patch(pk, {}, {record_id})
+            elif not showing_all:
+                self.tree.source.remove(pk, record_id)
+            self.tree.clear_selection()
+        self.tree.schedule_redraw()
+
+    def search_page(self, query, after_id, limit):
+        """分页读取全文检索结果，返回 (rows, next_token)"""
+        return db.search(self.table, query, after_id, limit)
+
+    def show_search(self, query, on_empty=None, on_result=None):
+        """列表只显示全文检索的结果
+
+        先查缓存：同一查询直接复用；在上一次的查询后面追加字符、且筛选与检索的
+        结果一定相同时（db.search_refinable），从缓存的完整结果中筛选，不再访问数据库。否则在后台检索，
+        新的检索会取消尚未完成的旧检索。
+
+        参数:
+            on_empty: 没有任何匹配项时调用
+            on_result: 得到结果后调用 on_result(行数, 是否完整)
+        """
+        key = SearchCache.normalize(query)
+        rows = self.search_cache.get(key)
+        if rows is None and db.search_refinable(key):
+            superset = self.search_cache.get_superset(key, db.search_refinable)
+            if superset is not None:
+                rows = [row for row in superset if db.search_matches(self.table, row, key)]
+                self.search_cache.put(key, rows)
+        if rows is not None:
+            self.jobs.cancel((self, "search"))
+            self._show_search_source(ListRowSource(rows), len(rows), True, on_empty, on_result)
+            return
+
+        def loaded(result):
+            rows, next_token = result
+            if next_token is None:
+                self.search_cache.put(key, rows)
+                source = ListRowSource(rows)
+            else:
+                # 结果太多，不缓存，其余部分滚动时再分页读取
+                source = PagedRowSource(lambda after_id, limit: self.search_page(key, after_id, limit), jobs=self.jobs)
+                source.seed(rows, next_token)
+            self._show_search_source(source, len(rows), next_token is None, on_empty, on_result)
+
+        self.jobs.submit(self.search_page, key, None, self.search_cache.max_rows,
+                         on_success=loaded, key=(self, "search"))
+
+    def _show_search_source(self, source, count, complete, on_empty, on_result):
+        self.tree.set_source(source, on_empty=on_empty)
+        if on_result is not None:
+            on_result(count, complete)
+
+    def clear_filter(self):
+        """取消检索，恢复显示全部数据"""
+        if self.source is not None:
+            self.tree.set_source(self.source)
 
     def add_person(self):
         """添加人物（触发器控制）"""
@@ -87,15 +840,14 @@ class EntityTab(ttk.Frame):
             return
             
         try:
-            db.insert_person(
+            self.submit_write(
+                db.insert_person,
                 self.input_vars["name"].get(),
                 self.input_vars["country"].get(),
                 self.input_vars["masterpiece"].get(),
-                self.input_vars["brief_intro"].get()
+                self.input_vars["brief_intro"].get(),
+                on_success=lambda row, logs: self.on_write_done("添加成功！触发器已记录此操作。", 'INSERT', row, logs)
             )
-            messagebox.showinfo("成功", "添加成功！触发器已记录此操作。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -106,21 +858,22 @@ class EntityTab(ttk.Frame):
             return
             
         try:
-            db.update_person_with_procedure(
+            self.submit_write(
+                db.update_person_with_procedure,
                 int(self.input_vars["id"].get()),
                 self.input_vars["name"].get(),
                 self.input_vars["country"].get(),
                 self.input_vars["masterpiece"].get(),
-                self.input_vars["brief_intro"].get()
+                self.input_vars["brief_intro"].get(),
+                on_success=lambda row, logs: self.on_write_done("修改成功！存储过程已执行。", 'UPDATE', row, logs)
             )
-            messagebox.showinfo("成功", "修改成功！存储过程已执行。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
     def delete_person(self):
         """删除人物（事务控制）"""
+        if self.delete_selected(db.delete_people):
+            return
         if not self.input_vars["id"].get():
             messagebox.showerror("错误", "请输入要删除的记录ID！")
             return
@@ -129,10 +882,8 @@ class EntityTab(ttk.Frame):
             return
             
         try:
-            db.delete_person_with_transaction(int(self.input_vars["id"].get()))
-            messagebox.showinfo("成功", "删除成功！事务已完成。")
-            self.refresh_data()
-            self.clear_inputs()
+            self.submit_write(db.delete_person_with_transaction, int(self.input_vars["id"].get()),
+                              on_success=lambda row, logs: self.on_write_done("删除成功！事务已完成。", 'DELETE', row, logs))
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -152,18 +903,23 @@ class EntityTab(ttk.Frame):
         tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # 从视图获取数据
-        summary_data = db.get_people_summary()
-        for item in summary_data:
-            tree.insert("", tk.END, values=(
-                item['people_id'],
-                item['name'],
-                item['country'],
-                item['masterpiece']
-            ))
+        # 在后台从视图获取数据
+        def show_rows(summary_data):
+            if not tree.winfo_exists():
+                return
+            for item in summary_data:
+                tree.insert("", tk.END, values=(
+                    item['people_id'],
+                    item['name'],
+                    item['country'],
+                    item['masterpiece']
+                ))
+        self.jobs.submit(db.get_people_summary, on_success=show_rows)
 
 class PeopleTab(EntityTab):
     """人物管理标签页"""
+    table = "People"
+
     def fill_input_fields(self, values):
         """填充人物信息到输入框"""
         if not values:
@@ -221,8 +977,8 @@ class PeopleTab(EntityTab):
         tree_frame.columnconfigure(0, weight=1)
         tree_frame.rowconfigure(0, weight=1)
 
-        # 创建树形视图
-        self.tree = ttk.Treeview(tree_frame, columns=("ID", "姓名", "国家", "代表作", "简介"), show="headings")
+        # 创建虚拟列表（只渲染可见行）
+        self.create_list(tree_frame, ("ID", "姓名", "国家", "代表作", "简介"))
         
         # 设置列属性
         self.tree.column("ID", width=50, anchor=tk.CENTER)
@@ -235,36 +991,22 @@ class PeopleTab(EntityTab):
         for col in ["ID", "姓名", "国家", "代表作", "简介"]:
             self.tree.heading(col, text=col)
 
-        # 添加滚动条
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        # 布局树形视图和滚动条
+        # 布局列表
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
 
-        # 绑定选择事件
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+    def fetch_page(self, after_id, limit):
+        """分页读取人物数据"""
+        return db.fetch_people_page(after_id, limit)
 
-    def refresh_data(self):
-        """刷新人物数据"""
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # 获取并显示新数据
-        people = db.fetch_all_people()
-        for person in people:
-            self.tree.insert("", tk.END, values=(
-                person['people_id'],
-                person['name'],
-                person['country'],
-                person['masterpiece'],
-                person['brief_intro']
-            ))
-        self.refresh_logs()
+    def row_values(self, person):
+        """人物记录转换为树形视图的一行"""
+        return (
+            person['people_id'],
+            person['name'],
+            person['country'],
+            person['masterpiece'],
+            person['brief_intro']
+        )
 
     def show_awards(self):
         if not self.input_vars["id"].get():
@@ -275,7 +1017,7 @@ class PeopleTab(EntityTab):
         person_name = self.input_vars["name"].get()
         awards_window = tk.Toplevel(self)
         awards_window.title(f"获奖记录 - {person_name}")
-        awards_window.geometry("600x500")
+        awards_window.geometry("600x650")
         
         # 显示现有获奖记录
         awards_frame = ttk.LabelFrame(awards_window, text="获奖记录", padding="10", style="Custom.TLabelframe")
@@ -293,72 +1035,83 @@ class PeopleTab(EntityTab):
         tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        awards = db.get_person_awards(people_id)
-        for award in awards:
-            tree.insert("", tk.END, values=(
-                award['award_name'],
-                award['award_category'],
-                award['award_year']
-            ))
+        def fill_awards(awards):
+            if not tree.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for award in awards:
+                tree.insert("", tk.END, values=(
+                    award['award_name'],
+                    award['award_category'],
+                    award['award_year']
+                ))
+        
+        # 在后台获取获奖记录数据
+        self.jobs.submit(db.get_person_awards, people_id, on_success=fill_awards)
         
         # 添加新获奖记录
         add_frame = ttk.LabelFrame(awards_window, text="添加获奖记录", padding="10", style="Custom.TLabelframe")
         add_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        # 获取所有可用奖项
-        all_awards = db.fetch_all_awards()
-        award_choices = [(award['award_id'], f"{award['name']} ({award['category']})") for award in all_awards]
-        
         # 创建下拉列表
         ttk.Label(add_frame, text="选择奖项:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         award_var = tk.StringVar()
         award_combo = ttk.Combobox(add_frame, textvariable=award_var, state="readonly", width=40)
-        award_combo['values'] = [choice[1] for choice in award_choices]
         award_combo.grid(row=0, column=1, padx=5, pady=5)
         
+        # 在后台获取所有可用奖项
+        award_choices = []
+        def show_choices(all_awards):
+            if not award_combo.winfo_exists():
+                return
+            award_choices[:] = [(award['award_id'], f"{award['name']} ({award['category']})") for award in all_awards]
+            award_combo['values'] = [choice[1] for choice in award_choices]
+        self.jobs.submit(db.fetch_all_awards, on_success=show_choices)
+        
         ttk.Label(add_frame, text="获奖年份:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         award_year_var = tk.StringVar()
         ttk.Entry(add_frame, textvariable=award_year_var).grid(row=1, column=1, padx=5, pady=5)
         
-        def add_award():
-            if not award_var.get() or not award_year_var.get():
-                messagebox.showerror("错误", "请填写完整信息！")
+        pending = PendingLinks(add_frame, ("奖项", "获奖年份"))
+        pending.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+
+        def add_to_list():
+            selected_index = award_combo.current()
+            if selected_index < 0:
+                messagebox.showerror("错误", "请选择一个奖项！")
                 return
-            
             try:
-                # 从选择中获取award_id
-                selected_index = award_combo.current()
-                if selected_index < 0:
-                    messagebox.showerror("错误", "请选择一个奖项！")
-                    return
-                
-                award_id = award_choices[selected_index][0]
-                
-                db.add_person_award(
-                    people_id,
-                    award_id,
-                    int(award_year_var.get())
-                )
-                messagebox.showinfo("成功", "添加获奖记录成功！")
-                
-                # 刷新获奖记录列表
-                tree.delete(*tree.get_children())
-                awards = db.get_person_awards(people_id)
-                for award in awards:
-                    tree.insert("", tk.END, values=(
-                        award['award_name'],
-                        award['award_category'],
-                        award['award_year']
-                    ))
-                
-                # 清空输入
-                award_var.set("")
+                award_year = int(award_year_var.get())
+            except ValueError:
+                messagebox.showerror("错误", "获奖年份必须是整数！")
+                return
+            award_id, award_name = award_choices[selected_index]
+            if not pending.add((people_id, award_id, award_year), (award_name, award_year)):
+                messagebox.showinfo("提示", "该获奖记录已在待添加列表中")
+            award_var.set("")
+
+        # 待添加的获奖记录在一个事务中批量写入，已有的记录会被跳过
+        def add_awards():
+            links = list(pending.links)
+            if not links:
+                messagebox.showerror("错误", "请先把获奖记录加入列表！")
+                return
+
+            def added(count):
+                skipped = len(links) - count
+                message = f"添加了 {count} 条获奖记录！"
+                if skipped:
+                    message += f"（{skipped} 条已存在，已跳过）"
+                messagebox.showinfo("成功", message)
+                pending.clear()
                 award_year_var.set("")
-                
-            except Exception as e:
-                messagebox.showerror("错误", str(e))
-        
-        ttk.Button(add_frame, text="添加", command=add_award, style="Custom.TButton").grid(row=2, column=0, columnspan=2, pady=10)
+                # 刷新获奖记录列表
+                self.jobs.submit(db.get_person_awards, people_id, on_success=fill_awards)
+
+            self.jobs.submit(db.add_person_awards, links, on_success=added)
+
+        ttk.Button(add_frame, text="加入列表", command=add_to_list, style="Custom.TButton").grid(row=2, column=0, pady=10)
+        ttk.Button(add_frame, text="全部添加", command=add_awards, style="Custom.TButton").grid(row=2, column=1, pady=10)
 
     def show_details(self):
         if not self.input_vars["id"].get():
@@ -366,43 +1119,48 @@ class PeopleTab(EntityTab):
             return
 
         people_id = int(self.input_vars["id"].get())
-        details = db.get_person_details(people_id)
-        if not details:
-            messagebox.showerror("错误", "未找到该人物信息！")
-            return
+        # 在后台读取详细信息；再次查看或切换选择时，尚未完成的读取会被取消
+        def show(details):
+            if not details:
+                messagebox.showerror("错误", "未找到该人物信息！")
+                return
 
-        details_window = tk.Toplevel(self)
-        details_window.title(f"人物详细信息 - {details['basic_info']['name']}")
-        details_window.geometry("600x800")
-
-        # 基本信息
-        basic_frame = ttk.LabelFrame(details_window, text="基本信息", padding="5")
-        basic_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        ttk.Label(basic_frame, text=f"姓名: {details['basic_info']['name']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"国家: {details['basic_info']['country']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"代表作: {details['basic_info']['masterpiece']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"简介: {details['basic_info']['brief_intro']}").pack(anchor=tk.W)
-
-        # 获奖信息
-        awards_frame = ttk.LabelFrame(details_window, text="获奖记录", padding="5")
-        awards_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        awards_tree = ttk.Treeview(awards_frame, columns=("奖项", "类别", "年份"), show="headings")
-        for col in ["奖项", "类别", "年份"]:
-            awards_tree.heading(col, text=col)
-            awards_tree.column(col, width=100)
-        
-        for award in details['awards']:
-            awards_tree.insert("", tk.END, values=(
-                award['award_name'],
-                award['award_category'],
-                award['award_year']
-            ))
+            details_window = tk.Toplevel(self)
+            details_window.title(f"人物详细信息 - {details['basic_info']['name']}")
+            details_window.geometry("600x800")
+
+            # 基本信息
+            basic_frame = ttk.LabelFrame(details_window, text="基本信息", padding="5")
+            basic_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+            ttk.Label(basic_frame, text=f"姓名: {details['basic_info']['name']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"国家: {details['basic_info']['country']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"代表作: {details['basic_info']['masterpiece']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"简介: {details['basic_info']['brief_intro']}").pack(anchor=tk.W)
+
+            # 获奖信息
+            awards_frame = ttk.LabelFrame(details_window, text="获奖记录", padding="5")
+            awards_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+            awards_tree = ttk.Treeview(awards_frame, columns=("奖项", "类别", "年份"), show="headings")
+            for col in ["奖项", "类别", "年份"]:
+                awards_tree.heading(col, text=col)
+                awards_tree.column(col, width=100)
         
-        awards_tree.pack(fill=tk.BOTH, expand=True)
+            for award in details['awards']:
+                awards_tree.insert("", tk.END, values=(
+                    award['award_name'],
+                    award['award_category'],
+                    award['award_year']
+                ))
+        
+            awards_tree.pack(fill=tk.BOTH, expand=True)
+
+        self.jobs.submit(db.get_person_details, people_id, on_success=show, key=(self, "details"))
 
 class MoviesTab(EntityTab):
+    table = "Movies"
+
     # 填充电影信息到输入框
     def fill_input_fields(self, values):
         if not values:
@@ -465,8 +1223,8 @@ class MoviesTab(EntityTab):
         tree_frame.columnconfigure(0, weight=1)
         tree_frame.rowconfigure(0, weight=1)
 
-        # 创建树形视图
-        self.tree = ttk.Treeview(tree_frame, columns=("ID", "标题", "年份", "导演", "类型", "票房", "描述"), show="headings")
+        # 创建虚拟列表（只渲染可见行）
+        self.create_list(tree_frame, ("ID", "标题", "年份", "导演", "类型", "票房", "描述"))
         
         # 设置列属性
         self.tree.column("ID", width=50, anchor=tk.CENTER)
@@ -481,38 +1239,23 @@ class MoviesTab(EntityTab):
         for col in ["ID", "标题", "年份", "导演", "类型", "票房", "描述"]:
             self.tree.heading(col, text=col)
 
-        # 添加滚动条
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        # 布局树形视图和滚动条
+        # 布局列表
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
-
-        # 绑定选择事件
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
 
-    # 刷新电影数据
-    def refresh_data(self):
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # 获取并显示新数据
-        movies = db.fetch_all_movies()
-        for movie in movies:
-            self.tree.insert("", tk.END, values=(
-                movie['movie_id'],
-                movie['title'],
-                movie['release_year'],
-                movie['director'],
-                movie['genre'],
-                movie['box_office'],
-                movie['description']
-            ))
-        self.refresh_logs()
+    # 分页读取电影数据
+    def fetch_page(self, after_id, limit):
+        return db.fetch_movies_page(after_id, limit)
+
+    def row_values(self, movie):
+        return (
+            movie['movie_id'],
+            movie['title'],
+            movie['release_year'],
+            movie['director'],
+            movie['genre'],
+            movie['box_office'],
+            movie['description']
+        )
 
     # 添加电影（触发器控制）
     def add_movie(self):
@@ -521,17 +1264,16 @@ class MoviesTab(EntityTab):
             return
             
         try:
-            db.insert_movie(
+            self.submit_write(
+                db.insert_movie,
                 self.input_vars["title"].get(),
                 int(self.input_vars["release_year"].get() or 0),
                 self.input_vars["director"].get(),
                 self.input_vars["genre"].get(),
                 float(self.input_vars["box_office"].get() or 0),
-                self.input_vars["description"].get()
+                self.input_vars["description"].get(),
+                on_success=lambda row, logs: self.on_write_done("添加成功！触发器已记录此操作。", 'INSERT', row, logs)
             )
-            messagebox.showinfo("成功", "添加成功！触发器已记录此操作。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -542,23 +1284,24 @@ class MoviesTab(EntityTab):
             return
             
         try:
-            db.update_movie_with_procedure(
+            self.submit_write(
+                db.update_movie_with_procedure,
                 int(self.input_vars["id"].get()),
                 self.input_vars["title"].get(),
                 int(self.input_vars["release_year"].get() or 0),
                 self.input_vars["director"].get(),
                 self.input_vars["genre"].get(),
                 float(self.input_vars["box_office"].get() or 0),
-                self.input_vars["description"].get()
+                self.input_vars["description"].get(),
+                on_success=lambda row, logs: self.on_write_done("修改成功！存储过程已执行。", 'UPDATE', row, logs)
             )
-            messagebox.showinfo("成功", "修改成功！存储过程已执行。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
     # 删除电影（事务控制）
     def delete_movie(self):
+        if self.delete_selected(db.delete_movies):
+            return
         if not self.input_vars["id"].get():
             messagebox.showerror("错误", "请输入要删除的电影ID！")
             return
@@ -567,10 +1310,8 @@ class MoviesTab(EntityTab):
             return
             
         try:
-            db.delete_movie_with_transaction(int(self.input_vars["id"].get()))
-            messagebox.showinfo("成功", "删除成功！事务已完成。")
-            self.refresh_data()
-            self.clear_inputs()
+            self.submit_write(db.delete_movie_with_transaction, int(self.input_vars["id"].get()),
+                              on_success=lambda row, logs: self.on_write_done("删除成功！事务已完成。", 'DELETE', row, logs))
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -590,16 +1331,19 @@ class MoviesTab(EntityTab):
         tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # 从视图获取数据
-        summary_data = db.get_movies_summary()
-        for item in summary_data:
-            tree.insert("", tk.END, values=(
-                item['movie_id'],
-                item['title'],
-                item['release_year'],
-                item['director'],
-                item['genre']
-            ))
+        # 在后台从视图获取数据
+        def show_rows(summary_data):
+            if not tree.winfo_exists():
+                return
+            for item in summary_data:
+                tree.insert("", tk.END, values=(
+                    item['movie_id'],
+                    item['title'],
+                    item['release_year'],
+                    item['director'],
+                    item['genre']
+                ))
+        self.jobs.submit(db.get_movies_summary, on_success=show_rows)
 
     # 管理电影获奖记录
     def show_awards(self):
@@ -611,7 +1355,7 @@ class MoviesTab(EntityTab):
         movie_title = self.input_vars["title"].get()
         awards_window = tk.Toplevel(self)
         awards_window.title(f"获奖记录 - {movie_title}")
-        awards_window.geometry("600x500")
+        awards_window.geometry("600x650")
         
         # 显示现有获奖记录
         awards_frame = ttk.LabelFrame(awards_window, text="获奖记录", padding="10", style="Custom.TLabelframe")
@@ -629,74 +1373,83 @@ class MoviesTab(EntityTab):
         tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # 获取获奖记录数据
-        awards = db.get_movie_awards(movie_id)
-        for award in awards:
-            tree.insert("", tk.END, values=(
-                award['award_name'],
-                award['award_category'],
-                award['award_year']
-            ))
+        def fill_awards(awards):
+            if not tree.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for award in awards:
+                tree.insert("", tk.END, values=(
+                    award['award_name'],
+                    award['award_category'],
+                    award['award_year']
+                ))
+        
+        # 在后台获取获奖记录数据
+        self.jobs.submit(db.get_movie_awards, movie_id, on_success=fill_awards)
         
         # 添加新获奖记录区域
         add_frame = ttk.LabelFrame(awards_window, text="添加获奖记录", padding="10", style="Custom.TLabelframe")
         add_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        # 获取所有可用奖项
-        all_awards = db.fetch_all_awards()
-        award_choices = [(award['award_id'], f"{award['name']} ({award['category']})") for award in all_awards]
-        
         # 创建下拉列表
         ttk.Label(add_frame, text="选择奖项:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         award_var = tk.StringVar()
         award_combo = ttk.Combobox(add_frame, textvariable=award_var, state="readonly", width=40)
-        award_combo['values'] = [choice[1] for choice in award_choices]
         award_combo.grid(row=0, column=1, padx=5, pady=5)
         
+        # 在后台获取所有可用奖项
+        award_choices = []
+        def show_choices(all_awards):
+            if not award_combo.winfo_exists():
+                return
+            award_choices[:] = [(award['award_id'], f"{award['name']} ({award['category']})") for award in all_awards]
+            award_combo['values'] = [choice[1] for choice in award_choices]
+        self.jobs.submit(db.fetch_all_awards, on_success=show_choices)
+        
         ttk.Label(add_frame, text="获奖年份:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         award_year_var = tk.StringVar()
         ttk.Entry(add_frame, textvariable=award_year_var).grid(row=1, column=1, padx=5, pady=5)
         
-        # 添加获奖记录功能
-        def add_award():
-            if not award_var.get() or not award_year_var.get():
-                messagebox.showerror("错误", "请填写完整信息！")
+        pending = PendingLinks(add_frame, ("奖项", "获奖年份"))
+        pending.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+
+        def add_to_list():
+            selected_index = award_combo.current()
+            if selected_index < 0:
+                messagebox.showerror("错误", "请选择一个奖项！")
                 return
-            
             try:
-                # 从选择中获取award_id
-                selected_index = award_combo.current()
-                if selected_index < 0:
-                    messagebox.showerror("错误", "请选择一个奖项！")
-                    return
-                
-                award_id = award_choices[selected_index][0]
-                
-                db.add_movie_award(
-                    movie_id,
-                    award_id,
-                    int(award_year_var.get())
-                )
-                messagebox.showinfo("成功", "添加获奖记录成功！")
-                
-                # 刷新获奖记录列表
-                tree.delete(*tree.get_children())
-                awards = db.get_movie_awards(movie_id)
-                for award in awards:
-                    tree.insert("", tk.END, values=(
-                        award['award_name'],
-                        award['award_category'],
-                        award['award_year']
-                    ))
-                
-                # 清空输入
-                award_var.set("")
+                award_year = int(award_year_var.get())
+            except ValueError:
+                messagebox.showerror("错误", "获奖年份必须是整数！")
+                return
+            award_id, award_name = award_choices[selected_index]
+            if not pending.add((movie_id, award_id, award_year), (award_name, award_year)):
+                messagebox.showinfo("提示", "该获奖记录已在待添加列表中")
+            award_var.set("")
+
+        # 待添加的获奖记录在一个事务中批量写入，已有的记录会被跳过
+        def add_awards():
+            links = list(pending.links)
+            if not links:
+                messagebox.showerror("错误", "请先把获奖记录加入列表！")
+                return
+
+            def added(count):
+                skipped = len(links) - count
+                message = f"添加了 {count} 条获奖记录！"
+                if skipped:
+                    message += f"（{skipped} 条已存在，已跳过）"
+                messagebox.showinfo("成功", message)
+                pending.clear()
                 award_year_var.set("")
-                
-            except Exception as e:
-                messagebox.showerror("错误", str(e))
-        
-        ttk.Button(add_frame, text="添加", command=add_award, style="Custom.TButton").grid(row=2, column=0, columnspan=2, pady=10)
+                # 刷新获奖记录列表
+                self.jobs.submit(db.get_movie_awards, movie_id, on_success=fill_awards)
+
+            self.jobs.submit(db.add_movie_awards, links, on_success=added)
+
+        ttk.Button(add_frame, text="加入列表", command=add_to_list, style="Custom.TButton").grid(row=2, column=0, pady=10)
+        ttk.Button(add_frame, text="全部添加", command=add_awards, style="Custom.TButton").grid(row=2, column=1, pady=10)
 
     def show_details(self):
         if not self.input_vars["id"].get():
@@ -704,80 +1457,83 @@ class MoviesTab(EntityTab):
             return
 
         movie_id = int(self.input_vars["id"].get())
-        details = db.get_movie_details(movie_id)
-        if not details:
-            messagebox.showerror("错误", "未找到该电影信息！")
-            return
-
-        details_window = tk.Toplevel(self)
-        details_window.title(f"电影详细信息 - {details['basic_info']['title']}")
-        details_window.geometry("600x800")
-
-        # 基本信息
-        basic_frame = ttk.LabelFrame(details_window, text="基本信息", padding="5")
-        basic_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        ttk.Label(basic_frame, text=f"标题: {details['basic_info']['title']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"年份: {details['basic_info']['release_year']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"导演: {details['basic_info']['director']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"类型: {details['basic_info']['genre']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"票房: {details['basic_info']['box_office']}").pack(anchor=tk.W)
-        ttk.Label(basic_frame, text=f"描述: {details['basic_info']['description']}").pack(anchor=tk.W)
-
-        # 获奖信息
-        awards_frame = ttk.LabelFrame(details_window, text="获奖记录", padding="5")
-        awards_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        awards_tree = ttk.Treeview(awards_frame, columns=("奖项", "类别", "年份"), show="headings")
-        for col in ["奖项", "类别", "年份"]:
-            awards_tree.heading(col, text=col)
-            awards_tree.column(col, width=100)
-        
-        for award in details['awards']:
-            awards_tree.insert("", tk.END, values=(
-                award['award_name'],
-                award['award_category'],
-                award['award_year']
-            ))
-        
-        awards_tree.pack(fill=tk.BOTH, expand=True)
-
-        # 演员阵容
-        actors_frame = ttk.LabelFrame(details_window, text="演员阵容", padding="5")
-        actors_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        actors_tree = ttk.Treeview(actors_frame, columns=("姓名", "角色", "是否主演"), show="headings")
-        for col in ["姓名", "角色", "是否主演"]:
-            actors_tree.heading(col, text=col)
-        actors_tree.column("姓名", width=150)
-        actors_tree.column("角色", width=150)
-        actors_tree.column("是否主演", width=100)
-        
-        for actor in details['actors']:
-            actors_tree.insert("", tk.END, values=(
-                actor['name'],
-                actor['role'],
-                "是" if actor['is_protagonist'] else "否"
-            ))
-        
-        actors_tree.pack(fill=tk.BOTH, expand=True)
+        # 在后台读取详细信息；再次查看或切换选择时，尚未完成的读取会被取消
+        def show(details):
+            if not details:
+                messagebox.showerror("错误", "未找到该电影信息！")
+                return
 
-        # 相关公司
-        companies_frame = ttk.LabelFrame(details_window, text="相关公司", padding="5")
-        companies_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        companies_tree = ttk.Treeview(companies_frame, columns=("公司名称", "关系类型"), show="headings")
-        for col in ["公司名称", "关系类型"]:
-            companies_tree.heading(col, text=col)
-            companies_tree.column(col, width=200)
-        
-        for company in details['companies']:
-            companies_tree.insert("", tk.END, values=(
-                company['name'],
-                company['relationship_type']
-            ))
-        
-        companies_tree.pack(fill=tk.BOTH, expand=True)
+            details_window = tk.Toplevel(self)
+            details_window.title(f"电影详细信息 - {details['basic_info']['title']}")
+            details_window.geometry("600x800")
+
+            # 基本信息
+            basic_frame = ttk.LabelFrame(details_window, text="基本信息", padding="5")
+            basic_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+            ttk.Label(basic_frame, text=f"标题: {details['basic_info']['title']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"年份: {details['basic_info']['release_year']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"导演: {details['basic_info']['director']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"类型: {details['basic_info']['genre']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"票房: {details['basic_info']['box_office']}").pack(anchor=tk.W)
+            ttk.Label(basic_frame, text=f"描述: {details['basic_info']['description']}").pack(anchor=tk.W)
+
+            # 获奖信息
+            awards_frame = ttk.LabelFrame(details_window, text="获奖记录", padding="5")
+            awards_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+            awards_tree = ttk.Treeview(awards_frame, columns=("奖项", "类别", "年份"), show="headings")
+            for col in ["奖项", "类别", "年份"]:
+                awards_tree.heading(col, text=col)
+                awards_tree.column(col, width=100)
+        
+            for award in details['awards']:
+                awards_tree.insert("", tk.END, values=(
+                    award['award_name'],
+                    award['award_category'],
+                    award['award_year']
+                ))
+        
+            awards_tree.pack(fill=tk.BOTH, expand=True)
+
+            # 演员阵容
+            actors_frame = ttk.LabelFrame(details_window, text="演员阵容", padding="5")
+            actors_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+            actors_tree = ttk.Treeview(actors_frame, columns=("姓名", "角色", "是否主演"), show="headings")
+            for col in ["姓名", "角色", "是否主演"]:
+                actors_tree.heading(col, text=col)
+            actors_tree.column("姓名", width=150)
+            actors_tree.column("角色", width=150)
+            actors_tree.column("是否主演", width=100)
+        
+            for actor in details['actors']:
+                actors_tree.insert("", tk.END, values=(
+                    actor['name'],
+                    actor['role'],
+                    "是" if actor['is_protagonist'] else "否"
+                ))
+        
+            actors_tree.pack(fill=tk.BOTH, expand=True)
+
+            # 相关公司
+            companies_frame = ttk.LabelFrame(details_window, text="相关公司", padding="5")
+            companies_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+            companies_tree = ttk.Treeview(companies_frame, columns=("公司名称", "关系类型"), show="headings")
+            for col in ["公司名称", "关系类型"]:
+                companies_tree.heading(col, text=col)
+                companies_tree.column(col, width=200)
+        
+            for company in details['companies']:
+                companies_tree.insert("", tk.END, values=(
+                    company['name'],
+                    company['relationship_type']
+                ))
+        
+            companies_tree.pack(fill=tk.BOTH, expand=True)
+
+        self.jobs.submit(db.get_movie_details, movie_id, on_success=show, key=(self, "details"))
 
     def show_actors(self):
         if not self.input_vars["id"].get():
@@ -796,16 +1552,21 @@ class MoviesTab(EntityTab):
         for col in ["演员", "角色", "是否主演"]:
             tree.heading(col, text=col)
             tree.column(col, width=100)
+        tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
         
-        actors = db.get_movie_actors(movie_id)
-        for actor in actors:
-            tree.insert("", tk.END, values=(
-                actor['actor_name'],
-                actor['role'],
-                "是" if actor['is_protagonist'] else "否"
-            ))
-        
-        # 添加新演员
+        def fill_actors(actors):
+            if not tree.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for actor in actors:
+                tree.insert("", tk.END, values=(
+                    actor['actor_name'],
+                    actor['role'],
+                    "是" if actor['is_protagonist'] else "否"
+                ))
+        self.jobs.submit(db.get_movie_actors, movie_id, on_success=fill_actors)
+        
+        # 添加新演员：可以连续加入多位演员，再一次性添加
         add_frame = ttk.LabelFrame(actors_window, text="添加演员", padding="5")
         add_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=10)
         
@@ -821,23 +1582,50 @@ class MoviesTab(EntityTab):
         
         ttk.Checkbutton(add_frame, text="是否主演", variable=is_protagonist_var).grid(row=2, column=0, columnspan=2)
         
-        def add_actor():
+        pending = PendingLinks(add_frame, ("演员ID", "角色", "是否主演"))
+        pending.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        
+        def add_to_list():
             try:
-                db.add_movie_actor(
-                    movie_id,
-                    int(actor_id_var.get()),
-                    role_var.get(),
-                    is_protagonist_var.get()
-                )
-                messagebox.showinfo("成功", "添加演员成功！")
-                actors_window.destroy()
-            except Exception as e:
-                messagebox.showerror("错误", str(e))
+                people_id = int(actor_id_var.get())
+            except ValueError:
+                messagebox.showerror("错误", "演员ID必须是整数！")
+                return
+            # 同一位演员在一部电影中只添加一次
+            if any(link[1] == people_id for link in pending.links):
+                messagebox.showinfo("提示", "该演员已在待添加列表中")
+                return
+            is_protagonist = is_protagonist_var.get()
+            pending.add((movie_id, people_id, role_var.get(), is_protagonist),
+                        (people_id, role_var.get(), "是" if is_protagonist else "否"))
+            actor_id_var.set("")
+            role_var.set("")
+            is_protagonist_var.set(False)
+        
+        def add_actors():
+            links = list(pending.links)
+            if not links:
+                messagebox.showerror("错误", "请先把演员加入列表！")
+                return
+            
+            def added(count):
+                skipped = len(links) - count
+                message = f"添加了 {count} 位演员！"
+                if skipped:
+                    message += f"（{skipped} 位已在演员列表中，已跳过）"
+                messagebox.showinfo("成功", message)
+                pending.clear()
+                self.jobs.submit(db.get_movie_actors, movie_id, on_success=fill_actors)
+            
+            self.jobs.submit(db.add_movie_actors, links, on_success=added)
         
-        ttk.Button(add_frame, text="添加", command=add_actor).grid(row=3, column=0, columnspan=2, pady=5)
+        ttk.Button(add_frame, text="加入列表", command=add_to_list).grid(row=3, column=0, pady=5)
+        ttk.Button(add_frame, text="全部添加", command=add_actors).grid(row=3, column=1, pady=5)
 
 # 公司管理标签页
 class CompaniesTab(EntityTab):
+    table = "Companies"
+
     # 填充公司信息到输入框
     def fill_input_fields(self, values):
         if not values:
@@ -897,8 +1685,8 @@ class CompaniesTab(EntityTab):
         tree_frame.columnconfigure(0, weight=1)
         tree_frame.rowconfigure(0, weight=1)
 
-        # 创建树形视图
-        self.tree = ttk.Treeview(tree_frame, columns=("ID", "名称", "国家", "成立年份", "行业", "营收", "描述"), show="headings")
+        # 创建虚拟列表（只渲染可见行）
+        self.create_list(tree_frame, ("ID", "名称", "国家", "成立年份", "行业", "营收", "描述"))
         
         # 设置列属性
         self.tree.column("ID", width=50, anchor=tk.CENTER)
@@ -913,38 +1701,23 @@ class CompaniesTab(EntityTab):
         for col in ["ID", "名称", "国家", "成立年份", "行业", "营收", "描述"]:
             self.tree.heading(col, text=col)
 
-        # 添加滚动条
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        # 布局树形视图和滚动条
+        # 布局列表
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
-
-        # 绑定选择事件
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
 
-    # 刷新公司数据
-    def refresh_data(self):
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # 获取并显示新数据
-        companies = db.fetch_all_companies()
-        for company in companies:
-            self.tree.insert("", tk.END, values=(
-                company['company_id'],
-                company['name'],
-                company['country'],
-                company['founded_year'],
-                company['industry'],
-                company['revenue'],
-                company['description']
-            ))
-        self.refresh_logs()
+    # 分页读取公司数据
+    def fetch_page(self, after_id, limit):
+        return db.fetch_companies_page(after_id, limit)
+
+    def row_values(self, company):
+        return (
+            company['company_id'],
+            company['name'],
+            company['country'],
+            company['founded_year'],
+            company['industry'],
+            company['revenue'],
+            company['description']
+        )
 
     # 添加公司（触发器控制）
     def add_company(self):
@@ -953,17 +1726,16 @@ class CompaniesTab(EntityTab):
             return
             
         try:
-            db.insert_company(
+            self.submit_write(
+                db.insert_company,
                 self.input_vars["name"].get(),
                 self.input_vars["country"].get(),
                 int(self.input_vars["founded_year"].get() or 0),
                 self.input_vars["industry"].get(),
                 float(self.input_vars["revenue"].get() or 0),
-                self.input_vars["description"].get()
+                self.input_vars["description"].get(),
+                on_success=lambda row, logs: self.on_write_done("添加成功！触发器已记录此操作。", 'INSERT', row, logs)
             )
-            messagebox.showinfo("成功", "添加成功！触发器已记录此操作。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -974,23 +1746,24 @@ class CompaniesTab(EntityTab):
             return
             
         try:
-            db.update_company_with_procedure(
+            self.submit_write(
+                db.update_company_with_procedure,
                 int(self.input_vars["id"].get()),
                 self.input_vars["name"].get(),
                 self.input_vars["country"].get(),
                 int(self.input_vars["founded_year"].get() or 0),
                 self.input_vars["industry"].get(),
                 float(self.input_vars["revenue"].get() or 0),
-                self.input_vars["description"].get()
+                self.input_vars["description"].get(),
+                on_success=lambda row, logs: self.on_write_done("修改成功！存储过程已执行。", 'UPDATE', row, logs)
             )
-            messagebox.showinfo("成功", "修改成功！存储过程已执行。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
     # 删除公司（事务控制）
     def delete_company(self):
+        if self.delete_selected(db.delete_companies):
+            return
         if not self.input_vars["id"].get():
             messagebox.showerror("错误", "请输入要删除的公司ID！")
             return
@@ -999,10 +1772,8 @@ class CompaniesTab(EntityTab):
             return
             
         try:
-            db.delete_company_with_transaction(int(self.input_vars["id"].get()))
-            messagebox.showinfo("成功", "删除成功！事务已完成。")
-            self.refresh_data()
-            self.clear_inputs()
+            self.submit_write(db.delete_company_with_transaction, int(self.input_vars["id"].get()),
+                              on_success=lambda row, logs: self.on_write_done("删除成功！事务已完成。", 'DELETE', row, logs))
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -1022,19 +1793,24 @@ class CompaniesTab(EntityTab):
         tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # 从视图获取数据
-        summary_data = db.get_companies_summary()
-        for item in summary_data:
-            tree.insert("", tk.END, values=(
-                item['company_id'],
-                item['name'],
-                item['country'],
-                item['industry'],
-                item['founded_year']
-            ))
+        # 在后台从视图获取数据
+        def show_rows(summary_data):
+            if not tree.winfo_exists():
+                return
+            for item in summary_data:
+                tree.insert("", tk.END, values=(
+                    item['company_id'],
+                    item['name'],
+                    item['country'],
+                    item['industry'],
+                    item['founded_year']
+                ))
+        self.jobs.submit(db.get_companies_summary, on_success=show_rows)
 
 # 奖项管理标签页
 class AwardsTab(EntityTab):
+    table = "Awards"
+
     # 填充奖项信息到输入框
     def fill_input_fields(self, values):
         if not values:
@@ -1090,8 +1866,8 @@ class AwardsTab(EntityTab):
         tree_frame.columnconfigure(0, weight=1)
         tree_frame.rowconfigure(0, weight=1)
 
-        # 创建树形视图
-        self.tree = ttk.Treeview(tree_frame, columns=("ID", "名称", "类别", "年份", "描述"), show="headings")
+        # 创建虚拟列表（只渲染可见行）
+        self.create_list(tree_frame, ("ID", "名称", "类别", "年份", "描述"))
         
         # 设置列属性
         self.tree.column("ID", width=50, anchor=tk.CENTER)
@@ -1104,36 +1880,21 @@ class AwardsTab(EntityTab):
         for col in ["ID", "名称", "类别", "年份", "描述"]:
             self.tree.heading(col, text=col)
 
-        # 添加滚动条
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        # 布局树形视图和滚动条
+        # 布局列表
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
 
-        # 绑定选择事件
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+    # 分页读取奖项数据
+    def fetch_page(self, after_id, limit):
+        return db.fetch_awards_page(after_id, limit)
 
-    # 刷新奖项数据
-    def refresh_data(self):
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # 获取并显示新数据
-        awards = db.fetch_all_awards()
-        for award in awards:
-            self.tree.insert("", tk.END, values=(
-                award['award_id'],
-                award['name'],
-                award['category'],
-                award['year'],
-                award['description']
-            ))
-        self.refresh_logs()
+    def row_values(self, award):
+        return (
+            award['award_id'],
+            award['name'],
+            award['category'],
+            award['year'],
+            award['description']
+        )
 
     # 添加奖项（触发器控制）
     def add_award(self):
@@ -1142,15 +1903,14 @@ class AwardsTab(EntityTab):
             return
             
         try:
-            db.insert_award(
+            self.submit_write(
+                db.insert_award,
                 self.input_vars["name"].get(),
                 self.input_vars["category"].get(),
                 int(self.input_vars["year"].get() or 0),
-                self.input_vars["description"].get()
+                self.input_vars["description"].get(),
+                on_success=lambda row, logs: self.on_write_done("添加成功！触发器已记录此操作。", 'INSERT', row, logs)
             )
-            messagebox.showinfo("成功", "添加成功！触发器已记录此操作。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -1161,21 +1921,22 @@ class AwardsTab(EntityTab):
             return
             
         try:
-            db.update_award_with_procedure(
+            self.submit_write(
+                db.update_award_with_procedure,
                 int(self.input_vars["id"].get()),
                 self.input_vars["name"].get(),
                 self.input_vars["category"].get(),
                 int(self.input_vars["year"].get() or 0),
-                self.input_vars["description"].get()
+                self.input_vars["description"].get(),
+                on_success=lambda row, logs: self.on_write_done("修改成功！存储过程已执行。", 'UPDATE', row, logs)
             )
-            messagebox.showinfo("成功", "修改成功！存储过程已执行。")
-            self.refresh_data()
-            self.clear_inputs()
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
     # 删除奖项（事务控制）
     def delete_award(self):
+        if self.delete_selected(db.delete_awards):
+            return
         if not self.input_vars["id"].get():
             messagebox.showerror("错误", "请输入要删除的奖项ID！")
             return
@@ -1184,10 +1945,8 @@ class AwardsTab(EntityTab):
             return
             
         try:
-            db.delete_award_with_transaction(int(self.input_vars["id"].get()))
-            messagebox.showinfo("成功", "删除成功！事务已完成。")
-            self.refresh_data()
-            self.clear_inputs()
+            self.submit_write(db.delete_award_with_transaction, int(self.input_vars["id"].get()),
+                              on_success=lambda row, logs: self.on_write_done("删除成功！事务已完成。", 'DELETE', row, logs))
         except Exception as e:
             messagebox.showerror("错误", str(e))
 
@@ -1207,15 +1966,18 @@ class AwardsTab(EntityTab):
         tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # 从视图获取数据
-        summary_data = db.get_awards_summary()
-        for item in summary_data:
-            tree.insert("", tk.END, values=(
-                item['award_id'],
-                item['name'],
-                item['category'],
-                item['year']
-            ))
+        # 在后台从视图获取数据
+        def show_rows(summary_data):
+            if not tree.winfo_exists():
+                return
+            for item in summary_data:
+                tree.insert("", tk.END, values=(
+                    item['award_id'],
+                    item['name'],
+                    item['category'],
+                    item['year']
+                ))
+        self.jobs.submit(db.get_awards_summary, on_success=show_rows)
 
 class App:
     # 初始化应用程序
@@ -1318,6 +2080,12 @@ class App:
                        font=('Microsoft YaHei', 9),
                        padding=[5, 3])
         
+        # 后台任务：数据库操作不在界面线程中执行
+        self.jobs = BackgroundJobs(root)
+        
+        # 创建菜单栏
+        self.create_menu()
+        
         # 创建主框架
         self.main_frame = ttk.Frame(root, style='Custom.TFrame')
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
@@ -1339,6 +2107,161 @@ class App:
         
         # 刷新数据
         self.refresh_all()
+        
+        # 定时检查操作日志，感知其他客户端的修改
+        self.root.after(CHANGE_POLL_INTERVAL, self.poll_changes)
+
+    def create_menu(self):
+        """创建菜单栏"""
+        menubar = tk.Menu(self.root)
+        data_menu = tk.Menu(menubar, tearoff=0)
+        data_menu.add_command(label="导出数据...", command=self.show_export)
+        menubar.add_cascade(label="数据", menu=data_menu)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="查询统计...", command=self.show_query_stats)
+        menubar.add_cascade(label="工具", menu=tools_menu)
+        self.root.config(menu=menubar)
+
+    def show_export(self):
+        """导出表或视图到文件（在后台流式导出，不会把整张表读入内存）"""
+        export_window = tk.Toplevel(self.root)
+        export_window.title("导出数据")
+        export_window.geometry("420x160")
+        
+        frame = ttk.LabelFrame(export_window, text="导出", padding="10", style="Custom.TLabelframe")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        ttk.Label(frame, text="表或视图:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        source_var = tk.StringVar(value=exporter.EXPORT_SOURCES[0])
+        ttk.Combobox(frame, textvariable=source_var, values=exporter.EXPORT_SOURCES,
+                     state="readonly", width=30).grid(row=0, column=1, padx=5, pady=5)
+        
+        status = ttk.Label(frame, text="")
+        status.grid(row=2, column=0, columnspan=2, sticky=tk.W, padx=5)
+        
+        def start_export():
+            source = source_var.get()
+            path = filedialog.asksaveasfilename(
+                parent=export_window,
+                initialfile=f"{source}.csv",
+                defaultextension=".csv",
+                filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")])
+            if not path:
+                return
+            export_button.configure(state=tk.DISABLED)
+            status.configure(text="正在导出...")
+            
+            def done(count):
+                if export_window.winfo_exists():
+                    export_button.configure(state=tk.NORMAL)
+                    status.configure(text="")
+                messagebox.showinfo("成功", f"已导出 {count} 行到 {path}")
+            
+            def failed(error):
+                if export_window.winfo_exists():
+                    export_button.configure(state=tk.NORMAL)
+                    status.configure(text="")
+                self.jobs.show_error(error)
+            
+            self.jobs.submit(exporter.export, source, path, on_success=done, on_error=failed)
+        
+        export_button = ttk.Button(frame, text="导出...", command=start_export, style="Custom.TButton")
+        export_button.grid(row=1, column=0, columnspan=2, pady=10)
+
+    def show_query_stats(self):
+        """查询统计：按总耗时等排序显示前 N 条 SQL，窗口打开期间定时刷新
+
+        统计在内存中（见 query_stats.py），读取不访问数据库，直接在界面线程中进行。
+        """
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("查询统计")
+        stats_window.geometry("1000x600")
+        
+        control_frame = ttk.Frame(stats_window)
+        control_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(control_frame, text="显示前").pack(side=tk.LEFT)
+        top_var = tk.IntVar(value=20)
+        ttk.Spinbox(control_frame, from_=5, to=200, increment=5, textvariable=top_var, width=5).pack(side=tk.LEFT)
+        ttk.Label(control_frame, text="条，排序:").pack(side=tk.LEFT)
+        orders = {"总耗时": "total", "平均耗时": "mean", "p95": "p95", "最大耗时": "max", "次数": "count", "行数": "rows"}
+        order_var = tk.StringVar(value="总耗时")
+        order_combo = ttk.Combobox(control_frame, textvariable=order_var, values=list(orders),
+                                   state="readonly", width=10)
+        order_combo.pack(side=tk.LEFT, padx=5)
+        
+        summary = ttk.Label(stats_window, text="")
+        summary.pack(fill=tk.X, padx=10)
+        
+        columns = ("查询", "次数", "总耗时", "平均", "p95", "最大", "执行", "读取", "行数", "出错")
+        tree_frame = ttk.Frame(stats_window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+        for col in columns:
+            tree.heading(col, text=col if col in ("查询", "次数", "行数", "出错") else f"{col}(ms)")
+            tree.column(col, width=420 if col == "查询" else 70, anchor=tk.W if col == "查询" else tk.E)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # 选中一行时显示完整的 SQL 指纹和最慢一次的参数
+        detail = tk.Text(stats_window, height=5, wrap=tk.WORD)
+        detail.pack(fill=tk.X, padx=10, pady=5)
+        snapshots = {}
+        
+        def show_detail(event=None):
+            selection = tree.selection()
+            detail.delete("1.0", tk.END)
+            if selection and selection[0] in snapshots:
+                item = snapshots[selection[0]]
+                detail.insert(tk.END, f"{item['fingerprint']}\n最慢一次的参数: {item['sample'] or '无'}\n"
+                                      f"p50/p95/p99: {item['p50'] * 1000:.1f} / {item['p95'] * 1000:.1f} / "
+                                      f"{item['p99'] * 1000:.1f} ms")
+        tree.bind("<<TreeviewSelect>>", show_detail)
+        
+        def ms(seconds):
+            return f"{seconds * 1000:.1f}"
+        
+        def refresh():
+            if not stats_window.winfo_exists():
+                return
+            try:
+                n = max(1, top_var.get())
+            except tk.TclError:
+                n = 20
+            selected = tree.selection()
+            selected_key = snapshots[selected[0]]['fingerprint'] if selected and selected[0] in snapshots else None
+            tree.delete(*tree.get_children())
+            snapshots.clear()
+            for item in query_stats.top_queries(n, orders[order_var.get()]):
+                item_id = tree.insert("", tk.END, values=(
+                    item['fingerprint'], item['count'], ms(item['total']), ms(item['mean']),
+                    ms(item['p95']), ms(item['max']), ms(item['execute']), ms(item['fetch']),
+                    item['rows'], item['errors']))
+                snapshots[item_id] = item
+                if item['fingerprint'] == selected_key:
+                    tree.selection_set(item_id)
+            connects = query_stats.connect_stats()
+            pool = db.get_pool_stats()
+            summary.configure(text=(
+                f"建立连接 {connects['count']} 次，平均 {ms(connects['mean'])} ms，最大 {ms(connects['max'])} ms；"
+                f"连接池 使用中 {pool['in_use']}/{pool['max_size']}，等待 {pool['waits']} 次；"
+                f"慢查询（≥ {ms(query_stats.SLOW_QUERY_THRESHOLD)} ms）记录在 {query_stats.SLOW_QUERY_LOG}"))
+        
+        def auto_refresh():
+            if stats_window.winfo_exists():
+                refresh()
+                stats_window.after(STATS_REFRESH_INTERVAL, auto_refresh)
+        
+        def reset():
+            query_stats.reset_stats()
+            refresh()
+        
+        order_combo.bind("<<ComboboxSelected>>", lambda e: refresh())
+        ttk.Button(control_frame, text="刷新", command=refresh, style="Custom.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="清空统计", command=reset, style="Custom.TButton").pack(side=tk.LEFT, padx=5)
+        auto_refresh()
 
     def create_search_bar(self):
         """创建搜索栏
@@ -1373,44 +2296,68 @@ class App:
                   command=self.clear_search, 
                   style='Custom.TButton').pack(side=tk.LEFT, padx=2)
         
+        # 检索结果提示
+        self.search_status = ttk.Label(search_frame, text="", width=16)
+        self.search_status.grid(row=0, column=3, padx=5)
+        
         # 绑定回车键
         search_entry.bind('<Return>', lambda e: self.perform_search())
+        
+        # 边输入边搜索：停止输入一段时间后才检索
+        self.search_after_id = None
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+
+    def schedule_search(self):
+        """输入变化时重新计时，SEARCH_DELAY 毫秒内没有新的输入才检索"""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DELAY, self.incremental_search)
+
+    def incremental_search(self):
+        """边输入边搜索，结果数显示在搜索框旁边"""
+        self.search_after_id = None
+        current_tab = self.get_current_tab()
+        if not isinstance(current_tab, EntityTab):
+            return
+        search_text = self.search_var.get().strip()
+        if not search_text:
+            current_tab.clear_filter()
+            self.search_status.configure(text="")
+            return
+        current_tab.show_search(search_text, on_result=self.show_search_status)
+
+    def show_search_status(self, count, complete):
+        if count == 0:
+            self.search_status.configure(text="未找到匹配项")
+        else:
+            self.search_status.configure(text=f"找到 {count}{'' if complete else '+'} 条")
 
     def perform_search(self):
         """执行搜索
         
-        在当前标签页的数据中执行搜索操作。
-        搜索是不区分大小写的，会在所有列中查找匹配项。
+        在数据库中对当前标签页对应的表做全文检索（名称、描述等文本列），
+        列表只显示按相关度排序的检索结果，滚动时分页读取。
         如果没有找到匹配项，会显示提示信息并恢复显示所有数据。
         """
-        search_text = self.search_var.get().lower()
+        search_text = self.search_var.get().strip()
         if not search_text:
             return
             
         current_tab = self.get_current_tab()
-        if not hasattr(current_tab, 'tree'):
+        if not isinstance(current_tab, EntityTab):
             return
+        
+        # 立即检索，取消还在等待的输入检索
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
             
-        # 恢复所有项目的显示
-        for item in current_tab.tree.get_children():
-            current_tab.tree.reattach(item, '', 'end')
-        
-        # 隐藏不匹配的项目
-        items_to_hide = []
-        for item in current_tab.tree.get_children():
-            values = [str(v).lower() for v in current_tab.tree.item(item)['values']]
-            if not any(search_text in v for v in values):
-                items_to_hide.append(item)
-        
-        # 从树中移除不匹配的项目
-        for item in items_to_hide:
-            current_tab.tree.detach(item)
-        
-        if not current_tab.tree.get_children():
+        def no_match():
             messagebox.showinfo("搜索结果", "未找到匹配项")
             # 恢复所有项目的显示
-            for item in items_to_hide:
-                current_tab.tree.reattach(item, '', 'end')
+            current_tab.clear_filter()
+        
+        current_tab.show_search(search_text, on_empty=no_match, on_result=self.show_search_status)
 
     def clear_search(self):
         """清除搜索
@@ -1419,13 +2366,14 @@ class App:
         同时清除当前选中的项目。
         """
         self.search_var.set('')
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        self.search_status.configure(text="")
         current_tab = self.get_current_tab()
-        if hasattr(current_tab, 'tree'):
-            # 恢复所有项目的显示
-            for item in current_tab.tree.detached():
-                current_tab.tree.reattach(item, '', 'end')
-            # 清除选择
-            current_tab.tree.selection_remove(*current_tab.tree.selection())
+        if isinstance(current_tab, EntityTab):
+            # 恢复所有项目的显示，同时清除选择
+            current_tab.clear_filter()
 
     def get_current_tab(self):
         """获取当前选项卡
@@ -1452,10 +2400,10 @@ class App:
         self.notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
 
         # 创建各个选项卡
-        self.people_tab = PeopleTab(self.notebook, self.refresh_logs)
-        self.movies_tab = MoviesTab(self.notebook, self.refresh_logs)
-        self.companies_tab = CompaniesTab(self.notebook, self.refresh_logs)
-        self.awards_tab = AwardsTab(self.notebook, self.refresh_logs)
+        self.people_tab = PeopleTab(self.notebook, self.refresh_logs, self.jobs)
+        self.movies_tab = MoviesTab(self.notebook, self.refresh_logs, self.jobs)
+        self.companies_tab = CompaniesTab(self.notebook, self.refresh_logs, self.jobs)
+        self.awards_tab = AwardsTab(self.notebook, self.refresh_logs, self.jobs)
 
         self.notebook.add(self.people_tab, text="人物管理")
         self.notebook.add(self.movies_tab, text="电影管理")
@@ -1485,6 +2433,11 @@ class App:
         tree_frame.rowconfigure(0, weight=1)
 
         self.log_tree = ttk.Treeview(tree_frame, columns=("时间", "操作", "表", "记录ID"), show="headings", height=6)
+        self.log_items = deque()  # 日志条目，从旧到新
+        self.last_log_id = None  # 已显示的最新日志ID
+        self.logs_loaded = False  # 是否已读取过历史日志
+        self.log_refresh_pending = False  # 是否有待执行的刷新
+        self.log_fetch_running = False  # 是否正在后台读取
         
         # 设置列宽和对齐方式
         self.log_tree.column("时间", width=250, anchor=tk.CENTER)
@@ -1507,20 +2460,76 @@ class App:
     def refresh_logs(self):
         """刷新日志
         
-        从数据库获取最新的操作日志并显示。
-        新的日志会显示在顶部。
+        只从数据库读取上次之后新增的日志，新的日志会显示在顶部，
+        最多保留 LOG_BUFFER_SIZE 条。同一轮事件循环中的多次调用
+        只会读取一次；读取过程中的调用会在读完后再读一次。
         """
-        for item in self.log_tree.get_children():
-            self.log_tree.delete(item)
+        if self.log_refresh_pending:
+            return
+        self.log_refresh_pending = True
+        if not self.log_fetch_running:
+            self.root.after_idle(self.fetch_new_logs)
 
-        logs = db.get_operation_logs()
+    def fetch_new_logs(self):
+        """在后台读取新增日志"""
+        self.log_refresh_pending = False
+        self.log_fetch_running = True
+
+        def failed(error):
+            self.log_fetch_running = False
+            self.jobs.show_error(error)
+
+        self.jobs.submit(db.tail_operation_logs, self.last_log_id, LOG_BUFFER_SIZE,
+                         on_success=self.append_logs, on_error=failed)
+
+    def poll_changes(self):
+        """定时读取新增的操作日志"""
+        self.refresh_logs()
+        self.root.after(CHANGE_POLL_INTERVAL, self.poll_changes)
+
+    def dispatch_changes(self, logs):
+        """把新增的操作日志分发给缓存和各标签页，只更新受影响的记录"""
+        if len(logs) >= LOG_BUFFER_SIZE:
+            # 新日志可能没有读全，无法确定哪些记录变了，全部重新读取
+            db.clear_caches()
+            for tab in (self.people_tab, self.movies_tab, self.companies_tab, self.awards_tab):
+                tab.reload()
+            return
+        db.invalidate_from_logs(logs)
+        changes = {}
+        for log in logs:
+            if log['operation_type'] in db.LINK_OPERATIONS:
+                continue  # 关系的变化不影响列表中显示的行
+            changes.setdefault(log['table_name'], []).append(
+                (log['operation_type'], log['record_id'], log['log_id']))
+        for tab in (self.people_tab, self.movies_tab, self.companies_tab, self.awards_tab):
+            if tab.table in changes:
+                tab.apply_changes(changes[tab.table])
+
+    def append_logs(self, logs):
+        """把新日志插入到顶部，并删除超出保留条数的旧日志
+
+        第一次读取的是已有的历史日志；之后读到的新日志表示数据有变化，交给 dispatch_changes 处理。
+        """
+        self.log_fetch_running = False
+        if self.logs_loaded and logs:
+            self.dispatch_changes(logs)
+        self.logs_loaded = True
         for log in logs:
-            self.log_tree.insert("", 0, values=(
+            item = self.log_tree.insert("", 0, values=(
                 log['operation_time'],
                 log['operation_type'],
                 log['table_name'],
                 log['record_id']
             ))
+            self.log_items.append(item)
+            self.last_log_id = log['log_id']
+        for tab in (self.people_tab, self.movies_tab, self.companies_tab, self.awards_tab):
+            tab.logs_seen(self.last_log_id or 0)
+        while len(self.log_items) > LOG_BUFFER_SIZE:
+            self.log_tree.delete(self.log_items.popleft())
+        if self.log_refresh_pending:
+            self.root.after_idle(self.fetch_new_logs)
 
     def refresh_all(self):
         """刷新所有数据